@@ -1,4 +1,6 @@
-from flask import Blueprint, request, jsonify
+import logging
+
+from flask import Blueprint, request, jsonify, current_app
 from flask_cors import cross_origin
 from flask_jwt_extended import (
     create_access_token, create_refresh_token,
@@ -15,7 +17,12 @@ from .utils import (
     send_account_creation_email, send_password_reset_email, add_revoked_token,
     generate_numeric_code, send_verification_email
 )
-from sqlalchemy.orm import joinedload
+from .passwords import needs_rehash, hash_method
+from .metrics import PASSWORD_REHASHES
+from .profile import profile_cache, profile_etag, profile_stamp, load_profile, touch_users
+from sqlalchemy.orm import joinedload, selectinload
+
+logger = logging.getLogger(__name__)
 
 auth_blueprint = Blueprint('auth', __name__)
 
@@ -36,18 +43,8 @@ def request_verification_code():
     if existing_user:
         return jsonify({'error': 'A user with this email already exists'}), 400
 
-    # Generate code and send email BEFORE database operations to avoid race conditions
     code = generate_numeric_code(6)
-    
-    try:
-        if not send_verification_email(email, code):
-            return jsonify({'error': 'Failed to send verification email. Please try again later.'}), 500
-    except Exception as e:
-        print(f"Unexpected error sending verification email: {e}")
-        return jsonify({'error': 'Failed to send verification email. Please try again later.'}), 500
 
-    # Only create/update verification entry AFTER email is successfully sent
-    # This prevents storing codes for emails that never received the message
     try:
         EmailVerification.query.filter_by(email=email, role=role).delete()
         expires_at = datetime.now(timezone.utc) + timedelta(minutes=15)
@@ -64,6 +61,10 @@ def request_verification_code():
         print(f"Database error while saving verification code: {e}")
         return jsonify({'error': 'An error occurred. Please try again later.'}), 500
 
+    # The email goes out from the outbox thread; the code is stored first so it is valid when the mail arrives
+    if not send_verification_email(email, code):
+        return jsonify({'error': 'Failed to send verification email. Please try again later.'}), 503
+
     return jsonify({'message': 'Verification code sent successfully.'}), 200
 
 @auth_blueprint.route('/register', methods=['POST'])
@@ -180,15 +181,12 @@ def register():
     db.session.commit()
 
     if reciever_fname and reciever_lname:
-        # Best-effort notification; do not fail registration if email sending fails
-        try:
-            send_account_creation_email(
-                to_email=email,
-                reciever_fname=reciever_fname,
-                reciever_lname=reciever_lname
-            )
-        except Exception:
-            pass
+        # Best-effort notification (queued); do not fail registration if it cannot be queued
+        send_account_creation_email(
+            to_email=email,
+            reciever_fname=reciever_fname,
+            reciever_lname=reciever_lname
+        )
 
     return jsonify({'message': 'Account created successfully. You can now log in.'}), 201
 
@@ -204,6 +202,18 @@ def login():
     if not user or not compare_password(user.password, password):
         return jsonify({'error': 'Invalid credentials'}), 401
 
+    # the password is known here, so a hash made under another PASSWORD_HASH_METHOD can be replaced
+    if current_app.config.get('PASSWORD_REHASH_ON_LOGIN', True) and needs_rehash(user.password):
+        old_method = hash_method(user.password)
+        try:
+            user.password = hashing_password(password)
+            db.session.commit()
+            PASSWORD_REHASHES.labels(old_method).inc()
+        except Exception as e:
+            # the old hash still works; try again on the next login
+            db.session.rollback()
+            logger.warning(f"[LOGIN] Password rehash failed - User: {user.id}, Error: {e}")
+
     access_token = create_access_token(
         identity=user.id,
         additional_claims={"role": user.role}
@@ -224,66 +234,32 @@ def login():
 @auth_blueprint.route('/me', methods=['GET'])
 @jwt_required()
 def get_current_user():
+    """
+    Profile of the logged-in user: student units and their courses, or lecturer courses and their units.
+    Served from the worker's profile cache while its stamp is unchanged (see api/profile.py).
+    Responses carry an ETag; a matching If-None-Match gets 304 Not Modified.
+    """
     user_id = get_jwt_identity()
-    claims  = get_jwt()
-
-    user    = User.query.get(user_id)
+    role = get_jwt().get('role')
+    key = (user_id, role)
 
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-
-    if claims.get('role') == 'student':
-        student = (
-            Student.query
-                   .options(joinedload(Student.units).joinedload(Unit.course))
-                   .filter_by(user_id=user.id)
-                   .first()
-        )
-        if not student:
-            return jsonify({'error': 'Student not found'}), 404
-
-        # build a simple list of distinct course dicts based on the student's units
-        courses_by_id = {}
-        for u in student.units:
-            if u.course and u.course.id not in courses_by_id:
-                courses_by_id[u.course.id] = {'id': u.course.id, 'name': u.course.name}
-        course_list = list(courses_by_id.values())
-
-        return jsonify({
-            'id'           : user.id,
-            'email'        : user.email,
-            'role'         : claims.get('role'),
-            'reg_number'   : student.reg_number,
-            'name'         : student.firstname,
-            'surname'      : student.surname,
-            'othernames'   : student.othernames,
-
-            'courses'      : course_list,
-            # units property on Student already filters by year/sem
-            'units'        : [u.to_dict() for u in student.units]
-        }), 200
-
-    elif claims.get('role') == 'lecturer':
-        lecturer = Lecturer.query.filter_by(user_id=user.id).first()
-        if not lecturer:
-            return jsonify({'error': 'Lecturer not found'}), 404
-
-        courses = Course.query.filter_by(created_by=user.id).all()
-        return jsonify({
-            'id'         : user.id,
-            'email'      : user.email,
-            'role'       : claims.get('role'),
-            'name'       : lecturer.firstname,
-            'surname'    : lecturer.surname,
-            'othernames' : lecturer.othernames,
-            'courses'    : [c.to_dict() for c in courses]
-        }), 200
-
-    return jsonify({
-        'id'    : user.id,
-        'email' : user.email,
-        'role'  : claims.get('role')
-    }), 200
+    # a cached profile costs one primary key read for its stamp; a miss is loaded with one statement
+    cached = profile_cache.get(key, profile_stamp(user_id)) if key in profile_cache else None
+    if cached:
+        etag, body = cached
+    else:
+        profile, stamp, error = load_profile(user_id, role)
+        if error:
+            return jsonify({'error': error}), 404
+        etag, body = profile_etag(user_id, role, stamp), current_app.json.dumps(profile)
+        profile_cache.put(key, stamp, etag, body)
+
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = 0
+    response.cache_control.must_revalidate = True
+    return response.make_conditional(request)
 
 @auth_blueprint.route('/join-unit', methods=['POST'])
 @jwt_required()
@@ -299,7 +275,12 @@ def join_unit_by_code():
     if not join_code:
         return jsonify({'error': 'join_code is required'}), 400
 
-    student = Student.query.filter_by(user_id=user_id).first()
+    student = (
+        Student.query
+               .options(selectinload(Student.units))
+               .filter_by(user_id=user_id)
+               .first()
+    )
     if not student:
         return jsonify({'error': 'Student profile not found'}), 404
 
@@ -311,6 +292,7 @@ def join_unit_by_code():
         return jsonify({'error': 'Student is already registered for this unit'}), 400
 
     student.units.append(unit)
+    touch_users([user_id])
     db.session.commit()
 
     return jsonify({
@@ -379,7 +361,7 @@ def reset_password():
         if not user_details:
             return jsonify({'error': 'User details not found'}), 404
 
-        # Send password reset confirmation email
+        # Queue the password reset confirmation email
 
         sent = send_password_reset_email(
             to_email=user.email,
@@ -0,0 +1,105 @@
+"""
+Institution email domains
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Load the accepted domains from a text file (INSTITUTION_DOMAINS_FILE, api/institution_domains.txt by default)
+  into a set of domain suffixes
+- Match an email by looking up each of its domain's suffixes (student.uonbi.ac.ke, uonbi.ac.ke, ac.ke, ke),
+  so a lookup costs one set probe per label however many institutions are listed
+- Re-read the file when it changes, checked at most every INSTITUTION_DOMAINS_RELOAD_SECONDS, so institutions
+  are added without a redeploy; a file that cannot be read keeps the domains already loaded
+"""
+
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'institution_domains.txt')
+
+
+def normalise_domain(entry: str):
+    """'  NDU.ac.ke/niruc ' -> 'ndu.ac.ke'; None for blank lines, comments and entries that are not domains."""
+    entry = entry.split('#', 1)[0].strip().lower()
+    # paths and leading '@' / '.' cannot be part of an email domain
+    entry = entry.split('/', 1)[0].lstrip('@.').rstrip('.')
+    if not entry or '.' not in entry or any(char.isspace() or char == '@' for char in entry):
+        return None
+    return entry
+
+
+def load_domains(path: str) -> frozenset:
+    domains = set()
+    with open(path, encoding='utf-8') as file:
+        for number, line in enumerate(file, start=1):
+            domain = normalise_domain(line)
+            if domain:
+                domains.add(domain)
+            elif line.split('#', 1)[0].strip():
+                logger.warning(f"[DOMAINS] Ignoring line {number} of {path}: {line.strip()!r}")
+    return frozenset(domains)
+
+
+class DomainRegistry:
+    """Accepted domains, replaced as a whole when the file changes (readers never see a partial set)."""
+
+    def __init__(self, path=DEFAULT_FILE, reload_seconds=30):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._domains = frozenset()
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self, force=True):
+        """Re-read the file if it changed (or always with force); True when the domains were replaced."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if not force and mtime == self._mtime:
+                    return False
+                domains = load_domains(self.path)
+            except OSError as e:
+                logger.error(f"[DOMAINS] Could not read {self.path}, keeping {len(self._domains)} domains - Error: {e}")
+                return False
+            self._domains, self._mtime = domains, mtime
+        logger.info(f"[DOMAINS] Loaded {len(domains)} institution domains from {self.path}")
+        return True
+
+    def _maybe_reload(self):
+        if self.reload_seconds and time.monotonic() - self._checked_at >= self.reload_seconds:
+            self.reload(force=False)
+
+    def __contains__(self, domain: str) -> bool:
+        self._maybe_reload()
+        domains = self._domains
+        labels = domain.lower().rstrip('.').split('.')
+        return any('.'.join(labels[i:]) in domains for i in range(len(labels)))
+
+    def __len__(self):
+        return len(self._domains)
+
+
+_registry = None
+
+
+def registry() -> DomainRegistry:
+    """The process's registry; the default file is used until install() has run."""
+    global _registry
+    if _registry is None:
+        _registry = DomainRegistry()
+    return _registry
+
+
+def install(app):
+    """Load INSTITUTION_DOMAINS_FILE; a missing file stops the app from starting."""
+    global _registry
+    path = app.config.get('INSTITUTION_DOMAINS_FILE') or DEFAULT_FILE
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f'INSTITUTION_DOMAINS_FILE {path} does not exist')
+    _registry = DomainRegistry(path, app.config.get('INSTITUTION_DOMAINS_RELOAD_SECONDS', 30))
+    return _registry
@@ -0,0 +1,78 @@
+"""
+Unit join codes
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Take the next value of the unit_join_code_seq sequence and scramble it with a keyed 4-round Feistel
+  permutation of 40 bits (JOIN_CODE_KEY, SECRET_KEY by default): distinct counters give distinct codes,
+  so no lookup is needed, and consecutive units do not get guessable neighbouring codes
+- Write the result as 8 Crockford base32 characters (no I, L, O or U, which students misread)
+- add_with_join_code(): flush a unit in a savepoint and take the next code if the unique constraint still
+  fires (a code from the old random generator, or a changed key)
+"""
+
+import hmac
+import logging
+import secrets
+import hashlib
+
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from .models import db, JOIN_CODE_SEQUENCE
+
+logger = logging.getLogger(__name__)
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+CODE_LENGTH = 8
+HALF_BITS = CODE_LENGTH * 5 // 2  # 20
+HALF_MASK = (1 << HALF_BITS) - 1
+ROUNDS = 4
+
+
+def _round(key: bytes, number: int, half: int) -> int:
+    digest = hmac.new(key, bytes([number]) + half.to_bytes(3, 'big'), hashlib.sha256).digest()
+    return int.from_bytes(digest[:3], 'big') & HALF_MASK
+
+
+def permute(counter: int, key: bytes) -> int:
+    """Bijection on [0, 2**40): every counter maps to its own value."""
+    left, right = (counter >> HALF_BITS) & HALF_MASK, counter & HALF_MASK
+    for number in range(ROUNDS):
+        left, right = right, left ^ _round(key, number, right)
+    return (left << HALF_BITS) | right
+
+
+def encode(value: int) -> str:
+    chars = []
+    for _ in range(CODE_LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def _key() -> bytes:
+    return (current_app.config.get('JOIN_CODE_KEY') or current_app.config.get('SECRET_KEY') or '').encode()
+
+
+def next_join_code() -> str:
+    if db.engine.dialect.supports_sequences:
+        counter = db.session.execute(select(JOIN_CODE_SEQUENCE.next_value())).scalar()
+    else:
+        # no sequences (SQLite in development): a random counter, the unique constraint catches repeats
+        counter = secrets.randbits(HALF_BITS * 2)
+    return encode(permute(counter % (1 << HALF_BITS * 2), _key()))
+
+
+def add_with_join_code(unit, attempts=5):
+    """Add and flush `unit` with a fresh join code; the caller commits."""
+    for attempt in range(1, attempts + 1):
+        unit.unique_join_code = next_join_code()
+        try:
+            with db.session.begin_nested():
+                db.session.add(unit)
+            return unit
+        except IntegrityError:
+            if attempt == attempts:
+                raise
+            logger.warning(f"[JOIN CODE] Code {unit.unique_join_code} already taken, retrying ({attempt}/{attempts})")
@@ -5,15 +5,26 @@ Actions:
 - Add a new course
 - Add units to a course
 - Add students to a course
+- Bulk enrol students in a unit from a CSV/XLSX roster of registration numbers
+- Bulk create student accounts from a CSV/XLSX roster
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from .models import db, User, Student, Lecturer, Unit, Course
-from .utils import hashing_password, generate_join_code
+from .models import db, User, Student, Lecturer, Unit, Course, student_units
+from .utils import hashing_password
+from .join_codes import add_with_join_code
+from .read_models import lecturer_students, unit_students
+from .replica import replica_reads
+from .rosters import RosterError, read_roster, reg_number_column
+from .provisioning import provision_students
+from .profile import touch_users, touch_units, touch_courses
 import pandas as pd
 import os
-from sqlalchemy.orm import joinedload
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 # Create a blueprint for lecture routes
 lec_blueprint = Blueprint('lectures', __name__)
@@ -63,10 +74,12 @@ def create_course():
         created_by=user_id
     )
     db.session.add(course)
+    touch_users([user_id])
     db.session.commit()
     return jsonify({'message': 'Course created successfully', 'course_id': course.id}), 201
 
 @lec_blueprint.route('/courses', methods=['GET'])
+@replica_reads
 def get_courses():
     '''
     Get all courses created by the lecturer.
@@ -77,6 +90,7 @@ def get_courses():
     return jsonify([course.to_dict() for course in courses]), 200
 
 @lec_blueprint.route('/courses/<string:course_id>', methods=['GET'])
+@replica_reads
 def get_course(course_id):
     '''
     Get a specific course by ID.
@@ -103,6 +117,7 @@ def update_course(course_id):
         if field in data:
             setattr(course, field, data[field])
     
+    touch_courses([course.id])
     db.session.commit()
     return jsonify(course.to_dict()), 200
 
@@ -116,6 +131,7 @@ def delete_course(course_id):
     if not course:
         return jsonify({'error': 'Course not found'}), 404
     
+    touch_courses([course.id])
     db.session.delete(course)
     db.session.commit()
     return jsonify({'message': 'Course deleted successfully'}), 200
@@ -145,28 +161,21 @@ def create_unit():
     if existing_unit:
         return jsonify({'error': 'Unit with this code already exists in the course'}), 400
     
-    # Generate a unique join code for this unit
-    join_code = None
-    while True:
-        candidate = generate_join_code()
-        if not Unit.query.filter_by(unique_join_code=candidate).first():
-            join_code = candidate
-            break
-    
-    # Create unit
+    # Create unit with a join code from the permuted sequence (no lookups; retried if the code is taken)
     unit = Unit(
         unit_code=data['unit_code'],
         unit_name=data['unit_name'],
         level=data['level'],
         semester=data['semester'],
-        course=course,
-        unique_join_code=join_code
+        course_id=course.id
     )
-    db.session.add(unit)
+    add_with_join_code(unit)
+    touch_units([unit.id])
     db.session.commit()
     return jsonify({'message': 'Unit created successfully', 'unit_id': unit.id}), 201
 
 @lec_blueprint.route('/units', methods=['GET'])
+@replica_reads
 def get_units():
     '''
     Get all units created by the lecturer.
@@ -187,6 +196,7 @@ def get_units():
     return jsonify([unit.to_dict() for unit in units]), 200
 
 @lec_blueprint.route('/units/<string:unit_id>', methods=['GET'])
+@replica_reads
 def get_unit(unit_id):
     '''
     Get a specific unit by ID.
@@ -209,9 +219,14 @@ def update_unit(unit_id):
         return jsonify({'error': 'Unit not found'}), 404
     
     data = request.get_json() or {}
+    # bump the profiles of the old course's lecturer before a move, and the new one's after it
+    touch_units([unit.id])
     for field in ['unit_code', 'unit_name', 'level', 'semester', 'course_id']:
         if field in data:
             setattr(unit, field, data[field])
+    if 'course_id' in data:
+        db.session.flush()
+        touch_units([unit.id])
     
     db.session.commit()
     return jsonify(unit.to_dict()), 200
@@ -226,19 +241,21 @@ def delete_unit(unit_id):
     if not unit:
         return jsonify({'error': 'Unit not found'}), 404
     
+    touch_units([unit.id])
     db.session.delete(unit)
     db.session.commit()
     return jsonify({'message': 'Unit deleted successfully'}), 200
 
 # --- CRUD: Students ---
 @lec_blueprint.route('/students/<string:student_id>', methods=['GET'])
+@replica_reads
 def get_student(student_id):
     """
     Get a specific student's details by ID.
     """
     student = (
         Student.query
-               .options(joinedload(Student.units).joinedload(Unit.course))
+               .options(selectinload(Student.units))
                .get(student_id)
     )
     if not student:
@@ -246,27 +263,19 @@ def get_student(student_id):
     return jsonify(student.to_dict()), 200
 
 @lec_blueprint.route('/students', methods=['GET'])
+@replica_reads
 def get_students():
     """
     Get all students in any course created by the lecturer.
     """
     lecturer_id = get_jwt_identity()
 
-    # Join through units and courses, filtering on courses.created_by
-    students = (
-        Student.query
-               .join(Student.units)
-               .join(Unit.course)
-               .filter(Course.created_by == lecturer_id)
-               .options(joinedload(Student.units).joinedload(Unit.course))
-               .distinct()
-               .all()
-    )
-
+    # Students of units in courses created by the lecturer (read model: two Core queries)
     # If none, return empty list (200)
-    return jsonify([s.to_dict() for s in students]), 200
+    return jsonify(lecturer_students(lecturer_id)), 200
 
 @lec_blueprint.route('/students/unit/<string:unit_id>', methods=['GET'])
+@replica_reads
 def get_students_in_unit(unit_id):
     """
     Get all students enrolled in a specific unit.
@@ -275,6 +284,95 @@ def get_students_in_unit(unit_id):
     if not unit:
         return jsonify({'error': 'Unit not found'}), 404
 
-    students = unit.students
+    # enrolled students and their units (read model: two Core queries)
+    return jsonify(unit_students(unit.id)), 200
+
+@lec_blueprint.route('/units/<string:unit_id>/students/import', methods=['POST'])
+def import_unit_students(unit_id):
+    """
+    Enrol the students listed in a roster file in a unit of one of the lecturer's courses.
+    Requires: multipart field 'file', a .csv or .xlsx with a reg_number column
+    Returns: JSON summary of matched, newly enrolled, already enrolled and unmatched rows
+    """
+    unit = Unit.query.options(joinedload(Unit.course)).get(unit_id)
+    if not unit:
+        return jsonify({'error': 'Unit not found'}), 404
+    if not unit.course or unit.course.created_by != get_jwt_identity():
+        return jsonify({'error': 'You can only enrol students in units of your own courses'}), 403
+
+    file = request.files.get('file')
+    if not file or not file.filename:
+        return jsonify({'error': 'A roster file is required (multipart field "file")'}), 400
+
+    try:
+        frame = read_roster(file, current_app.config.get('ENROLMENT_IMPORT_MAX_ROWS', 5000))
+        reg_numbers = frame[reg_number_column(frame)].tolist()
+    except RosterError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # unique, non-empty reg numbers in file order
+    unique_reg_numbers = list(dict.fromkeys(reg for reg in reg_numbers if reg))
+    blank_rows = sum(1 for reg in reg_numbers if not reg)
+
+    # one IN query resolves every reg number
+    matched = dict(
+        db.session.query(Student.reg_number, Student.id)
+                  .filter(Student.reg_number.in_(unique_reg_numbers))
+                  .all()
+    ) if unique_reg_numbers else {}
+    unmatched = [reg for reg in unique_reg_numbers if reg not in matched]
+
+    # one multi-row INSERT; students already in the unit are skipped by the primary key
+    enrolled = 0
+    if matched:
+        insert = pg_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+        stmt = insert(student_units).values(
+            [{'student_id': student_id, 'unit_id': unit.id} for student_id in matched.values()]
+        ).on_conflict_do_nothing()
+        enrolled = db.session.execute(stmt).rowcount
+        if enrolled:
+            touch_users(select(Student.user_id).where(Student.id.in_(list(matched.values()))))
+        db.session.commit()
+
+    return jsonify({
+        'message': f'{enrolled} students enrolled in {unit.unit_code}',
+        'unit_id': unit.id,
+        'rows': len(reg_numbers),
+        'blank_rows': blank_rows,
+        'duplicate_rows': len(reg_numbers) - blank_rows - len(unique_reg_numbers),
+        'matched': len(matched),
+        'enrolled': enrolled,
+        'already_enrolled': len(matched) - enrolled,
+        'unmatched': len(unmatched),
+        'unmatched_reg_numbers': unmatched
+    }), 200
+
+@lec_blueprint.route('/students/provision', methods=['POST'])
+def provision_student_accounts():
+    """
+    Create student accounts from a roster file, optionally enrolling them in one of the lecturer's units.
+    Requires: multipart field 'file', a .csv or .xlsx with reg_number, email, firstname and surname columns
+              (optional: othernames, password; a temporary password is generated and emailed when missing)
+    Optional form fields: unit_id, send_email (default true)
+    Returns: JSON summary of created, skipped and failed rows
+    """
+    unit_id = (request.form.get('unit_id') or '').strip() or None
+    if unit_id:
+        unit = Unit.query.options(joinedload(Unit.course)).get(unit_id)
+        if not unit:
+            return jsonify({'error': 'Unit not found'}), 404
+        if not unit.course or unit.course.created_by != get_jwt_identity():
+            return jsonify({'error': 'You can only enrol students in units of your own courses'}), 403
+
+    file = request.files.get('file')
+    if not file or not file.filename:
+        return jsonify({'error': 'A roster file is required (multipart field "file")'}), 400
+    send_email = (request.form.get('send_email') or 'true').lower() in ('true', '1', 't')
+
+    try:
+        frame = read_roster(file, current_app.config.get('PROVISION_MAX_ROWS', 2000))
+        summary = provision_students(frame, current_app.config, unit_id=unit_id, send_email=send_email)
+    except RosterError as e:
+        return jsonify({'error': str(e)}), 400
 
-    return jsonify([s.to_dict() for s in students]), 200
+    return jsonify({'message': f"{summary['created']} student accounts created", **summary}), 201 if summary['created'] else 200
@@ -19,6 +19,8 @@ class User(db.Model):
         onupdate=lambda: datetime.now(timezone.utc),
         nullable=False
     )
+    # bumped whenever the user's /me profile changes; the /me cache stamp (api/profile.py)
+    profile_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     # one-to-one relations
     student = db.relationship('Student', uselist=False, back_populates='user', cascade='all, delete')
@@ -65,11 +67,14 @@ class Student(db.Model):
     hobbies = db.Column(JSONB, default=list)
 
     # student relates directly to units
+    # never loaded implicitly: queries pick a loader, e.g. options(selectinload(Student.units)).
+    # student_units rows are removed by the ON DELETE CASCADE foreign keys.
     units = db.relationship(
         'Unit',
         secondary=student_units,
         back_populates='students',
-        lazy='joined'
+        lazy='raise',
+        passive_deletes=True
     )
 
     user = db.relationship('User', back_populates='student')
@@ -135,7 +140,8 @@ class Course(db.Model):
     created_by = db.Column(
         db.String(36),
         db.ForeignKey('users.id', ondelete='SET NULL'),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     # relationships
@@ -154,6 +160,9 @@ class Course(db.Model):
     def __repr__(self):
         return f"<Course {self.code}>"
 
+# counter behind the unit join codes (api/join_codes.py); created with the tables on Postgres
+JOIN_CODE_SEQUENCE = db.Sequence('unit_join_code_seq', metadata=db.metadata)
+
 class Unit(db.Model):
     __tablename__ = 'units'
 
@@ -174,7 +183,8 @@ class Unit(db.Model):
         'Student',
         secondary=student_units,
         back_populates='units',
-        lazy='joined'
+        lazy='raise',
+        passive_deletes=True
     )
 
     def to_dict(self):
@@ -194,9 +204,15 @@ class Unit(db.Model):
 
 class EmailVerification(db.Model):
     __tablename__ = 'email_verifications'
+    __table_args__ = (
+        # register: latest code for (email, role); request-code and register delete by (email, role)
+        db.Index('ix_email_verifications_email_role_created', 'email', 'role', 'created_at'),
+        # expired-code sweeper (api/verification_sweeper.py)
+        db.Index('ix_email_verifications_expires_at', 'expires_at'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    email = db.Column(db.String(120), nullable=False, index=True)
+    email = db.Column(db.String(120), nullable=False)
     role = db.Column(db.Enum('student', 'lecturer', name='verification_roles'), nullable=False)
     code = db.Column(db.String(10), nullable=False)
     data = db.Column(db.JSON, nullable=False)
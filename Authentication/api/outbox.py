@@ -0,0 +1,176 @@
+"""
+Outbox for account emails
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Outbox.put() (api.utils.queue_email): put a Flask-Mail message on an in-process queue and return at once,
+  so requests never wait on SMTP
+- A daemon sender thread per worker process drains the queue in bursts of up to MAIL_BATCH_SIZE messages
+  over one SMTP connection, which stays open until MAIL_IDLE_SECONDS pass without mail
+- Failed messages are retried with exponential backoff (MAIL_RETRY_BACKOFF_SECONDS, doubling) and dropped
+  with an error log after MAIL_MAX_RETRIES attempts
+- Pending messages are flushed for up to MAIL_SHUTDOWN_SECONDS when the worker exits
+"""
+
+import time
+import heapq
+import queue
+import atexit
+import logging
+import threading
+import itertools
+from contextlib import ExitStack
+
+from flask_mail import Mail
+
+from .metrics import MAIL_OUTBOX_DEPTH, MAIL_MESSAGES
+
+logger = logging.getLogger(__name__)
+
+
+class Outbox:
+    """Queued messages and the thread that sends them."""
+
+    def __init__(self, app):
+        self.app = app
+        self.mail = Mail(app)
+        self.batch_size = app.config.get('MAIL_BATCH_SIZE', 50)
+        self.idle_seconds = app.config.get('MAIL_IDLE_SECONDS', 30)
+        self.max_retries = app.config.get('MAIL_MAX_RETRIES', 5)
+        self.backoff_seconds = app.config.get('MAIL_RETRY_BACKOFF_SECONDS', 2)
+        self._queue = queue.Queue(maxsize=app.config.get('MAIL_OUTBOX_SIZE', 10000))
+        self._retries = []  # min-heap of (due, order, attempt, message), sender thread only
+        self._order = itertools.count()
+        self._connection = None
+        self._stack = None
+        self._last_sent = 0.0
+        self._idle = threading.Event()
+        self._idle.set()
+        # put() and the sender's idle check hold it, so a message queued in between cannot be missed
+        self._idle_lock = threading.Lock()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, message):
+        """Queue a message; False when the outbox is full."""
+        self._ensure_thread()
+        try:
+            with self._idle_lock:
+                self._idle.clear()
+                self._queue.put_nowait((0, message))
+        except queue.Full:
+            logger.error(f"[OUTBOX] Queue full, message dropped - Subject: {message.subject}")
+            MAIL_MESSAGES.labels('dropped').inc()
+            return False
+        MAIL_OUTBOX_DEPTH.inc()
+        return True
+
+    def flush(self, timeout):
+        """Wait up to `timeout` seconds for the queued messages and due retries to go out."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        return self._idle.wait(timeout)
+
+    def _ensure_thread(self):
+        # started lazily so that each gunicorn worker gets its own thread after the fork
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='mail-outbox', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = self._next_batch()
+                if batch:
+                    self._send_batch(batch)
+                elif self._connection is not None and time.monotonic() - self._last_sent >= self.idle_seconds:
+                    self._close()
+                # idle as soon as the burst is out, so flush() at exit returns without waiting for the timeout
+                with self._idle_lock:
+                    if not self._retries and self._queue.empty():
+                        self._idle.set()
+
+    def _next_batch(self):
+        """Block until a message or a retry is due, then take what is ready (up to batch_size)."""
+        timeouts = [self.idle_seconds]
+        if self._retries:
+            timeouts.append(self._retries[0][0] - time.monotonic())
+        if self._connection is not None:
+            timeouts.append(self._last_sent + self.idle_seconds - time.monotonic())
+
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=max(0.0, min(timeouts))))
+        except queue.Empty:
+            pass
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        now = time.monotonic()
+        while self._retries and self._retries[0][0] <= now and len(batch) < self.batch_size:
+            _, _, attempt, message = heapq.heappop(self._retries)
+            batch.append((attempt, message))
+        return batch
+
+    def _open(self):
+        if self._connection is None:
+            self._stack = ExitStack()
+            # logs in once; Flask-Mail reconnects by itself after MAIL_MAX_EMAILS messages when that is set
+            self._connection = self._stack.enter_context(self.mail.connect())
+        return self._connection
+
+    def _close(self):
+        stack, self._stack, self._connection = self._stack, None, None
+        if stack is not None:
+            try:
+                stack.close()
+            except Exception:
+                pass  # the server may already have dropped the session
+
+    def _send_batch(self, batch):
+        for index, (attempt, message) in enumerate(batch):
+            try:
+                connection = self._open()
+            except Exception as e:
+                # server unreachable: the rest of the burst waits for the next attempt as well
+                self._close()
+                for attempt, message in batch[index:]:
+                    self._retry(attempt, message, e)
+                return
+            try:
+                connection.send(message)
+                self._last_sent = time.monotonic()
+                MAIL_MESSAGES.labels('sent').inc()
+                MAIL_OUTBOX_DEPTH.dec()
+            except Exception as e:
+                self._close()
+                self._retry(attempt, message, e)
+
+    def _retry(self, attempt, message, error):
+        attempt += 1
+        if attempt > self.max_retries:
+            logger.error(
+                f"[OUTBOX] Giving up after {attempt} attempts - Subject: {message.subject}, "
+                f"Recipients: {len(message.recipients)}, Error: {type(error).__name__}: {error}"
+            )
+            MAIL_MESSAGES.labels('failed').inc()
+            MAIL_OUTBOX_DEPTH.dec()
+            return
+        delay = self.backoff_seconds * 2 ** (attempt - 1)
+        logger.warning(
+            f"[OUTBOX] Send failed, retry {attempt}/{self.max_retries} in {delay}s - "
+            f"Subject: {message.subject}, Error: {type(error).__name__}: {error}"
+        )
+        MAIL_MESSAGES.labels('retried').inc()
+        heapq.heappush(self._retries, (time.monotonic() + delay, next(self._order), attempt, message))
+
+
+def install(app):
+    """Create the app's outbox (and its Flask-Mail state); pending mail is flushed when the process exits."""
+    outbox = Outbox(app)
+    app.extensions['outbox'] = outbox
+    atexit.register(outbox.flush, app.config.get('MAIL_SHUTDOWN_SECONDS', 10))
+    return outbox
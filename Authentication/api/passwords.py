@@ -0,0 +1,74 @@
+"""
+Password hashing policy
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Hold the Werkzeug hash method new passwords are hashed with (PASSWORD_HASH_METHOD, e.g. scrypt:16384:8:1
+  or pbkdf2:sha256:600000), so the CPU cost of a login can be tuned without code changes
+- Tell whether a stored hash was made with another method or cost; /login then stores a new hash
+  made with the current method (upgrade or downgrade, no password reset needed)
+- benchmarks/password_hashing.py measures verifications and logins per second per core for each method
+"""
+
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+# Werkzeug 3's own default
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+_method = DEFAULT_METHOD
+
+
+def canonical_method(method: str) -> str:
+    """
+    The method as Werkzeug writes it into the hash (defaults filled in), e.g. 'scrypt' -> 'scrypt:32768:8:1'.
+    Raises ValueError for methods Werkzeug cannot hash with.
+    """
+    name, *args = method.strip().split(':')
+    if name == 'scrypt':
+        if not args:
+            args = ['32768', '8', '1']
+        if len(args) != 3 or not all(arg.isdigit() for arg in args):
+            raise ValueError(f"Invalid password hash method '{method}': scrypt takes n:r:p")
+        n, r, p = map(int, args)
+        if n < 2 or n & (n - 1):
+            raise ValueError(f"Invalid password hash method '{method}': scrypt n must be a power of 2")
+        return f'scrypt:{n}:{r}:{p}'
+    if name == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = args[1] if len(args) > 1 else str(DEFAULT_PBKDF2_ITERATIONS)
+        if len(args) > 2 or not iterations.isdigit():
+            raise ValueError(f"Invalid password hash method '{method}': pbkdf2 takes hash_name:iterations")
+        return f'pbkdf2:{hash_name}:{int(iterations)}'
+    raise ValueError(f"Invalid password hash method '{method}': use scrypt or pbkdf2")
+
+
+def configure(method: str):
+    """Hash new passwords with `method` from now on (this process only)."""
+    global _method
+    _method = canonical_method(method)
+
+
+def current_method() -> str:
+    return _method
+
+
+def hash_password(password: str, method: str = None) -> str:
+    return generate_password_hash(password, method=method or _method)
+
+
+def verify_password(hashed_pwd: str, password: str) -> bool:
+    # the hash carries its own method, so hashes made under an older policy keep verifying
+    return check_password_hash(hashed_pwd, password)
+
+
+def hash_method(hashed_pwd: str) -> str:
+    """Method part of a stored hash ('scrypt:32768:8:1$salt$hash' -> 'scrypt:32768:8:1')."""
+    return hashed_pwd.split('$', 1)[0]
+
+
+def needs_rehash(hashed_pwd: str) -> bool:
+    return hash_method(hashed_pwd) != _method
+
+
+def install(app):
+    """Apply PASSWORD_HASH_METHOD; an invalid method stops the app from starting."""
+    configure(app.config.get('PASSWORD_HASH_METHOD') or DEFAULT_METHOD)
@@ -0,0 +1,142 @@
+"""
+Connection pool instrumentation
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- QueuePool subclass that times every checkout (wait for a free connection, new connects and pre-ping)
+- Count checkouts, pool timeouts, connects, closes and invalidations per pool
+- Snapshot the pool gauges (size, in use, idle, overflow) for the health and metrics endpoints
+- Leave SQLite in-memory databases on the StaticPool Flask-SQLAlchemy gives them: every pooled connection
+  would otherwise open its own empty database
+Stats are per gunicorn worker process; multiply by the worker count when sizing against
+Postgres max_connections.
+"""
+
+import time
+import threading
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class PoolStats:
+    """Counters for one pool. Updated from many threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+
+    def observe_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.checkouts += 0 if timed_out else 1
+            self.timeouts += 1 if timed_out else 0
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[i] += 1
+
+    def count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout takes."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # recreate() passes the old pool's dispatcher, which already carries the listeners below
+        if '_dispatch' not in kwargs:
+            stats = self.stats = PoolStats()
+            event.listen(self, 'connect', lambda dbapi_connection, record: stats.count('connects'))
+            event.listen(self, 'close', lambda dbapi_connection, record: stats.count('closes'))
+            event.listen(self, 'invalidate', lambda dbapi_connection, record, e: stats.count('invalidations'))
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.observe_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.observe_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() and invalidation swap in a new pool; keep the counters
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def max_overflow(self):
+        return self._max_overflow
+
+    def timeout(self):
+        return self._timeout
+
+
+def _uses_queue_pool(uri):
+    """False for URIs that don't get a QueuePool: SQLite in-memory databases (StaticPool)."""
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite':
+        return True
+    database = url.database or ''
+    return not (database in ('', ':memory:') or database.startswith('file::memory:') or url.query.get('mode') == 'memory')
+
+
+def install(app):
+    """Use the instrumented pool for the app's default engine when it would use a QueuePool (call before db.init_app)."""
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if not uri or not _uses_queue_pool(uri):
+        return
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    options.setdefault('poolclass', InstrumentedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def snapshot_all(engines):
+    """{bind name: snapshot} for Flask-SQLAlchemy's db.engines (the default bind is 'default')."""
+    return {
+        key or 'default': snapshot(engine)
+        for key, engine in engines.items()
+    }
+
+
+def snapshot(engine):
+    """Current gauges and counters of an engine's pool (None when it is not instrumented)."""
+    pool = engine.pool
+    stats = getattr(pool, 'stats', None)
+    if stats is None:
+        return None
+    in_use = pool.checkedout()
+    idle = pool.checkedin()
+    return {
+        'pool_size': pool.size(),
+        'max_overflow': pool.max_overflow(),
+        'timeout_seconds': pool.timeout(),
+        'connections': in_use + idle,
+        'in_use': in_use,
+        'idle': idle,
+        'overflow': max(0, pool.overflow()),
+        'checkouts': stats.checkouts,
+        'timeouts': stats.timeouts,
+        'connects': stats.connects,
+        'closes': stats.closes,
+        'invalidations': stats.invalidations,
+        'checkout_wait_seconds': {
+            'sum': round(stats.wait_sum, 6),
+            'max': round(stats.wait_max, 6),
+            'buckets': [{'le': bound, 'count': count} for bound, count in zip(WAIT_BUCKETS, stats.wait_buckets)],
+        },
+    }
@@ -0,0 +1,212 @@
+"""
+Profile served by GET /me
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Load a student's profile (user, student, units and their courses) or a lecturer's (user, lecturer,
+  courses and their units) with one outer-join select
+- Cache the serialized JSON per user in each worker, stamped with users.profile_version; a request then
+  costs one primary key read for the stamp, and a matching If-None-Match gets 304 Not Modified
+- profile_version only ever goes up: touch_courses/touch_units bump the owning lecturer and every enrolled
+  student when a course or unit is created, edited or deleted, and touch_users the student whose enrolments
+  change, in the transaction of the change; the stamp of every affected profile changes in every worker at once
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from sqlalchemy import select, update, union
+
+from .models import db, User, Student, Lecturer, Course, Unit, student_units
+
+UNIT_COLUMNS = (
+    Unit.id.label('unit_id'), Unit.unit_code, Unit.unit_name, Unit.level,
+    Unit.semester, Unit.course_id, Unit.unique_join_code,
+)
+USER_COLUMNS = (User.id, User.email, User.profile_version)
+
+
+class ProfileCache:
+    """Thread-safe LRU of (user_id, role) -> (stamp, etag, serialized profile)."""
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, stamp):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stamp:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def put(self, key, stamp, etag, body):
+        with self._lock:
+            self._entries[key] = (stamp, etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+profile_cache = ProfileCache()
+
+
+def profile_etag(user_id, role, stamp):
+    return hashlib.sha1(f"{user_id}:{role}:{stamp}".encode('utf-8')).hexdigest()
+
+
+def _unit(row):
+    return {
+        'id': row.unit_id,
+        'unit_code': row.unit_code,
+        'unit_name': row.unit_name,
+        'level': row.level,
+        'semester': row.semester,
+        'course_id': row.course_id,
+        'unique_join_code': row.unique_join_code,
+    }
+
+
+def _student_profile(user_id, role):
+    rows = db.session.execute(
+        select(
+            *USER_COLUMNS, Student.id.label('student_id'), Student.reg_number,
+            Student.firstname, Student.surname, Student.othernames,
+            *UNIT_COLUMNS, Course.id.label('course_ref'), Course.name.label('course_name')
+        )
+        .select_from(User)
+        .outerjoin(Student, Student.user_id == User.id)
+        .outerjoin(student_units, student_units.c.student_id == Student.id)
+        .outerjoin(Unit, Unit.id == student_units.c.unit_id)
+        .outerjoin(Course, Course.id == Unit.course_id)
+        .where(User.id == user_id)
+        .order_by(Unit.unit_code, Unit.id)
+    ).all()
+    if not rows:
+        return None, None, 'User not found'
+    first = rows[0]
+    if first.student_id is None:
+        return None, None, 'Student not found'
+
+    units, courses_by_id = [], {}
+    for row in rows:
+        if row.unit_id is None:
+            continue
+        units.append(_unit(row))
+        # distinct courses of the student's units
+        if row.course_ref is not None and row.course_ref not in courses_by_id:
+            courses_by_id[row.course_ref] = {'id': row.course_ref, 'name': row.course_name}
+
+    return {
+        'id'           : first.id,
+        'email'        : first.email,
+        'role'         : role,
+        'reg_number'   : first.reg_number,
+        'name'         : first.firstname,
+        'surname'      : first.surname,
+        'othernames'   : first.othernames,
+        'courses'      : list(courses_by_id.values()),
+        'units'        : units
+    }, first.profile_version, None
+
+
+def _lecturer_profile(user_id, role):
+    rows = db.session.execute(
+        select(
+            *USER_COLUMNS, Lecturer.id.label('lecturer_id'), Lecturer.firstname,
+            Lecturer.surname, Lecturer.othernames,
+            Course.id.label('course_ref'), Course.code, Course.name, Course.department, Course.school,
+            *UNIT_COLUMNS
+        )
+        .select_from(User)
+        .outerjoin(Lecturer, Lecturer.user_id == User.id)
+        .outerjoin(Course, Course.created_by == User.id)
+        .outerjoin(Unit, Unit.course_id == Course.id)
+        .where(User.id == user_id)
+        .order_by(Course.code, Course.id, Unit.unit_code, Unit.id)
+    ).all()
+    if not rows:
+        return None, None, 'User not found'
+    first = rows[0]
+    if first.lecturer_id is None:
+        return None, None, 'Lecturer not found'
+
+    courses = {}
+    for row in rows:
+        if row.course_ref is None:
+            continue
+        course = courses.get(row.course_ref)
+        if course is None:
+            # same shape as Course.to_dict()
+            course = courses[row.course_ref] = {
+                'id': row.course_ref, 'code': row.code, 'name': row.name,
+                'department': row.department, 'school': row.school, 'units': []
+            }
+        if row.unit_id is not None:
+            course['units'].append(_unit(row))
+
+    return {
+        'id'         : first.id,
+        'email'      : first.email,
+        'role'       : role,
+        'name'       : first.firstname,
+        'surname'    : first.surname,
+        'othernames' : first.othernames,
+        'courses'    : list(courses.values())
+    }, first.profile_version, None
+
+
+def _user_profile(user_id, role):
+    row = db.session.execute(select(*USER_COLUMNS).where(User.id == user_id)).first()
+    if row is None:
+        return None, None, 'User not found'
+    return {'id': row.id, 'email': row.email, 'role': role}, row.profile_version, None
+
+
+def load_profile(user_id, role):
+    """(profile, stamp, error) with one statement; error is the 404 message when the profile is missing."""
+    if role == 'student':
+        return _student_profile(user_id, role)
+    if role == 'lecturer':
+        return _lecturer_profile(user_id, role)
+    return _user_profile(user_id, role)
+
+
+def profile_stamp(user_id):
+    """profile_version of the user the cached profile was built for; None when the user is gone."""
+    return db.session.execute(select(User.profile_version).where(User.id == user_id)).scalar()
+
+
+# --- invalidation: call in the transaction of the change, before deleting rows and after adding them ---
+
+def touch_users(user_ids):
+    """Bump profile_version; user_ids: a list or a select of user ids."""
+    db.session.execute(
+        update(User).where(User.id.in_(user_ids)).values(profile_version=User.profile_version + 1),
+        execution_options={'synchronize_session': False}
+    )
+
+
+def touch_units(unit_ids):
+    """A unit was created, edited or is about to be deleted: its course's lecturer and its students."""
+    touch_users(union(
+        select(Course.created_by).join(Unit, Unit.course_id == Course.id).where(Unit.id.in_(unit_ids)),
+        select(Student.user_id)
+        .join(student_units, student_units.c.student_id == Student.id)
+        .where(student_units.c.unit_id.in_(unit_ids)),
+    ))
+
+
+def touch_courses(course_ids):
+    """A course was created, edited or is about to be deleted: its lecturer and the students of its units."""
+    touch_users(union(
+        select(Course.created_by).where(Course.id.in_(course_ids)),
+        select(Student.user_id)
+        .join(student_units, student_units.c.student_id == Student.id)
+        .join(Unit, Unit.id == student_units.c.unit_id)
+        .where(Unit.course_id.in_(course_ids)),
+    ))
@@ -0,0 +1,181 @@
+"""
+Bulk student account provisioning
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Validate a roster (reg_number, email, firstname, surname, optional othernames and password) and skip rows
+  that are invalid, repeated in the file or already registered (two IN queries)
+- Hash the passwords in a process pool so that every core works on them (hashing dominates the run time)
+- Insert User, Student and, when a unit is given, student_units rows in batched transactions
+- Queue a welcome email per created account on the outbox
+"""
+
+import os
+import time
+import uuid
+import logging
+import multiprocessing
+from functools import partial
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from .models import db, User, Student, student_units
+from .passwords import current_method
+from .utils import (
+    hashing_password, is_valid_institution_email, generate_temporary_password, send_provisioned_account_email
+)
+from .rosters import RosterError, reg_number_column
+
+logger = logging.getLogger(__name__)
+
+# column lengths of users.email, students.reg_number and the student name columns
+MAX_LENGTHS = {'email': 120, 'reg_number': 30, 'firstname': 50, 'surname': 50, 'othernames': 50}
+
+
+def hash_passwords(passwords, workers, min_pool_size):
+    """Hashes in input order; a process pool is only started for more than min_pool_size passwords."""
+    if workers <= 1 or len(passwords) <= min_pool_size:
+        return [hashing_password(password) for password in passwords]
+    # spawn, not fork: forking a threaded gunicorn worker can copy locks held by other threads
+    context = multiprocessing.get_context('spawn')
+    workers = min(workers, len(passwords))
+    # the method is passed along because spawned processes do not run create_app
+    hash_one = partial(hashing_password, method=current_method())
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(hash_one, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def _validate(frame):
+    """(rows to create, skipped rows) from the roster; both carry the file row number."""
+    if 'reg_number' not in frame.columns:
+        frame = frame.rename(columns={reg_number_column(frame): 'reg_number'})
+    missing = [column for column in ('email', 'firstname', 'surname') if column not in frame.columns]
+    if missing:
+        raise RosterError(f"Missing required columns: {', '.join(missing)}")
+
+    candidates, skipped = [], []
+    seen_emails, seen_reg_numbers = set(), set()
+    for index, record in enumerate(frame.to_dict('records')):
+        row = {
+            'row': index + 2,  # 1-based, after the header line
+            'reg_number': record['reg_number'],
+            'email': record['email'].lower(),
+            'firstname': record['firstname'],
+            'surname': record['surname'],
+            'othernames': record.get('othernames') or None,
+            'password': record.get('password') or None,
+        }
+        reason = None
+        if not row['reg_number'] or not row['email'] or not row['firstname'] or not row['surname']:
+            reason = 'reg_number, email, firstname and surname are required'
+        elif not is_valid_institution_email(row['email']):
+            reason = 'email is not a valid institutional email address'
+        elif any(len(row[field] or '') > length for field, length in MAX_LENGTHS.items()):
+            reason = 'a value is longer than its column allows'
+        elif row['email'] in seen_emails or row['reg_number'] in seen_reg_numbers:
+            reason = 'repeated in the file'
+        if reason:
+            skipped.append({'row': row['row'], 'reg_number': row['reg_number'], 'email': row['email'], 'reason': reason})
+            continue
+        seen_emails.add(row['email'])
+        seen_reg_numbers.add(row['reg_number'])
+        candidates.append(row)
+
+    # accounts that already exist: one IN query per unique column
+    existing_emails = {
+        email for (email,) in db.session.query(User.email).filter(User.email.in_(seen_emails))
+    } if seen_emails else set()
+    existing_reg_numbers = {
+        reg for (reg,) in db.session.query(Student.reg_number).filter(Student.reg_number.in_(seen_reg_numbers))
+    } if seen_reg_numbers else set()
+
+    rows = []
+    for row in candidates:
+        if row['email'] in existing_emails or row['reg_number'] in existing_reg_numbers:
+            skipped.append({'row': row['row'], 'reg_number': row['reg_number'], 'email': row['email'],
+                            'reason': 'already registered'})
+        else:
+            rows.append(row)
+    return rows, skipped
+
+
+def _insert_batch(batch, unit_id, now):
+    users = [{'id': row['user_id'], 'email': row['email'], 'password': row['hash'], 'role': 'student',
+              'created_at': now, 'updated_at': now} for row in batch]
+    students = [{'id': row['student_id'], 'user_id': row['user_id'], 'reg_number': row['reg_number'],
+                 'firstname': row['firstname'], 'surname': row['surname'], 'othernames': row['othernames'],
+                 'hobbies': []} for row in batch]
+    db.session.execute(insert(User), users)
+    db.session.execute(insert(Student), students)
+    if unit_id:
+        db.session.execute(insert(student_units), [{'student_id': row['student_id'], 'unit_id': unit_id} for row in batch])
+
+
+def provision_students(frame, config, unit_id=None, send_email=True):
+    """Create student accounts for the roster rows; returns a summary of created, skipped and failed rows."""
+    rows, skipped = _validate(frame)
+
+    for row in rows:
+        row['generated_password'] = row['password'] is None
+        if row['generated_password']:
+            row['password'] = generate_temporary_password()
+        row['user_id'] = str(uuid.uuid4())
+        row['student_id'] = str(uuid.uuid4())
+
+    started = time.perf_counter()
+    hashes = hash_passwords(
+        [row['password'] for row in rows],
+        config.get('PROVISION_HASH_WORKERS') or os.cpu_count() or 1,
+        config.get('PROVISION_POOL_MIN_PASSWORDS', 8)
+    )
+    hash_seconds = time.perf_counter() - started
+    for row, hashed in zip(rows, hashes):
+        row['hash'] = hashed
+
+    # one transaction per batch; a batch that hits an account registered meanwhile is retried row by row
+    batch_size = config.get('PROVISION_BATCH_SIZE', 500)
+    now = datetime.now(timezone.utc)
+    created, failed = [], []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            _insert_batch(batch, unit_id, now)
+            db.session.commit()
+            created.extend(batch)
+            continue
+        except IntegrityError:
+            db.session.rollback()
+        for row in batch:
+            try:
+                _insert_batch([row], unit_id, now)
+                db.session.commit()
+                created.append(row)
+            except IntegrityError:
+                db.session.rollback()
+                failed.append({'row': row['row'], 'reg_number': row['reg_number'], 'email': row['email'],
+                               'reason': 'registered while the roster was being imported'})
+
+    queued = 0
+    if send_email:
+        for row in created:
+            queued += send_provisioned_account_email(
+                row['email'], row['firstname'], row['surname'],
+                row['password'] if row['generated_password'] else None
+            )
+
+    logger.info(
+        f"[PROVISION] Created {len(created)} students, skipped {len(skipped)}, failed {len(failed)} - "
+        f"Hashing: {hash_seconds:.2f}s"
+    )
+    return {
+        'rows': len(frame),
+        'created': len(created),
+        'enrolled': len(created) if unit_id else 0,
+        'skipped': len(skipped),
+        'failed': len(failed),
+        'emails_queued': queued,
+        'skipped_rows': sorted(skipped, key=lambda item: item['row']),
+        'failed_rows': failed,
+    }
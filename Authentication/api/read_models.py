@@ -0,0 +1,59 @@
+"""
+Read models for lecturer listing endpoints
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Core select() queries returning only the needed columns as Row tuples
+  (no ORM identity map, no relationship loaders)
+- Student listings with their units, in the same shape as Student.to_dict()
+"""
+
+from sqlalchemy import select
+
+from .models import db, Student, Unit, Course, student_units
+
+STUDENT_COLUMNS = (
+    Student.id, Student.user_id, Student.reg_number, Student.firstname,
+    Student.surname, Student.othernames, Student.hobbies,
+)
+UNIT_COLUMNS = (
+    Unit.id, Unit.unit_code, Unit.unit_name, Unit.level,
+    Unit.semester, Unit.course_id, Unit.unique_join_code,
+)
+
+
+def _students_with_units(student_ids):
+    """
+    Students whose id is in the student_ids subquery, with their units.
+    Two queries; the subquery is reused instead of sending a long IN list back to the database.
+    """
+    students = db.session.execute(select(*STUDENT_COLUMNS).where(Student.id.in_(student_ids))).all()
+    if not students:
+        return []
+
+    units_by_student = {}
+    for row in db.session.execute(
+        select(student_units.c.student_id, *UNIT_COLUMNS)
+        .join(Unit, Unit.id == student_units.c.unit_id)
+        .where(student_units.c.student_id.in_(student_ids))
+    ).mappings():
+        unit = dict(row)
+        units_by_student.setdefault(unit.pop('student_id'), []).append(unit)
+
+    return [dict(row._asdict(), units=units_by_student.get(row.id, [])) for row in students]
+
+
+def lecturer_students(lecturer_id):
+    """Students enrolled in any unit of a course created by the lecturer."""
+    return _students_with_units(
+        select(student_units.c.student_id)
+        .join(Unit, Unit.id == student_units.c.unit_id)
+        .join(Course, Course.id == Unit.course_id)
+        .where(Course.created_by == lecturer_id)
+    )
+
+
+def unit_students(unit_id):
+    """Students enrolled in a unit."""
+    return _students_with_units(
+        select(student_units.c.student_id).where(student_units.c.unit_id == unit_id)
+    )
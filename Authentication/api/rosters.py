@@ -0,0 +1,59 @@
+"""
+Roster files uploaded by lecturers
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Read a CSV or Excel (.xlsx) upload into a DataFrame of stripped strings with normalised column names
+  (e.g. "Reg. Number" -> reg_number)
+- Find the registration number column under its usual header names
+"""
+
+import os
+
+import pandas as pd
+
+ROSTER_EXTENSIONS = ('.csv', '.xlsx')
+
+# accepted headers of the registration number column, after normalisation
+REG_NUMBER_COLUMNS = (
+    'reg_number', 'reg_no', 'regno', 'registration_number', 'registration_no',
+    'admission_number', 'admission_no', 'adm_no',
+)
+
+
+class RosterError(ValueError):
+    """The upload cannot be used as a roster; the message is safe to return to the client."""
+
+
+def normalise_column(name):
+    return '_'.join(str(name).strip().lower().replace('.', ' ').replace('-', ' ').split())
+
+
+def read_roster(file, max_rows):
+    """DataFrame of the uploaded roster, every cell a stripped string ('' when empty)."""
+    extension = os.path.splitext(file.filename or '')[1].lower()
+    if extension not in ROSTER_EXTENSIONS:
+        raise RosterError(f"Unsupported file type '{extension}'. Upload one of: {', '.join(ROSTER_EXTENSIONS)}")
+
+    try:
+        if extension == '.csv':
+            frame = pd.read_csv(file.stream, dtype=str, keep_default_na=False, skip_blank_lines=True)
+        else:
+            frame = pd.read_excel(file.stream, dtype=str, keep_default_na=False)
+    except Exception as e:
+        raise RosterError(f'Could not read the roster file: {e}')
+
+    if len(frame) > max_rows:
+        raise RosterError(f'The roster has {len(frame)} rows; at most {max_rows} can be imported at once')
+
+    frame.columns = [normalise_column(column) for column in frame.columns]
+    return frame.apply(lambda column: column.astype(str).str.strip())
+
+
+def reg_number_column(frame):
+    """Name of the registration number column."""
+    for column in REG_NUMBER_COLUMNS:
+        if column in frame.columns:
+            return column
+    raise RosterError(
+        f"No registration number column found. Name the column one of: {', '.join(REG_NUMBER_COLUMNS)}"
+    )
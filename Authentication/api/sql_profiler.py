@@ -0,0 +1,196 @@
+"""
+Opt-in SQL profiler (SQL_PROFILING=True)
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Time every statement with the SQLAlchemy before/after_cursor_execute events
+- Per request: statement count, total DB time, the slowest statements and the most repeated statement
+  (a high repeat count usually means an N+1 loop)
+- Add a Server-Timing header (db, app) to every response
+- Log one JSON line per request and append statements slower than SLOW_QUERY_MS to SLOW_QUERY_LOG,
+  including those run by background threads
+- count_queries(engine): statements, rows (Postgres only) and DB time of a block, used by benchmarks/query_counts.py
+Parameters are never logged, only the SQL text.
+Authentication/api/sql_profiler.py and backend/api/sql_profiler.py are the same file (each service is built
+from its own folder): change both together.
+"""
+
+import os
+import json
+import time
+import heapq
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('sql_profiler')
+slow_logger = logging.getLogger('sql_profiler.slow')
+
+# longest SQL text written to the logs
+MAX_STATEMENT_LENGTH = 2000
+
+_settings = {'slow_seconds': 0.2}
+
+
+class RequestProfile:
+    """Statements run while serving one request."""
+
+    def __init__(self, top):
+        self.top = top
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest = []  # min-heap of (seconds, order, statement)
+        self.statements = Counter()
+        self.started = time.perf_counter()
+
+    def add(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+        entry = (seconds, self.count, statement)
+        if len(self.slowest) < self.top:
+            heapq.heappush(self.slowest, entry)
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def summary(self):
+        repeated = self.statements.most_common(1)
+        return {
+            'queries': self.count,
+            'distinct_queries': len(self.statements),
+            'db_ms': round(self.seconds * 1000, 2),
+            'most_repeated': {'count': repeated[0][1], 'statement': repeated[0][0][:MAX_STATEMENT_LENGTH]} if repeated else None,
+            'slowest': [
+                {'ms': round(seconds * 1000, 2), 'statement': statement[:MAX_STATEMENT_LENGTH]}
+                for seconds, _, statement in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+
+class QueryCounter:
+    """
+    Accumulates statement count, rows fetched and time spent in the database.
+    rows comes from cursor.rowcount, which only psycopg2 sets for SELECT; it is None once a SELECT ran on a
+    driver that reports -1 (SQLite), rather than a count that silently leaves those rows out.
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+        self.db_time = 0.0
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.db_time += time.perf_counter() - conn.info['query_start_time'].pop()
+        self.statements += 1
+        if cursor.description is None or self.rows is None:
+            return
+        if cursor.rowcount < 0:
+            self.rows = None
+        else:
+            self.rows += cursor.rowcount
+
+
+@contextmanager
+def count_queries(engine):
+    """Count the statements run on `engine` inside the block, whether or not SQL_PROFILING is on."""
+    counter = QueryCounter()
+    event.listen(engine, 'before_cursor_execute', counter.before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', counter.after_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter.before_cursor_execute)
+        event.remove(engine, 'after_cursor_execute', counter.after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._profile_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_profile_start', None)
+    if start is None:
+        return
+    seconds = time.perf_counter() - start
+    in_request = has_request_context()
+    profile = g.get('sql_profile') if in_request else None
+    if profile is not None:
+        profile.add(statement, seconds)
+    if seconds >= _settings['slow_seconds']:
+        slow_logger.info(json.dumps({
+            'event': 'slow_query',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'ms': round(seconds * 1000, 2),
+            'method': request.method if in_request else None,
+            'route': _route() if in_request else None,
+            'request_id': g.get('trace_id') if in_request else None,
+            'executemany': executemany,
+            'statement': statement[:MAX_STATEMENT_LENGTH],
+        }))
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule is not None else request.path
+
+
+def install(app):
+    """Profile the app's SQL when SQL_PROFILING is enabled (no-op otherwise)."""
+    if not app.config.get('SQL_PROFILING'):
+        return
+
+    _settings['slow_seconds'] = app.config.get('SLOW_QUERY_MS', 200) / 1000.0
+    top = app.config.get('SQL_PROFILE_TOP', 3)
+
+    slow_log = app.config.get('SLOW_QUERY_LOG', 'logs/slow_queries.log')
+    if not slow_logger.handlers:
+        os.makedirs(os.path.dirname(slow_log) or '.', exist_ok=True)
+        handler = RotatingFileHandler(slow_log, maxBytes=10 * 1024 * 1024, backupCount=5)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        slow_logger.addHandler(handler)
+        slow_logger.setLevel(logging.INFO)
+        slow_logger.propagate = False
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_sql_profile():
+        g.sql_profile = RequestProfile(top)
+
+    @app.after_request
+    def report_sql_profile(response):
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+        total_ms = (time.perf_counter() - profile.started) * 1000
+        summary = profile.summary()
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={summary["db_ms"]};desc="{profile.count} queries", app;dur={total_ms:.2f}'
+        )
+        logger.info(json.dumps({
+            'event': 'sql_profile',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'method': request.method,
+            'route': _route(),
+            'status': response.status_code,
+            'request_id': g.get('trace_id'),
+            'total_ms': round(total_ms, 2),
+            **summary,
+        }))
+        return response
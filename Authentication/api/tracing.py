@@ -0,0 +1,336 @@
+"""
+Request tracing
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Continue the W3C trace context sent by the gateway (traceparent, or X-Request-ID when there is none)
+  and echo the trace id back in the X-Request-ID response header
+- One server span per request with child spans for SQL statements, file I/O and LLM calls
+- propagation_headers() for calls to other services (traceparent and X-Request-ID)
+- Export finished spans in the OTLP/JSON format from a background thread, to a file (TRACE_FILE)
+  or an OTLP/HTTP collector (OTEL_EXPORTER_OTLP_ENDPOINT); nothing is recorded when neither is set
+- The sampling decision comes from the incoming traceparent flags, or TRACE_SAMPLE_RATIO for a new trace, and is
+  passed on unchanged whether or not this service exports, so a hop without an exporter does not drop the
+  spans of the services behind it
+- Add the trace id to every log record as %(request_id)s (the X-Request-ID value)
+api-gateway/api/tracing.py, Authentication/api/tracing.py and backend/api/tracing.py are the same file (each
+service is built from its own folder): change all three together.
+"""
+
+import os
+import re
+import json
+import time
+import queue
+import random
+import logging
+import threading
+import urllib.request
+from contextlib import contextmanager
+
+from flask import g, request, has_request_context
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_RE = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+TRACE_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# longest SQL text kept on a span
+MAX_STATEMENT_LENGTH = 1000
+
+
+class Span:
+    """A timed operation; ids are lowercase hex as in traceparent."""
+
+    def __init__(self, name, trace_id, parent_id=None, kind=SPAN_KIND_INTERNAL, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def finish(self, error=None):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f'{type(error).__name__}: {error}'
+
+    def to_otlp(self):
+        data = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns or time.time_ns()),
+            'attributes': [_otlp_attribute(key, value) for key, value in self.attributes.items() if value is not None],
+        }
+        if self.parent_id:
+            data['parentSpanId'] = self.parent_id
+        if self.error:
+            data['status'] = {'code': 2, 'message': self.error}
+        return data
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+class _Trace:
+    """
+    Trace state of the current request, kept on flask.g.
+    sampled is the decision propagated downstream; recording is whether this service keeps spans
+    (sampled and an exporter is configured).
+    """
+
+    def __init__(self, trace_id, parent_id, sampled, recording):
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.recording = recording
+        self.spans = []
+        self.stack = []
+
+    def start_span(self, name, kind=SPAN_KIND_INTERNAL, attributes=None):
+        parent = self.stack[-1].span_id if self.stack else self.parent_id
+        span = Span(name, self.trace_id, parent, kind, attributes)
+        self.spans.append(span)
+        return span
+
+
+class _Exporter:
+    """Batches finished spans and writes them from a daemon thread so requests never wait on export."""
+
+    def __init__(self, service_name, file_path=None, endpoint=None, batch_size=256, interval=2.0):
+        self.service_name = service_name
+        self.file_path = file_path
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue = queue.Queue(maxsize=10000)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        self._ensure_thread()
+        for span in spans:
+            try:
+                self._queue.put_nowait(span)
+            except queue.Full:
+                return  # drop spans rather than slow requests down
+
+    def _ensure_thread(self):
+        # started lazily so that each gunicorn worker gets its own thread after the fork
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                logger.warning(f"[TRACING] export of {len(batch)} spans failed: {e}")
+
+    def _payload(self, spans):
+        return {'resourceSpans': [{
+            'resource': {'attributes': [_otlp_attribute('service.name', self.service_name)]},
+            'scopeSpans': [{'scope': {'name': 'uamas.tracing'}, 'spans': [s.to_otlp() for s in spans]}],
+        }]}
+
+    def _write(self, spans):
+        body = json.dumps(self._payload(spans), separators=(',', ':'))
+        if self.file_path:
+            with open(self.file_path, 'a', encoding='utf-8') as f:
+                f.write(body + '\n')
+        if self.endpoint:
+            http_request = urllib.request.Request(
+                self.endpoint, data=body.encode('utf-8'), method='POST',
+                headers={'Content-Type': 'application/json'}
+            )
+            with urllib.request.urlopen(http_request, timeout=5) as response:
+                response.read()
+
+
+_exporter = None
+
+
+def _current():
+    if has_request_context():
+        return g.get('trace')
+    return None
+
+
+def current_trace_id():
+    trace = _current()
+    return trace.trace_id if trace is not None else None
+
+
+@contextmanager
+def span(name, attributes=None, kind=SPAN_KIND_INTERNAL):
+    """Child span of the innermost open span of this request (yields None when the request is not recorded)."""
+    trace = _current()
+    if trace is None or not trace.recording:
+        yield None
+        return
+    current = trace.start_span(name, kind, attributes)
+    trace.stack.append(current)
+    try:
+        yield current
+    except Exception as e:
+        current.finish(e)
+        raise
+    finally:
+        trace.stack.remove(current)
+        current.finish()
+
+
+def propagation_headers(parent=None):
+    """traceparent and X-Request-ID headers for a call to another service (empty outside a request)."""
+    trace = _current()
+    if trace is None:
+        return {}
+    if parent is not None:
+        parent_id = parent.span_id
+    elif trace.stack:
+        parent_id = trace.stack[-1].span_id
+    else:
+        parent_id = trace.parent_id or os.urandom(8).hex()
+    flags = '01' if trace.sampled else '00'
+    return {'traceparent': f'00-{trace.trace_id}-{parent_id}-{flags}', 'X-Request-ID': trace.trace_id}
+
+
+def _incoming_context(sample_ratio):
+    """(trace_id, parent_span_id, sampled) from the request headers, or a new trace."""
+    match = TRACEPARENT_RE.match(request.headers.get('traceparent', '').strip().lower())
+    if match and match.group(1) != '0' * 32:
+        return match.group(1), match.group(2), int(match.group(3), 16) & 1 == 1
+    request_id = request.headers.get('X-Request-ID', '').strip().lower().replace('-', '')
+    trace_id = request_id if TRACE_ID_RE.match(request_id) else os.urandom(16).hex()
+    return trace_id, None, random.random() < sample_ratio
+
+
+def instrument_sqlalchemy():
+    """A span for every SQL statement executed while serving a recorded request."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        trace = _current()
+        if trace is None or not trace.recording or context is None:
+            return
+        context._trace_span = trace.start_span('db.query', attributes={
+            'db.system': conn.dialect.name,
+            'db.statement': statement[:MAX_STATEMENT_LENGTH],
+            'db.executemany': executemany,
+        })
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        current = getattr(context, '_trace_span', None)
+        if current is not None:
+            current.set_attribute('db.rowcount', cursor.rowcount if cursor.rowcount >= 0 else None)
+            current.finish()
+
+    def handle_error(exception_context):
+        current = getattr(exception_context.execution_context, '_trace_span', None)
+        if current is not None:
+            current.finish(exception_context.original_exception)
+
+    if not event.contains(Engine, 'before_cursor_execute', before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', after_cursor_execute)
+        event.listen(Engine, 'handle_error', handle_error)
+
+
+def _install_log_record_factory():
+    factory = logging.getLogRecordFactory()
+    if getattr(factory, 'adds_request_id', False):
+        return
+
+    def record_factory(*args, **kwargs):
+        record = factory(*args, **kwargs)
+        record.request_id = current_trace_id() or '-'
+        return record
+
+    record_factory.adds_request_id = True
+    logging.setLogRecordFactory(record_factory)
+
+
+def install(app, service_name):
+    """Trace every request of the app; spans are exported when TRACE_FILE or OTEL_EXPORTER_OTLP_ENDPOINT is set."""
+    global _exporter
+
+    def setting(name, default=None):
+        value = app.config.get(name)
+        if value is None:
+            value = os.getenv(name)
+        return value if value not in (None, '') else default
+
+    file_path = setting('TRACE_FILE')
+    endpoint = setting('OTEL_EXPORTER_OTLP_ENDPOINT')
+    if endpoint and not endpoint.rstrip('/').endswith('/v1/traces'):
+        endpoint = endpoint.rstrip('/') + '/v1/traces'
+    if file_path or endpoint:
+        _exporter = _Exporter(setting('OTEL_SERVICE_NAME', service_name), file_path, endpoint)
+    sample_ratio = float(setting('TRACE_SAMPLE_RATIO', 1.0))
+    _install_log_record_factory()
+
+    @app.before_request
+    def start_trace():
+        trace_id, parent_id, sampled = _incoming_context(sample_ratio)
+        # without an exporter the decision is still passed on; only this service's spans are skipped
+        trace = g.trace = _Trace(trace_id, parent_id, sampled, sampled and _exporter is not None)
+        g.trace_id = trace_id
+        if trace.recording:
+            route = request.url_rule.rule if request.url_rule is not None else request.path
+            root = trace.start_span(f'{request.method} {route}', SPAN_KIND_SERVER, {
+                'http.method': request.method,
+                'http.route': route,
+                'http.target': request.full_path.rstrip('?'),
+            })
+            trace.stack.append(root)
+
+    @app.after_request
+    def add_request_id(response):
+        trace = g.get('trace')
+        if trace is not None:
+            response.headers['X-Request-ID'] = trace.trace_id
+            if trace.spans:
+                trace.spans[0].set_attribute('http.status_code', response.status_code)
+        return response
+
+    @app.teardown_request
+    def finish_trace(exc):
+        trace = g.pop('trace', None)
+        if trace is None or not trace.spans:
+            return
+        trace.spans[0].finish(exc)
+        _exporter.export(trace.spans)
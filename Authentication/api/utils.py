@@ -1,57 +1,40 @@
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_mail import Mail, Message
+from flask_mail import Message
 from flask import current_app
 from dotenv import load_dotenv
 import random
+import secrets
 import string
 import os
 
-load_dotenv()
+from . import passwords, domains
 
-valid_domains = ['uonbi.ac.ke', 'mu.ac.ke', 'ku.ac.ke', 'jkuat.ac.ke', 'egerton.ac.ke', 'maseno.ac.ke', 'mmust.ac.ke',
-                 'tukenya.ac.ke', 'tum.ac.ke', 'dkut.ac.ke', 'chuka.ac.ke', 'karatinauniversity.ac.ke', 'kisiiuniversity.ac.ke',
-                 'mmarau.ac.ke', 'pu.ac.ke', 'seku.ac.ke', 'jooust.ac.ke', 'kibu.ac.ke', 'laikipia.ac.ke', 'mksu.ac.ke', 'must.ac.ke',
-                 'mmu.ac.ke', 'mut.ac.ke', 'embuni.ac.ke', 'uoeld.ac.ke', 'kabianga.ac.ke', 'cuk.ac.ke', 'gau.ac.ke', 'rongovarsity.ac.ke',
-                 'ttu.ac.ke', 'kyu.ac.ke', 'au.ac.ke', 'kafu.ac.ke', 'tmu.ac.ke', 'tharaka.ac.ke', 'ouk.ac.ke', 'ndu.ac.ke', 'buc.ac.ke',
-                 'ksu.ac.ke', 'mnu.ac.ke', 'tuc.ac.ke', 'unika.ac.ke', 'strathmore.edu', 'usiu.ac.ke', 'daystar.ac.ke', 'mku.ac.ke', 'cuea.edu',
-                 'anu.ac.ke', 'spu.ac.ke', 'kabarak.ac.ke', 'kca.ac.ke', 'kemu.ac.ke', 'zetech.ac.ke', 'pacuniversity.ac.ke', 'aiu.ac.ke', 'iuk.ac.ke',
-                 'tangaza.ac.ke', 'ueab.ac.ke', 'umma.ac.ke', 'aku.edu', 'aua.ac.ke', 'east.ac.ke', 'scott.ac.ke', 'kwust.ac.ke', 'kheu.ac.ke',
-                 'lukenyauniversity.ac.ke', 'gluk.ac.ke', 'puea.ac.ke', 'teau.ac.ke', 'amref.ac.ke', 'riarauniversity.ac.ke', 'mua.ac.ke',
-                 'gretsauniversity.ac.ke', 'piu.ac.ke', 'uzimauniversity.ac.ke', 'kenya.ilu.edu', 'riu.ac.ke', 'miuc.ac.ke', 'kgs.ac.ke',
-                 'nairobipoly.ac.ke', 'kisumupoly.ac.ke', 'tenp.ac.ke', 'kabetepolytechnic.ac.ke', 'nyerinationalpoly.ac.ke', 'sigalagalapoly.ac.ke',
-                 'mnp.ac.ke', 'kitalenationalpolytechnic.ac.ke', 'kenyacoastpoly.ac.ke', 'kisiipoly.ac.ke', 'baringonationalpolytechnic.ac.ke',
-                 'nyandaruanationalpoly.ac.ke', 'mawegopoly.ac.ke', 'bumbepoly.ac.ke', 'kerichopoly.ac.ke', 'wotetti.ac.ke', 'kerokatechnical.ac.ke',
-                 'michukitech.ac.ke', 'sikriblinddeaf.ac.ke', 'okametvc.ac.ke', 'gatundusouthtvc.ac.ke', 'sist.ac.ke', 'tonp.ac.ke', 'kgs.ac.ke',
-                 'ndu.ac.ke', 'ndu.ac.ke/niruc', 'ndu.ac.ke/ndc', 'ndu.ac.ke/dchs', 'ipstc.org', 'gmail.com'
-                ]
+load_dotenv()
 
-def hashing_password(password: str) -> str:
+def hashing_password(password: str, method: str = None) -> str:
     """
-    Uses Werkzeug’s PBKDF2+SHA256 to hash the given password.
+    Hashes the given password with the configured PASSWORD_HASH_METHOD (see api/passwords.py),
+    or with `method` when given.
     """
-    return generate_password_hash(password)
+    return passwords.hash_password(password, method)
 
 
 def compare_password(hashed_pwd: str, password: str) -> bool:
     """
-    Verifies a plaintext password against the stored hash.
+    Verifies a plaintext password against the stored hash, whatever method it was made with.
     """
-    return check_password_hash(hashed_pwd, password)
+    return passwords.verify_password(hashed_pwd, password)
 
 
 def is_valid_institution_email(email: str) -> bool:
     """
-    Validates if the email belongs to a recognized educational institution domain.
+    Validates if the email belongs to a recognized educational institution domain (see api/domains.py).
+    Subdomains are accepted too, e.g. student.uonbi.ac.ke.
     """
     try:
-        domain = email.split('@')[1].lower()
-        # check if also for subdomains added to the domain e.g student.uonbi.ac.ke. check for pattern ending with valid domain
-        for valid_domain in valid_domains:
-            if domain == valid_domain or domain.endswith('.' + valid_domain):
-                return True
-        return False
+        domain = email.split('@')[1]
     except IndexError:
         return False
+    return domain in domains.registry()
 
 # JWT token revocation store
 revoked_tokens = set()
@@ -109,20 +92,22 @@ def education_quotes_random_generator():
     index = random.randint(0, len(quotes) - 1)
     return quotes[index]
 
+def queue_email(msg: Message) -> bool:
+    """
+    Puts the message on the app's outbox (api/outbox.py) instead of sending it inside the request.
+    """
+    return current_app.extensions['outbox'].put(msg)
+
 # send notification email to the user after creating an account successfully
 def send_account_creation_email(to_email: str, reciever_fname: str, reciever_lname: str) -> bool:
-    try:
-        quote = education_quotes_random_generator()
-        mail = Mail(current_app)
-        # Control SMTP debugging based on configuration
-        if not current_app.config.get('MAIL_DEBUG', False):
-            # Disable SMTP debugging to prevent verbose output
-            import smtplib
-            smtplib.SMTP.debuglevel = 0
-        msg = Message("Welcome to the IntelliMark!",
-                    sender=os.getenv('MAIL_USERNAME'),
-                    recipients=[to_email])
-        msg.body = f"""
+    """
+    Queues the welcome email on the outbox (api/outbox.py); returns False when it could not be queued.
+    """
+    quote = education_quotes_random_generator()
+    msg = Message("Welcome to the IntelliMark!",
+                sender=os.getenv('MAIL_USERNAME'),
+                recipients=[to_email])
+    msg.body = f"""
     Dear {reciever_lname} {reciever_fname},
 
     Welcome to the IntelliMark! Your account has been created successfully.
@@ -137,57 +122,76 @@ def send_account_creation_email(to_email: str, reciever_fname: str, reciever_lna
     Thank you,
     UAMAS Team
     """
-        mail.send(msg)
-        return True
-    except Exception as e:
-        print(f"Failed to send email: {e}")
-        return False
+    return queue_email(msg)
 
 
 def generate_numeric_code(length: int = 6) -> str:
     return "".join(random.choices(string.digits, k=length))
 
 
-def generate_join_code(length: int = 8) -> str:
-    alphabet = string.ascii_uppercase + string.digits
-    return "".join(random.choices(alphabet, k=length))
+def generate_temporary_password() -> str:
+    """
+    Random password for provisioned accounts; meets the reset-password rules (letter, digit, special character).
+    """
+    return f"{secrets.token_urlsafe(9)}{secrets.randbelow(10)}!"
 
 
-def send_verification_email(to_email: str, verification_code: str) -> bool:
-    try:
-        mail = Mail(current_app)
-        if not current_app.config.get('MAIL_DEBUG', False):
-            import smtplib
-            smtplib.SMTP.debuglevel = 0
-        msg = Message(
-            "IntelliMark Email Verification",
-            sender=os.getenv('MAIL_USERNAME'),
-            recipients=[to_email]
-        )
-        msg.body = (
-            f"Your IntelliMark verification code is: {verification_code}\n\n"
-            "This code will expire in 15 minutes. If you did not request this, "
-            "you can ignore this email."
+# welcome email for accounts created from a roster by a lecturer
+def send_provisioned_account_email(to_email: str, reciever_fname: str, reciever_lname: str, password: str = None) -> bool:
+    """
+    Queues the welcome email of a provisioned account; includes the temporary password when one was generated.
+    """
+    if password:
+        credentials = (
+            f"Your temporary password is: {password}\n"
+            "    Please change it after your first login."
         )
-        mail.send(msg)
-        return True
-    except Exception as e:
-        print(f"Failed to send verification email: {e}")
-        return False
+    else:
+        credentials = "Log in with the password your lecturer gave you."
+    msg = Message("Welcome to the IntelliMark!",
+                sender=os.getenv('MAIL_USERNAME'),
+                recipients=[to_email])
+    msg.body = f"""
+    Dear {reciever_lname} {reciever_fname},
+
+    Your lecturer has created an IntelliMark account for you.
+    You can log in with this email address: {to_email}
+
+    {credentials}
+
+        link: https://intellimark.pages.dev/
+
+    Thank you,
+    UAMAS Team
+    """
+    return queue_email(msg)
+
+
+def send_verification_email(to_email: str, verification_code: str) -> bool:
+    """
+    Queues the verification code email on the outbox; returns False when it could not be queued.
+    """
+    msg = Message(
+        "IntelliMark Email Verification",
+        sender=os.getenv('MAIL_USERNAME'),
+        recipients=[to_email]
+    )
+    msg.body = (
+        f"Your IntelliMark verification code is: {verification_code}\n\n"
+        "This code will expire in 15 minutes. If you did not request this, "
+        "you can ignore this email."
+    )
+    return queue_email(msg)
     
 # # email notification for lecturers password reset by their own request
 def send_password_reset_email(to_email: str, reciever_fname: str, reciever_lname: str) -> bool:
-    try:
-        mail = Mail(current_app)
-        # Control SMTP debugging based on configuration
-        if not current_app.config.get('MAIL_DEBUG', False):
-            # Disable SMTP debugging to prevent verbose output
-            import smtplib
-            smtplib.SMTP.debuglevel = 0
-        msg = Message("IntelliMark Password Reset",
-                    sender=os.getenv('MAIL_USERNAME'),
-                    recipients=[to_email])
-        msg.body = f"""
+    """
+    Queues the password reset confirmation on the outbox; returns False when it could not be queued.
+    """
+    msg = Message("IntelliMark Password Reset",
+                sender=os.getenv('MAIL_USERNAME'),
+                recipients=[to_email])
+    msg.body = f"""
     Dear {reciever_lname} {reciever_fname},
 
     Your password has been reset successfully.
@@ -196,8 +200,4 @@ def send_password_reset_email(to_email: str, reciever_fname: str, reciever_lname
     Thank you,
     UAMAS Team
     """
-        mail.send(msg)
-        return True
-    except Exception as e:
-        print(f"Failed to send email: {e}")
-        return False
+    return queue_email(msg)
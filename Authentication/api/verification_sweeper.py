@@ -0,0 +1,110 @@
+"""
+Expired email verification cleanup
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Delete email_verifications rows whose code expired more than VERIFICATION_SWEEP_GRACE_SECONDS ago
+  (codes are otherwise only removed when the user asks for a new one or registers)
+- Delete in batches of VERIFICATION_SWEEP_BATCH_SIZE rows, one short transaction each, found through the
+  expires_at index; SKIP LOCKED lets the workers of every replica sweep at the same time without waiting
+- A daemon thread per worker sweeps every VERIFICATION_SWEEP_SECONDS (0 turns it off);
+  `flask --app manage sweep-verifications` runs one sweep, e.g. from cron
+"""
+
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+import click
+from sqlalchemy import select, delete
+
+from .models import db, EmailVerification
+
+logger = logging.getLogger(__name__)
+
+
+def sweep_expired(batch_size=500, grace_seconds=3600, pause_seconds=0.05):
+    """Delete expired codes batch by batch; returns the number of rows deleted."""
+    # expires_at is a naive column holding UTC
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=grace_seconds)
+    deleted = 0
+    while True:
+        batch = (
+            select(EmailVerification.id)
+            .where(EmailVerification.expires_at < cutoff)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        try:
+            result = db.session.execute(
+                delete(EmailVerification).where(EmailVerification.id.in_(batch.scalar_subquery())),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+        # let request transactions in between the batches
+        time.sleep(pause_seconds)
+
+
+class VerificationSweeper:
+    def __init__(self, app):
+        self.app = app
+        self.interval = app.config.get('VERIFICATION_SWEEP_SECONDS', 300)
+        self.batch_size = app.config.get('VERIFICATION_SWEEP_BATCH_SIZE', 500)
+        self.grace_seconds = app.config.get('VERIFICATION_SWEEP_GRACE_SECONDS', 3600)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        # started on a request so that each gunicorn worker gets its own thread after the fork
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='verification-sweeper', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        # spread the workers' sweeps over the interval
+        time.sleep(random.uniform(0, self.interval))
+        while True:
+            started = time.perf_counter()
+            try:
+                with self.app.app_context():
+                    deleted = sweep_expired(self.batch_size, self.grace_seconds)
+                if deleted:
+                    logger.info(
+                        f"[SWEEPER] Deleted {deleted} expired verification codes in {time.perf_counter() - started:.2f}s"
+                    )
+            except Exception as e:
+                logger.error(f"[SWEEPER] Sweep of expired verification codes failed - Error: {e}")
+            time.sleep(self.interval)
+
+
+def install(app):
+    """Sweep expired verification codes in the background and register the sweep-verifications command."""
+
+    @app.cli.command('sweep-verifications')
+    def sweep_verifications_command():
+        """Delete expired email verification codes."""
+        deleted = sweep_expired(
+            app.config.get('VERIFICATION_SWEEP_BATCH_SIZE', 500),
+            app.config.get('VERIFICATION_SWEEP_GRACE_SECONDS', 3600)
+        )
+        click.echo(f'Deleted {deleted} expired verification codes')
+
+    if not app.config.get('VERIFICATION_SWEEP_SECONDS', 300):
+        return None
+    sweeper = VerificationSweeper(app)
+    app.extensions['verification_sweeper'] = sweeper
+
+    @app.before_request
+    def start_verification_sweeper():
+        sweeper.ensure_started()
+
+    return sweeper
@@ -12,6 +12,7 @@ from api.lec_routes import lec_blueprint
 from api.utils import hashing_password
 from config import Config
 from api import jwt
+from api import pool_metrics, replica, metrics, tracing, sql_profiler, outbox, passwords, ratelimit, domains, verification_sweeper
 
 def create_app():
     load_dotenv()
@@ -26,7 +27,28 @@ def create_app():
     )
     app.config.from_object(Config)
     jwt.init_app(app)
+    pool_metrics.install(app)
     db.init_app(app)
+    # Keep a client's reads on the primary right after it writes (only with DB_REPLICA_URI)
+    replica.install(app)
+    # Request and DB metrics at GET /metrics
+    metrics.install(app)
+    # Continue the gateway's trace; spans for SQL statements (TRACE_FILE / OTEL_EXPORTER_OTLP_ENDPOINT)
+    tracing.install(app, 'authentication')
+    tracing.instrument_sqlalchemy()
+    # Per-request query count/time, Server-Timing header and slow-query log (only with SQL_PROFILING=True)
+    sql_profiler.install(app)
+    # Verification, welcome and password reset emails are queued and sent by a background thread
+    outbox.install(app)
+    # Hash method for new passwords; /login rehashes stored passwords made with another one
+    passwords.install(app)
+    # Accepted institution email domains, re-read when INSTITUTION_DOMAINS_FILE changes
+    domains.install(app)
+    # Batch-deletes expired email verification codes in the background
+    verification_sweeper.install(app)
+    # Login/registration budgets per IP and per account, checked before any query or password hash.
+    # Requests come through the gateway, so the client address is the last X-Forwarded-For hop.
+    ratelimit.install(app, 'authentication', default_proxy_hops=1)
 
     # /healthcheck endpoint
     @app.route('/api/v1/auth/health', methods=['GET'])
@@ -34,6 +56,11 @@ def create_app():
         """Health check endpoint to verify if the API is running."""
         return jsonify({"status": "ok", "message": "API is running"}), 200
 
+    @app.route('/api/v1/auth/health/db-pool', methods=['GET'])
+    def db_pool_health():
+        """Connection pool gauges and checkout wait times of this worker process."""
+        return jsonify({"pid": os.getpid(), "pools": pool_metrics.snapshot_all(db.engines)}), 200
+
     # Register Blueprints with prefixes
     app.register_blueprint(auth_blueprint, url_prefix='/api/v1/auth')
     app.register_blueprint(lec_blueprint, url_prefix='/api/v1/auth/lecturer')
@@ -0,0 +1,13 @@
+"""
+Benchmarks for the Authentication service.
+They seed and modify the database named by BENCH_DB_URI, which replaces DB_URI
+before the app config is imported. Run them as modules from the Authentication folder,
+e.g. `python3 -m benchmarks.query_counts`.
+"""
+
+import os
+import sys
+
+if not os.getenv('BENCH_DB_URI'):
+    sys.exit('BENCH_DB_URI is not set; refusing to run benchmarks against DB_URI.')
+os.environ['DB_URI'] = os.environ['BENCH_DB_URI']
@@ -9,6 +9,69 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DB_URI')
     SQLALCHEMY_TRACK_MODIFICATIONS = os.getenv('TRACK_MODIFICATIONS', 'False').lower() == 'true'
 
+    # Connection pool per worker process (gunicorn runs 3 workers x 2 threads).
+    # Keep workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW), summed over all services, below Postgres max_connections.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 3)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 2)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'True').lower() in ('true', '1', 't'),
+    }
+
+    # Optional read replica for the lecturer course/unit/student listings (see api/replica.py).
+    # Reads fall back to the primary while the replica lags more than REPLICA_MAX_LAG_SECONDS.
+    DB_REPLICA_URI = os.getenv('DB_REPLICA_URI')
+    SQLALCHEMY_BINDS = {'replica': DB_REPLICA_URI} if DB_REPLICA_URI else {}
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_LAG_CHECK_SECONDS = float(os.getenv('REPLICA_LAG_CHECK_SECONDS', 2))
+
+    # Span export (api/tracing.py): a JSON lines file and/or an OTLP/HTTP collector, e.g. http://localhost:4318
+    TRACE_FILE = os.getenv('TRACE_FILE')
+    OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT')
+    TRACE_SAMPLE_RATIO = float(os.getenv('TRACE_SAMPLE_RATIO', 1.0))
+
+    # Opt-in SQL profiler (api/sql_profiler.py): Server-Timing header, per-request JSON log, slow-query log
+    SQL_PROFILING = os.getenv('SQL_PROFILING', 'False').lower() in ('true', '1', 't')
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+    SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', 'logs/slow_queries.log')
+    SQL_PROFILE_TOP = int(os.getenv('SQL_PROFILE_TOP', 3))
+
+    # Largest roster accepted by POST /lecturer/units/<unit_id>/students/import
+    ENROLMENT_IMPORT_MAX_ROWS = int(os.getenv('ENROLMENT_IMPORT_MAX_ROWS', 5000))
+
+    # Bulk account provisioning (POST /lecturer/students/provision, api/provisioning.py)
+    PROVISION_MAX_ROWS = int(os.getenv('PROVISION_MAX_ROWS', 2000))
+    PROVISION_BATCH_SIZE = int(os.getenv('PROVISION_BATCH_SIZE', 500))                 # rows per transaction
+    PROVISION_HASH_WORKERS = int(os.getenv('PROVISION_HASH_WORKERS', 0)) or None       # hashing processes, default: all cores
+    PROVISION_POOL_MIN_PASSWORDS = int(os.getenv('PROVISION_POOL_MIN_PASSWORDS', 8))   # fewer are hashed in the request thread
+
+    # Password hashing (api/passwords.py): Werkzeug method and cost for new hashes, e.g. scrypt:16384:8:1 or
+    # pbkdf2:sha256:600000. Stored hashes made with another method are replaced on the next successful login.
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_REHASH_ON_LOGIN = os.getenv('PASSWORD_REHASH_ON_LOGIN', 'True').lower() in ('true', '1', 't')
+
+    # Institution email domains (api/domains.py): one per line, re-read within the reload interval after a change
+    INSTITUTION_DOMAINS_FILE = os.getenv('INSTITUTION_DOMAINS_FILE')   # default: api/institution_domains.txt
+    INSTITUTION_DOMAINS_RELOAD_SECONDS = float(os.getenv('INSTITUTION_DOMAINS_RELOAD_SECONDS', 30))
+
+    # Expired email verification codes (api/verification_sweeper.py)
+    VERIFICATION_SWEEP_SECONDS = float(os.getenv('VERIFICATION_SWEEP_SECONDS', 300))            # 0: no background sweeps
+    VERIFICATION_SWEEP_BATCH_SIZE = int(os.getenv('VERIFICATION_SWEEP_BATCH_SIZE', 500))         # rows per transaction
+    VERIFICATION_SWEEP_GRACE_SECONDS = float(os.getenv('VERIFICATION_SWEEP_GRACE_SECONDS', 3600))  # keep "code has expired" answers
+
+    # Key of the join code permutation (api/join_codes.py); defaults to SECRET_KEY
+    JOIN_CODE_KEY = os.getenv('JOIN_CODE_KEY')
+
+    # Rate limits (api/ratelimit.py). Budgets are "requests/seconds" per rule, e.g. RATE_LIMIT_LOGIN_IP='600/60',
+    # RATE_LIMIT_LOGIN_GLOBAL='40/1' (off by default); RATE_LIMIT_REDIS_URL shares the counters between workers.
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True').lower() in ('true', '1', 't')
+    RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL')
+    RATE_LIMIT_PROXY_HOPS = int(os.getenv('RATE_LIMIT_PROXY_HOPS', 1))    # proxies in front of this service
+
+    # Bearer token required by GET /metrics; /metrics is disabled (404) without it
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
     # Secrets
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
     SECRET_KEY = os.getenv('SECRET_KEY')
@@ -37,3 +100,12 @@ class Config:
     MAIL_USE_TLS = os.getenv("MAIL_USE_TLS", "True").lower() in ("true", "1", "t")
     MAIL_USE_SSL = os.getenv("MAIL_USE_SSL", "False").lower() in ("true", "1", "t")
     MAIL_DEBUG = os.getenv("MAIL_DEBUG", "False").lower() in ("true", "1", "t")
+
+    # Outbox (api/outbox.py): mail is queued by the request and sent by a background thread per worker
+    MAIL_MAX_EMAILS = int(os.getenv("MAIL_MAX_EMAILS")) if os.getenv("MAIL_MAX_EMAILS") else None  # per SMTP session
+    MAIL_OUTBOX_SIZE = int(os.getenv("MAIL_OUTBOX_SIZE", 10000))
+    MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", 50))
+    MAIL_IDLE_SECONDS = float(os.getenv("MAIL_IDLE_SECONDS", 30))
+    MAIL_MAX_RETRIES = int(os.getenv("MAIL_MAX_RETRIES", 5))
+    MAIL_RETRY_BACKOFF_SECONDS = float(os.getenv("MAIL_RETRY_BACKOFF_SECONDS", 2))
+    MAIL_SHUTDOWN_SECONDS = float(os.getenv("MAIL_SHUTDOWN_SECONDS", 10))
@@ -0,0 +1,24 @@
+"""
+Gunicorn server hooks (gunicorn loads ./gunicorn.conf.py by default)
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Empty PROMETHEUS_MULTIPROC_DIR on start so /metrics does not add up the counters of a previous run
+- Drop the live gauges of exited workers
+"""
+
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+
+def on_starting(server):
+    path = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,36 @@
+"""add email verification indexes
+
+Revision ID: 5b9e1c7a3d20
+Revises:
+Create Date: 2026-10-19 07:52:10.406318
+
+First revision of the Authentication service; it is recorded in
+alembic_version_auth (see migrations/env.py) next to the backend's revisions.
+Tables are still bootstrapped with db.create_all() in manage.py, so indexes
+are created with if_not_exists.
+
+The (email, role, created_at) index replaces the single-column email index:
+every lookup filters on email and role.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b9e1c7a3d20'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_email_verifications_email_role_created', 'email_verifications',
+                    ['email', 'role', 'created_at'], if_not_exists=True)
+    op.create_index('ix_email_verifications_expires_at', 'email_verifications', ['expires_at'], if_not_exists=True)
+    op.drop_index('ix_email_verifications_email', table_name='email_verifications', if_exists=True)
+
+
+def downgrade():
+    op.create_index('ix_email_verifications_email', 'email_verifications', ['email'], if_not_exists=True)
+    op.drop_index('ix_email_verifications_expires_at', table_name='email_verifications', if_exists=True)
+    op.drop_index('ix_email_verifications_email_role_created', table_name='email_verifications', if_exists=True)
@@ -0,0 +1,29 @@
+"""add unit join code sequence
+
+Revision ID: 9d3f6b2e8a41
+Revises: 5b9e1c7a3d20
+Create Date: 2026-10-19 08:14:37.552019
+
+Counter behind the permuted unit join codes (api/join_codes.py). Existing
+units keep their random codes; the unique constraint on units.unique_join_code
+stays and a new code that happens to match one is retried.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3f6b2e8a41'
+down_revision = '5b9e1c7a3d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.supports_sequences:
+        op.execute(sa.schema.CreateSequence(sa.Sequence('unit_join_code_seq'), if_not_exists=True))
+
+
+def downgrade():
+    if op.get_bind().dialect.supports_sequences:
+        op.execute(sa.schema.DropSequence(sa.Sequence('unit_join_code_seq'), if_exists=True))
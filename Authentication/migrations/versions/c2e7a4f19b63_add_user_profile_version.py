@@ -0,0 +1,29 @@
+"""add profile_version to users
+
+Revision ID: c2e7a4f19b63
+Revises: 9d3f6b2e8a41
+Create Date: 2026-10-19 09:31:05.817442
+
+The /me cache stamp (api/profile.py): bumped on every change to the user's
+profile, so unlike a timestamp or a count it never repeats an earlier value.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e7a4f19b63'
+down_revision = '9d3f6b2e8a41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # manage.py runs db.create_all() before the upgrade, so a new database already has the column
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('users')}
+    if 'profile_version' not in columns:
+        op.add_column('users', sa.Column('profile_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('users', 'profile_version')
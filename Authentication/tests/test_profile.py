@@ -0,0 +1,138 @@
+"""
+GET /me profile cache: every course or unit change must reach the cached profile
+"""
+
+import unittest
+
+from support import ServiceTestCase
+from api import db
+from api.models import User, Lecturer, Student, Course, Unit
+
+
+class ProfileCacheTest(ServiceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        lecturer = User(email='lecturer@example.com', password='x', role='lecturer')
+        student = User(email='student@example.com', password='x', role='student')
+        db.session.add_all([lecturer, student])
+        db.session.flush()
+        db.session.add(Lecturer(user_id=lecturer.id, firstname='Lec', surname='Turer'))
+        course = Course(code='OLD', name='Old', department='CS', school='SCI', created_by=lecturer.id)
+        db.session.add(course)
+        db.session.flush()
+        unit = Unit(unit_code='U1', unit_name='Unit One', level=1, semester=1, course_id=course.id, unique_join_code='JOIN0001')
+        db.session.add(unit)
+        db.session.flush()
+        enrolled = Student(user_id=student.id, reg_number='REG/1', firstname='Stu', surname='Dent', hobbies=[])
+        enrolled.units.append(unit)
+        db.session.add(enrolled)
+        db.session.commit()
+
+        self.course_id, self.unit_id = course.id, unit.id
+        self.lecturer = self.headers(lecturer.id, 'lecturer')
+        self.student = self.headers(student.id, 'student')
+
+    def me(self, headers, etag=None):
+        if etag:
+            headers = dict(headers, **{'If-None-Match': etag})
+        return self.client.get('/api/v1/auth/me', headers=headers)
+
+    def course_names(self, response):
+        return [course['name'] for course in response.get_json()['courses']]
+
+    def unit_names(self, response):
+        return [unit['unit_name'] for course in response.get_json()['courses'] for unit in course['units']]
+
+    def test_repeat_request_is_served_from_cache(self):
+        first = self.me(self.lecturer)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.me(self.lecturer, first.headers['ETag']).status_code, 304)
+
+    def test_replacing_a_course_changes_the_cached_profile(self):
+        before = self.me(self.lecturer)
+        self.assertEqual(self.course_names(before), ['Old'])
+
+        response = self.client.delete(f'/api/v1/auth/lecturer/courses/{self.course_id}', headers=self.lecturer)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/v1/auth/lecturer/courses', headers=self.lecturer,
+                                    json={'name': 'New', 'code': 'NEW', 'department': 'CS', 'school': 'SCI'})
+        self.assertEqual(response.status_code, 201)
+
+        after = self.me(self.lecturer, before.headers['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(self.course_names(after), ['New'])
+        self.assertNotEqual(after.headers['ETag'], before.headers['ETag'])
+
+    def test_creating_and_deleting_a_course_changes_the_cached_profile(self):
+        before = self.me(self.lecturer)
+        response = self.client.post('/api/v1/auth/lecturer/courses', headers=self.lecturer,
+                                    json={'name': 'New', 'code': 'NEW', 'department': 'CS', 'school': 'SCI'})
+        created = self.me(self.lecturer)
+        self.assertEqual(sorted(self.course_names(created)), ['New', 'Old'])
+
+        self.client.delete(f"/api/v1/auth/lecturer/courses/{response.get_json()['course_id']}", headers=self.lecturer)
+        deleted = self.me(self.lecturer)
+        self.assertEqual(self.course_names(deleted), ['Old'])
+        self.assertEqual(len({before.headers['ETag'], created.headers['ETag'], deleted.headers['ETag']}), 3)
+
+    def test_deleting_a_course_changes_the_student_profile(self):
+        before = self.me(self.student)
+        self.assertEqual([course['name'] for course in before.get_json()['courses']], ['Old'])
+
+        self.client.delete(f'/api/v1/auth/lecturer/courses/{self.course_id}', headers=self.lecturer)
+
+        after = self.me(self.student, before.headers['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after.get_json()['courses'], [])
+        self.assertEqual(after.get_json()['units'], [])
+
+    def test_replacing_a_unit_changes_the_cached_profiles(self):
+        lecturer_before, student_before = self.me(self.lecturer), self.me(self.student)
+        self.assertEqual(self.unit_names(lecturer_before), ['Unit One'])
+
+        response = self.client.delete(f'/api/v1/auth/lecturer/units/{self.unit_id}', headers=self.lecturer)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/v1/auth/lecturer/units', headers=self.lecturer, json={
+            'unit_code': 'U2', 'unit_name': 'Unit Two', 'level': 1, 'semester': 1, 'course_id': self.course_id
+        })
+        self.assertEqual(response.status_code, 201)
+
+        lecturer_after = self.me(self.lecturer, lecturer_before.headers['ETag'])
+        self.assertEqual(lecturer_after.status_code, 200)
+        self.assertEqual(self.unit_names(lecturer_after), ['Unit Two'])
+        student_after = self.me(self.student, student_before.headers['ETag'])
+        self.assertEqual(student_after.status_code, 200)
+        self.assertEqual(student_after.get_json()['units'], [])
+
+    def test_editing_a_unit_changes_the_cached_profiles(self):
+        lecturer_before, student_before = self.me(self.lecturer), self.me(self.student)
+
+        response = self.client.put(f'/api/v1/auth/lecturer/units/{self.unit_id}', headers=self.lecturer,
+                                   json={'unit_name': 'Renamed'})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.unit_names(self.me(self.lecturer, lecturer_before.headers['ETag'])), ['Renamed'])
+        student_after = self.me(self.student, student_before.headers['ETag'])
+        self.assertEqual([unit['unit_name'] for unit in student_after.get_json()['units']], ['Renamed'])
+
+    def test_moving_a_unit_changes_both_lecturers_profiles(self):
+        other = User(email='other@example.com', password='x', role='lecturer')
+        db.session.add(other)
+        db.session.flush()
+        db.session.add(Lecturer(user_id=other.id, firstname='Other', surname='Lecturer'))
+        target = Course(code='TGT', name='Target', department='CS', school='SCI', created_by=other.id)
+        db.session.add(target)
+        db.session.commit()
+        other_headers = self.headers(other.id, 'lecturer')
+        owner_before, other_before = self.me(self.lecturer), self.me(other_headers)
+
+        self.client.put(f'/api/v1/auth/lecturer/units/{self.unit_id}', headers=self.lecturer,
+                        json={'course_id': target.id})
+
+        self.assertEqual(self.unit_names(self.me(self.lecturer, owner_before.headers['ETag'])), [])
+        self.assertEqual(self.unit_names(self.me(other_headers, other_before.headers['ETag'])), ['Unit One'])
+
+
+if __name__ == '__main__':
+    unittest.main()
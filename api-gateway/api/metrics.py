@@ -0,0 +1,83 @@
+"""
+Prometheus metrics for the gateway
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Request latency histogram by method, route and status, and requests in flight
+- Upstream (auth/backend) latency by status and upstream errors
+- Requests rejected by each rate limit rule
+- GET /metrics in the Prometheus text format, only with Bearer METRICS_TOKEN (404 while it is unset)
+Under gunicorn set PROMETHEUS_MULTIPROC_DIR so that /metrics aggregates every worker process;
+gunicorn.conf.py clears the directory on start and drops the gauges of exited workers.
+"""
+
+import os
+import hmac
+import time
+
+from flask import g, request, jsonify, Response
+from prometheus_client import (
+    Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to serve a request',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'Requests being served', multiprocess_mode='livesum')
+UPSTREAM_LATENCY = Histogram(
+    'upstream_request_duration_seconds', 'Time for an upstream service to answer a proxied request',
+    ['upstream', 'status'], buckets=LATENCY_BUCKETS
+)
+UPSTREAM_ERRORS = Counter('upstream_errors', 'Proxied requests that got no response', ['upstream', 'error'])
+RATE_LIMITED = Counter('rate_limited_requests', 'Requests rejected by a rate limit rule', ['rule'])
+
+
+def observe_upstream(upstream, start, status=None, error=None):
+    """Record one proxied call: its status, or the exception that prevented a response."""
+    if error is not None:
+        UPSTREAM_ERRORS.labels(upstream, type(error).__name__).inc()
+        status = 'error'
+    UPSTREAM_LATENCY.labels(upstream, str(status)).observe(time.perf_counter() - start)
+
+
+def metrics_view():
+    token = os.getenv('METRICS_TOKEN')
+    if not token:
+        # off unless a token is configured: the gateway port is public
+        return jsonify({'message': 'Metrics are disabled; set METRICS_TOKEN to enable them'}), 404
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def install(app):
+    """Record request metrics for every request of the app and serve them at GET /metrics."""
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.get('metrics_start')
+        if start is None:
+            return response
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_LATENCY.labels(request.method, route, str(response.status_code)).observe(time.perf_counter() - start)
+        return response
+
+    @app.teardown_request
+    def end_request_metrics(exc):
+        if g.pop('metrics_start', None) is not None:
+            REQUESTS_IN_FLIGHT.dec()
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
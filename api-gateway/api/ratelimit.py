@@ -0,0 +1,324 @@
+"""
+Rate limiting for the login and registration routes
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Sliding window counters (current and previous fixed window, the previous one weighted by how much of it
+  still overlaps the window) per client IP, per account (the request's JSON email) and per route for all clients
+- Checked in a before_request hook, so a rejected request costs a dictionary lookup: no password hashing,
+  no query, no email and, at the gateway, no upstream call
+- Every rule of a route is checked before any is counted, so a rejected request spends no budget; login_account
+  counts only failed logins (401), after the response, so nobody can lock a classmate out by posting their email
+- Answer 429 with Retry-After when a client goes over its budget, and 503 when a route's total budget
+  (admission control, off by default) is used up
+- Counters live in each worker process, or in Redis (RATE_LIMIT_REDIS_URL) to share them between workers
+  and hosts; when Redis fails the worker falls back to its own counters
+api-gateway/api/ratelimit.py and Authentication/api/ratelimit.py are the same file (each service is built
+from its own folder): change both together.
+"""
+
+import os
+import math
+import time
+import hashlib
+import logging
+import threading
+
+from flask import request, jsonify, g
+
+from .metrics import RATE_LIMITED
+
+logger = logging.getLogger(__name__)
+
+# (name, path, key, default budget as "requests/seconds"; '' or 0 turns a rule off, counted requests)
+# key: 'ip' per client address, 'account' per JSON email, 'global' one budget for the route
+# counts: 'requests' every request that is let through, 'failures' responses in FAILURE_STATUSES
+# login_ip is sized for an exam hall logging in at once from behind one campus NAT address
+DEFAULT_RULES = (
+    ('login_ip', '/api/v1/auth/login', 'ip', '600/60', 'requests'),
+    ('login_account', '/api/v1/auth/login', 'account', '10/300', 'failures'),
+    ('login_global', '/api/v1/auth/login', 'global', '', 'requests'),
+    ('request_code_ip', '/api/v1/auth/register/request-code', 'ip', '10/600', 'requests'),
+    ('request_code_account', '/api/v1/auth/register/request-code', 'account', '3/600', 'requests'),
+    ('register_ip', '/api/v1/auth/register', 'ip', '20/600', 'requests'),
+    ('register_account', '/api/v1/auth/register', 'account', '10/600', 'requests'),
+    ('reset_password_account', '/api/v1/auth/reset-password', 'account', '5/600', 'requests'),
+)
+
+# responses counted by the 'failures' rules: wrong email or password
+FAILURE_STATUSES = frozenset({401})
+
+# keys kept by the in-process store before stale ones are swept
+MAX_MEMORY_KEYS = 100000
+
+
+class Rule:
+    def __init__(self, name, path, key, limit, window, counts='requests'):
+        self.name = name
+        self.path = path
+        self.key = key
+        self.limit = limit
+        self.window = window
+        self.counts = counts
+
+
+def parse_budget(value):
+    """'30/60' -> (30, 60.0); None when the rule is off."""
+    value = str(value or '').strip()
+    if value in ('', '0', 'off'):
+        return None
+    try:
+        limit, window = value.split('/')
+        limit, window = int(limit), float(window)
+    except ValueError:
+        raise ValueError(f"Invalid rate limit '{value}': use requests/seconds, e.g. 30/60") from None
+    if limit < 1 or window <= 0:
+        raise ValueError(f"Invalid rate limit '{value}': requests and seconds must be positive")
+    return limit, window
+
+
+def _weight(now, window):
+    """(current window index, share of the previous window that still counts)."""
+    index = int(now // window)
+    return index, 1.0 - (now - index * window) / window
+
+
+def retry_after(current, previous, weight, limit, window):
+    """Seconds until one more request fits the budget."""
+    if current + 1 > limit:
+        # wait for the next window, then for this window's count (its new previous) to fade enough
+        return max(1, math.ceil((weight + 1 - (limit - 1) / current) * window))
+    # the previous window's share shrinks linearly over the current window
+    target_weight = (limit - current - 1) / previous
+    return max(1, math.ceil((weight - target_weight) * window))
+
+
+class MemoryStore:
+    """Counters of this worker process: key -> [window index, current count, previous count]."""
+
+    def __init__(self, max_keys=MAX_MEMORY_KEYS):
+        self.max_keys = max_keys
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _counter(self, key, index, now):
+        counter = self._counters.get(key)
+        if counter is None:
+            if len(self._counters) >= self.max_keys:
+                self._sweep(now)
+            counter = self._counters[key] = [index, 0, 0]
+        elif counter[0] != index:
+            counter[2] = counter[1] if counter[0] == index - 1 else 0
+            counter[1] = 0
+            counter[0] = index
+        return counter
+
+    def acquire(self, entries, now):
+        """
+        entries: (key, limit, window, count) per rule. When every rule has room, count the request on the
+        entries with count set and return None; else count nothing and return (position, current, previous,
+        weight) of the first full rule.
+        """
+        with self._lock:
+            counters = []
+            for position, (key, limit, window, count) in enumerate(entries):
+                index, weight = _weight(now, window)
+                counter = self._counter(key, index, now)
+                if counter[2] * weight + counter[1] + 1 > limit:
+                    return position, counter[1], counter[2], weight
+                if count:
+                    counters.append(counter)
+            for counter in counters:
+                counter[1] += 1
+            return None
+
+    def add(self, key, window, now):
+        """Count one event (a failed login) on key."""
+        with self._lock:
+            self._counter(key, _weight(now, window)[0], now)[1] += 1
+
+    def _sweep(self, now):
+        # windows differ per rule, so a key is stale when its last update is two of its windows old
+        stale = [key for key, (index, _, _) in self._counters.items()
+                 if index < int(now // _window_of(key)) - 1]
+        for key in stale:
+            del self._counters[key]
+        if len(self._counters) >= self.max_keys:
+            self._counters.clear()
+
+
+def _window_of(key):
+    return float(key.rsplit(':', 1)[1])
+
+
+class RedisStore:
+    """Counters shared by every worker and host that uses the same Redis; needs the redis package."""
+
+    # KEYS: current and previous window of each rule; ARGV: weight, limit, ttl and count flag of each rule.
+    # Checks every rule, then increments only when all of them fit, so a rejected request spends no budget.
+    SCRIPT = """
+    local rules = #KEYS / 2
+    for i = 1, rules do
+        local current = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+        local previous = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+        if previous * tonumber(ARGV[4 * i - 3]) + current + 1 > tonumber(ARGV[4 * i - 2]) then
+            return {i, current, previous}
+        end
+    end
+    for i = 1, rules do
+        if ARGV[4 * i] == '1' then
+            redis.call('INCR', KEYS[2 * i - 1])
+            redis.call('EXPIRE', KEYS[2 * i - 1], ARGV[4 * i - 1])
+        end
+    end
+    return {0, 0, 0}
+    """
+
+    def __init__(self, url):
+        import redis  # optional dependency, only needed with RATE_LIMIT_REDIS_URL
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self._acquire = self._client.register_script(self.SCRIPT)
+
+    def acquire(self, entries, now):
+        keys, args, weights = [], [], []
+        for key, limit, window, count in entries:
+            index, weight = _weight(now, window)
+            keys += [f'{key}:{index}', f'{key}:{index - 1}']
+            args += [repr(weight), limit, math.ceil(window * 2), '1' if count else '0']
+            weights.append(weight)
+        position, current, previous = self._acquire(keys=keys, args=args)
+        if not position:
+            return None
+        return int(position) - 1, int(current), int(previous), weights[int(position) - 1]
+
+    def add(self, key, window, now):
+        counter = f'{key}:{_weight(now, window)[0]}'
+        pipeline = self._client.pipeline()
+        pipeline.incr(counter)
+        pipeline.expire(counter, math.ceil(window * 2))
+        pipeline.execute()
+
+
+class RateLimiter:
+    def __init__(self, service, rules, store, fallback, proxy_hops=0):
+        self.service = service
+        self.rules = {}
+        for rule in rules:
+            self.rules.setdefault(rule.path, []).append(rule)
+        self.store = store
+        self.fallback = fallback
+        self.proxy_hops = proxy_hops
+        self._store_failed_at = 0.0
+
+    def client_ip(self):
+        """The address the request came from; with proxy_hops > 0 taken from the X-Forwarded-For those proxies appended."""
+        if self.proxy_hops:
+            forwarded = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+            if len(forwarded) >= self.proxy_hops:
+                return forwarded[-self.proxy_hops]
+        return request.remote_addr or ''
+
+    def _key_value(self, rule):
+        if rule.key == 'ip':
+            return self.client_ip()
+        if rule.key == 'account':
+            data = request.get_json(silent=True)
+            email = data.get('email') if isinstance(data, dict) else None
+            # hashed so Redis never holds email addresses
+            return hashlib.sha1(str(email).strip().lower().encode()).hexdigest() if email else None
+        return '*'
+
+    def _call(self, method, *args):
+        if self.store is not self.fallback:
+            try:
+                return getattr(self.store, method)(*args)
+            except Exception as e:
+                now = time.time()
+                if now - self._store_failed_at > 60:  # one warning a minute while Redis is down
+                    logger.warning(f"[RATE LIMIT] Shared store failed, using this worker's counters - Error: {e}")
+                self._store_failed_at = now
+        return getattr(self.fallback, method)(*args)
+
+    def check(self):
+        """None when the request may go on, else the rejection response."""
+        rules = self.rules.get(request.path)
+        if not rules or request.method != 'POST':
+            return None
+        now = time.time()
+        checked, entries, failure_keys = [], [], []
+        for rule in rules:
+            value = self._key_value(rule)
+            if value is None:
+                continue
+            key = f'ratelimit:{self.service}:{rule.name}:{value}:{rule.window:g}'
+            checked.append(rule)
+            entries.append((key, rule.limit, rule.window, rule.counts == 'requests'))
+            if rule.counts == 'failures':
+                failure_keys.append((key, rule.window))
+        if not entries:
+            return None
+
+        rejected = self._call('acquire', entries, now)
+        if rejected is None:
+            # counted by record_failure() once the response is known
+            g.rate_limit_failure_keys = failure_keys
+            return None
+
+        position, current, previous, weight = rejected
+        rule = checked[position]
+        RATE_LIMITED.labels(rule.name).inc()
+        wait = retry_after(current, previous, weight, rule.limit, rule.window)
+        if rule.key == 'global':
+            response = jsonify({'error': 'The service is busy. Please try again shortly.'})
+            response.status_code = 503
+        else:
+            response = jsonify({'error': 'Too many requests. Please try again later.'})
+            response.status_code = 429
+        response.headers['Retry-After'] = str(wait)
+        return response
+
+    def record_failure(self, response):
+        """Count a failed attempt on the request's 'failures' rules."""
+        keys = g.pop('rate_limit_failure_keys', None)
+        if keys and response.status_code in FAILURE_STATUSES:
+            now = time.time()
+            for key, window in keys:
+                self._call('add', key, window, now)
+        return response
+
+
+def install(app, service_name, default_proxy_hops=0):
+    """Rate limit the routes of DEFAULT_RULES; each budget can be changed with RATE_LIMIT_<RULE NAME>."""
+
+    def setting(name, default=None):
+        value = app.config.get(name)
+        if value is None:
+            value = os.getenv(name)
+        return value if value not in (None, '') else default
+
+    if str(setting('RATE_LIMIT_ENABLED', 'True')).lower() not in ('true', '1', 't'):
+        return None
+
+    rules = []
+    for name, path, key, default, counts in DEFAULT_RULES:
+        budget = parse_budget(setting(f'RATE_LIMIT_{name.upper()}', default))
+        if budget:
+            rules.append(Rule(name, path, key, *budget, counts=counts))
+
+    fallback = MemoryStore()
+    redis_url = setting('RATE_LIMIT_REDIS_URL')
+    limiter = RateLimiter(
+        service_name, rules, RedisStore(redis_url) if redis_url else fallback, fallback,
+        int(setting('RATE_LIMIT_PROXY_HOPS', default_proxy_hops))
+    )
+    app.extensions['rate_limiter'] = limiter
+
+    @app.before_request
+    def enforce_rate_limits():
+        return limiter.check()
+
+    @app.after_request
+    def count_failed_attempts(response):
+        return limiter.record_failure(response)
+
+    return limiter
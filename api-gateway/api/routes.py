@@ -1,6 +1,5 @@
 import os
 import time
-import uuid
 import logging
 
 from .utils import handler, proxy_request
@@ -24,7 +23,7 @@ def register_routes(app):
     # Request tracing & timing
     @app.before_request
     def start_request():
-        g.trace_id = str(uuid.uuid4())
+        # g.trace_id is set by api.tracing
         g.start_time = time.time()
 
         if request.method == 'OPTIONS':
@@ -68,7 +67,7 @@ def register_routes(app):
         ''' Proxy requests to the authentication service '''
         auth_url = os.getenv('AUTH_URL')
         try:
-            return proxy_request(auth_url, request)
+            return proxy_request(auth_url, request, upstream='auth')
         except Exception as e:
             app.logger.error(
                 'proxy error',
@@ -86,7 +85,7 @@ def register_routes(app):
         ''' Proxy requests to the backend service '''
         bd_url = os.getenv('BACKEND_URL')
         try:
-            return proxy_request(bd_url, request)
+            return proxy_request(bd_url, request, upstream='backend')
         except Exception as e:
             app.logger.error(
                 'proxy error',
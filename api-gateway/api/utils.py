@@ -2,10 +2,14 @@ import requests
 from flask import Request, Response
 
 import os
+import time
 
 from dotenv import load_dotenv
 from logging.handlers import RotatingFileHandler
 
+from .metrics import observe_upstream
+from .tracing import span, propagation_headers, SPAN_KIND_CLIENT
+
 load_dotenv()
 
 # logging set-up
@@ -15,8 +19,11 @@ handler = RotatingFileHandler(
     backupCount=5
 )
 
+# incoming trace headers that are not forwarded as-is
+TRACE_HEADERS = {'traceparent', 'tracestate', 'x-request-id'}
+
 # reverse proxy
-def proxy_request(target_url: str, incoming_request: Request) -> Response:
+def proxy_request(target_url: str, incoming_request: Request, upstream: str = 'upstream') -> Response:
     # Build proxied URL
     path = incoming_request.path
     params = incoming_request.query_string.decode()
@@ -33,19 +40,35 @@ def proxy_request(target_url: str, incoming_request: Request) -> Response:
     print(f"Path: {path}")
     print(f"Params: {params}")
 
-    # Forward headers and body
-    headers = {k: v for k, v in incoming_request.headers if k != 'Host'}
-    resp = requests.request(
-        method=incoming_request.method,
-        url=url,
-        headers=headers,
-        data=incoming_request.get_data(),
-        cookies=incoming_request.cookies,
-        allow_redirects=False,
-        stream=True
-    )
+    # Forward headers and body; the trace context is replaced by this request's
+    headers = {k: v for k, v in incoming_request.headers
+               if k != 'Host' and k.lower() not in TRACE_HEADERS}
+    # the services see the gateway's address; they rate limit on the client's (RATE_LIMIT_PROXY_HOPS)
+    forwarded_for = incoming_request.headers.get('X-Forwarded-For')
+    client_ip = incoming_request.remote_addr or ''
+    headers['X-Forwarded-For'] = f'{forwarded_for}, {client_ip}' if forwarded_for else client_ip
+    start = time.perf_counter()
+    with span(f'proxy {upstream}', {'http.method': incoming_request.method, 'http.url': url}, SPAN_KIND_CLIENT) as proxy_span:
+        headers.update(propagation_headers(proxy_span))
+        try:
+            resp = requests.request(
+                method=incoming_request.method,
+                url=url,
+                headers=headers,
+                data=incoming_request.get_data(),
+                cookies=incoming_request.cookies,
+                allow_redirects=False,
+                stream=True
+            )
+            content = resp.content
+        except Exception as e:
+            observe_upstream(upstream, start, error=e)
+            raise
+        observe_upstream(upstream, start, status=resp.status_code)
+        if proxy_span is not None:
+            proxy_span.set_attribute('http.status_code', resp.status_code)
 
     excluded_headers = ['content-encoding', 'content-length', 'transfer-encoding', 'connection']
     response_headers = [(name, value) for (name, value) in resp.raw.headers.items() if name.lower() not in excluded_headers]
 
-    return Response(resp.content, resp.status_code, response_headers)
+    return Response(content, resp.status_code, response_headers)
@@ -5,6 +5,7 @@ from flask_cors import CORS
 from flask_talisman import Talisman
 
 from api.routes import register_routes
+from api import metrics, tracing, ratelimit
 
 # load environment variables immediately
 load_dotenv()
@@ -35,7 +36,13 @@ CORS(
     automatic_options=True
 )
 
+# request and upstream metrics at GET /metrics
+metrics.install(app)
+# trace id per request (g.trace_id), forwarded to the services as traceparent / X-Request-ID
+tracing.install(app, 'api-gateway')
 register_routes(app)
+# login/registration budgets per IP and per account, checked before the request is proxied
+ratelimit.install(app, 'api-gateway')
 
 if __name__ == '__main__':
     # only used for local debugging
@@ -0,0 +1,72 @@
+"""
+Aggregation helpers for TotalMarks
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Sum a student's Result scores for an assessment with one SUM() query
+- Refresh the TotalMarks row of a submission in place
+- Recompute every TotalMarks row of an assessment with one set-based UPDATE
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select, update, func
+
+from api import db
+from api.models import Result, TotalMarks
+
+
+def results_sum(student_id, assessment_id):
+    """Scalar subquery: total score of a student's results for an assessment (0 when none)."""
+    return (
+        select(func.coalesce(func.sum(Result.score), 0.0))
+        .where(Result.student_id == student_id, Result.assessment_id == assessment_id)
+        .scalar_subquery()
+    )
+
+
+def compute_total(student_id, assessment_id):
+    """
+    Return the student's total score for an assessment, summed in the database.
+    Pending changes in the session are flushed first so they are included.
+    """
+    db.session.flush()
+    return float(db.session.execute(select(results_sum(student_id, assessment_id))).scalar())
+
+
+def refresh_submission_total(submission):
+    """
+    Recompute the TotalMarks row of a submission with a single UPDATE.
+    Returns the new total, or None when the submission has no TotalMarks row yet.
+    The caller commits.
+    """
+    db.session.flush()
+    updated = db.session.execute(
+        update(TotalMarks)
+        .where(TotalMarks.submission_id == submission.id)
+        .values(
+            total_marks=results_sum(submission.student_id, submission.assessment_id),
+            calculated_at=datetime.utcnow()
+        )
+        .returning(TotalMarks.total_marks)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    return float(updated) if updated is not None else None
+
+
+def recompute_assessment_totals(assessment_id):
+    """
+    Recompute TotalMarks for every submission of an assessment, e.g. after a rubric change.
+    Issues one correlated UPDATE instead of loading results into Python.
+    Returns the number of TotalMarks rows updated. The caller commits.
+    """
+    db.session.flush()
+    result = db.session.execute(
+        update(TotalMarks)
+        .where(TotalMarks.assessment_id == assessment_id)
+        .values(
+            total_marks=results_sum(TotalMarks.student_id, TotalMarks.assessment_id),
+            calculated_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
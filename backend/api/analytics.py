@@ -0,0 +1,228 @@
+"""
+Gradebook analytics for lecturers
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Per-assessment statistics: mean, median, stdev, histogram of totals
+- Per-question difficulty index, discrimination index and item-total correlation
+- Per-unit summary across all assessments of the unit
+- Cache results in-process until new results or totals land or the assessments/questions change (fingerprint check)
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, func, and_
+
+from api import db
+from api.models import Assessment, Question, Result, TotalMarks
+
+HISTOGRAM_BINS = 10
+# share of students in the upper/lower groups of the discrimination index (Kelley's 27%)
+DISCRIMINATION_GROUP = 0.27
+
+
+class _AnalyticsCache:
+    """Keeps the last computed payload per key together with the data fingerprint it was computed from."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, fingerprint):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry[0] == fingerprint:
+            return entry[1]
+        return None
+
+    def put(self, key, fingerprint, payload):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (fingerprint, payload)
+
+
+analytics_cache = _AnalyticsCache()
+
+
+def _fingerprint(assessment_filter, result_filter, total_filter):
+    """
+    Cheap summary of the assessments, results and totals behind a report (counts, score sum, latest timestamps).
+    It changes whenever a result is graded or edited, a total is written, or an assessment or one of its
+    questions is added, edited or removed (question edits bump Assessment.updated_at), which invalidates the cache.
+    """
+    return tuple(db.session.execute(select(
+        select(func.count(Assessment.id)).where(assessment_filter).scalar_subquery(),
+        select(func.max(Assessment.updated_at)).where(assessment_filter).scalar_subquery(),
+        select(func.count(Result.id)).where(result_filter).scalar_subquery(),
+        select(func.sum(Result.score)).where(result_filter).scalar_subquery(),
+        select(func.max(Result.graded_at)).where(result_filter).scalar_subquery(),
+        select(func.count(TotalMarks.id)).where(total_filter).scalar_subquery(),
+        select(func.max(TotalMarks.calculated_at)).where(total_filter).scalar_subquery(),
+    )).one())
+
+
+def _number(value, digits=4):
+    """JSON-safe float: NaN/inf become None."""
+    if value is None:
+        return None
+    value = float(value)
+    if not np.isfinite(value):
+        return None
+    return round(value, digits)
+
+
+def _summary(totals, max_marks):
+    """Mean/median/stdev/min/max and histogram of a Series of totals."""
+    if totals.empty:
+        return {'count': 0, 'mean': None, 'median': None, 'stdev': None, 'min': None, 'max': None,
+                'histogram': {'bin_edges': [], 'counts': []}}
+    # totals above max_marks (e.g. after a regrade or a marks edit) widen the range instead of being dropped
+    upper = max(float(max_marks or 0), float(totals.max())) or 1.0
+    counts, edges = np.histogram(totals.to_numpy(dtype=float), bins=HISTOGRAM_BINS, range=(0.0, float(upper)))
+    return {
+        'count': int(totals.size),
+        'mean': _number(totals.mean()),
+        'median': _number(totals.median()),
+        'stdev': _number(totals.std(ddof=1)) if totals.size > 1 else None,
+        'min': _number(totals.min()),
+        'max': _number(totals.max()),
+        'histogram': {'bin_edges': [_number(e) for e in edges], 'counts': counts.tolist()},
+    }
+
+
+def _question_stats(df, questions):
+    """
+    Vectorized item analysis over a students x questions score matrix.
+    - difficulty: mean score / marks (share of marks obtained; higher = easier)
+    - discrimination: (mean of upper 27% - mean of lower 27%) / marks, groups ranked by total
+    - correlation_with_total: corrected item-total correlation (total without the item itself)
+    """
+    if df.empty:
+        return []
+
+    matrix = df.pivot_table(index='student_id', columns='question_id', values='score', aggfunc='sum', fill_value=0.0)
+    totals = df.drop_duplicates('student_id').set_index('student_id')['total_marks'].reindex(matrix.index).fillna(0.0)
+
+    scores = matrix.to_numpy(dtype=float)
+    marks = np.array([questions[qid]['marks'] or np.nan for qid in matrix.columns], dtype=float)
+    n = scores.shape[0]
+
+    difficulty = scores.mean(axis=0) / marks
+
+    order = np.argsort(totals.to_numpy(dtype=float), kind='stable')
+    group = max(1, int(round(n * DISCRIMINATION_GROUP)))
+    discrimination = (scores[order[-group:]].mean(axis=0) - scores[order[:group]].mean(axis=0)) / marks
+
+    rest = totals.to_numpy(dtype=float)[:, None] - scores
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = scores - scores.mean(axis=0)
+        y = rest - rest.mean(axis=0)
+        correlation = (x * y).sum(axis=0) / np.sqrt((x ** 2).sum(axis=0) * (y ** 2).sum(axis=0))
+
+    answered = (df.groupby('question_id')['student_id'].count()).reindex(matrix.columns).fillna(0)
+    mean_scores = scores.mean(axis=0)
+
+    return [
+        {
+            'question_id': qid,
+            'text': questions[qid]['text'],
+            'marks': questions[qid]['marks'],
+            'responses': int(answered[qid]),
+            'mean_score': _number(mean_scores[i]),
+            'difficulty_index': _number(difficulty[i]),
+            'discrimination_index': _number(discrimination[i]),
+            'correlation_with_total': _number(correlation[i]) if n > 2 else None,
+        }
+        for i, qid in enumerate(matrix.columns)
+    ]
+
+
+def assessment_analytics(assessment):
+    """Statistics for one assessment, computed from submitted students only."""
+    fingerprint = _fingerprint(
+        Assessment.id == assessment.id, Result.assessment_id == assessment.id, TotalMarks.assessment_id == assessment.id
+    )
+    cached = analytics_cache.get(('assessment', assessment.id), fingerprint)
+    if cached is not None:
+        return cached
+
+    # one query: every result of a submitted student with the submission total and the question's marks
+    rows = db.session.execute(
+        select(Result.student_id, Result.question_id, Result.score, TotalMarks.total_marks,
+               Question.marks, Question.text)
+        .join(TotalMarks, and_(TotalMarks.assessment_id == Result.assessment_id,
+                               TotalMarks.student_id == Result.student_id))
+        .join(Question, Question.id == Result.question_id)
+        .where(Result.assessment_id == assessment.id)
+    ).all()
+
+    df = pd.DataFrame(rows, columns=['student_id', 'question_id', 'score', 'total_marks', 'marks', 'text'])
+    df['score'] = df['score'].astype(float).fillna(0.0)
+    df['total_marks'] = df['total_marks'].astype(float)
+    questions = (
+        df.drop_duplicates('question_id').set_index('question_id')[['marks', 'text']].to_dict('index')
+        if not df.empty else {}
+    )
+    totals = df.drop_duplicates('student_id')['total_marks']
+
+    payload = {
+        'assessment_id': assessment.id,
+        'title': assessment.title,
+        'topic': assessment.topic,
+        'total_marks': assessment.total_marks,
+        'summary': _summary(totals, assessment.total_marks),
+        'questions': _question_stats(df, questions),
+    }
+    analytics_cache.put(('assessment', assessment.id), fingerprint, payload)
+    return payload
+
+
+def unit_analytics(unit_id):
+    """Per-assessment summaries for every assessment of a unit, plus the unit-wide distribution of percentages."""
+    unit_assessments = select(Assessment.id).where(Assessment.unit_id == unit_id)
+    fingerprint = _fingerprint(
+        Assessment.unit_id == unit_id,
+        Result.assessment_id.in_(unit_assessments), TotalMarks.assessment_id.in_(unit_assessments)
+    )
+    cached = analytics_cache.get(('unit', unit_id), fingerprint)
+    if cached is not None:
+        return cached
+
+    rows = db.session.execute(
+        select(Assessment.id, Assessment.title, Assessment.topic, Assessment.total_marks,
+               TotalMarks.student_id, TotalMarks.total_marks)
+        .outerjoin(TotalMarks, TotalMarks.assessment_id == Assessment.id)
+        .where(Assessment.unit_id == unit_id)
+    ).all()
+
+    df = pd.DataFrame(rows, columns=['assessment_id', 'title', 'topic', 'out_of', 'student_id', 'total'])
+    df['total'] = df['total'].astype(float)
+    df['out_of'] = df['out_of'].astype(float)
+    df['percentage'] = (df['total'] / df['out_of'].where(df['out_of'] > 0)) * 100
+
+    assessments = []
+    for assessment_id, group in df.groupby('assessment_id', sort=False):
+        first = group.iloc[0]
+        submitted = group.dropna(subset=['total'])
+        assessments.append({
+            'assessment_id': assessment_id,
+            'title': first['title'],
+            'topic': first['topic'],
+            'total_marks': _number(first['out_of']),
+            'summary': _summary(submitted['total'], first['out_of'] if pd.notna(first['out_of']) else None),
+        })
+
+    percentages = df['percentage'].dropna()
+    student_means = df.dropna(subset=['percentage']).groupby('student_id')['percentage'].mean()
+
+    payload = {
+        'unit_id': unit_id,
+        'assessments': assessments,
+        'percentage_summary': _summary(percentages, 100),
+        'student_average_percentage': _summary(student_means, 100),
+    }
+    analytics_cache.put(('unit', unit_id), fingerprint, payload)
+    return payload
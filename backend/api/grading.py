@@ -0,0 +1,162 @@
+"""
+Grading front-end of the bulk regrade engine
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Grade close-ended answers locally against correct_answer (no LLM call) when no partial credit is possible:
+  any single-choice answer, fully correct multiple-choice and ordering answers
+- Cache grading results for identical (question, answer) pairs
+- Fall back to the AI graders in api.utils for everything else
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from api.utils import grade_text_answer, grade_image_answer
+
+logger = logging.getLogger(__name__)
+
+# Question types whose answer can be checked by comparing choices.
+# close-ended-bool is left to the AI grader because the generated rubrics award most marks to the justification.
+LOCAL_GRADED_TYPES = {
+    'close-ended-multiple-single',
+    'close-ended-multiple-multiple',
+    'close-ended-ordering',
+}
+
+
+def _as_list(value, split=False):
+    """
+    Normalize a stored/submitted answer to a list of comparable strings, or None if it can't be parsed.
+    With split, plain text that isn't JSON is read as comma-separated choices ("A, C").
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            value = json.loads(text)
+        except ValueError:
+            value = text.split(',') if split else [text]
+    if isinstance(value, (str, int, float, bool)):
+        value = [value]
+    if not isinstance(value, (list, tuple)):
+        return None
+    choices = [str(v).strip().casefold() for v in value]
+    return [c for c in choices if c] if split else choices
+
+
+def grade_close_ended(question_type, text_answer, correct_answer, marks):
+    """
+    Grade a close-ended answer without calling the AI model.
+    Returns (grading_result, 200) or None when the answer can't be graded locally.
+    Multiple-choice and ordering answers that aren't fully right return None: the AI grader
+    gives the rubric's partial credit for them. Feedback never reveals the correct answer.
+    """
+    if question_type not in LOCAL_GRADED_TYPES or not text_answer:
+        return None
+
+    single = question_type == 'close-ended-multiple-single'
+    submitted = _as_list(text_answer, split=not single)
+    expected = _as_list(correct_answer, split=not single)
+    if not submitted or not expected:
+        return None
+
+    if single:
+        if len(submitted) != 1:
+            return None
+        correct = submitted[0] == expected[0]
+    elif question_type == 'close-ended-multiple-multiple':
+        correct = set(submitted) == set(expected)
+    else:  # close-ended-ordering
+        correct = submitted == expected
+
+    if correct:
+        return {'score': float(marks or 0), 'feedback': 'Correct.'}, 200
+    if not single:
+        return None
+    return {'score': 0.0, 'feedback': 'Incorrect.'}, 200
+
+
+class GradingCache:
+    """Thread-safe LRU of grading results keyed by question content and answer."""
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(question, text_answer, image_path, student_hobbies):
+        payload = json.dumps([
+            question.id, question.text, question.rubric, question.correct_answer, question.marks,
+            text_answer, image_path, sorted(student_hobbies or [])
+        ], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+grading_cache = GradingCache()
+
+
+def grade_answer(question, text_answer=None, image_file_path=None, student_hobbies=None, before_llm_call=None):
+    """
+    Grade one answer: local close-ended grader first, then the cache, then the AI grader.
+    before_llm_call is invoked right before an AI request (used for rate limiting).
+    Returns (grading_result, status) like the AI graders.
+    """
+    local = grade_close_ended(question.type, text_answer, question.correct_answer, question.marks)
+    if local is not None:
+        return local
+
+    cache_key = GradingCache.key(question, text_answer, image_file_path, student_hobbies)
+    cached = grading_cache.get(cache_key)
+    if cached is not None:
+        return cached, 200
+
+    if before_llm_call is not None:
+        before_llm_call()
+
+    if text_answer:
+        grading_result, status = grade_text_answer(
+            text_answer=text_answer,
+            question_text=question.text,
+            rubric=question.rubric,
+            correct_answer=question.correct_answer,
+            marks=question.marks,
+            student_hobbies=student_hobbies
+        )
+    elif image_file_path:
+        grading_result, status = grade_image_answer(
+            filename=image_file_path,
+            question_text=question.text,
+            rubric=question.rubric,
+            correct_answer=question.correct_answer,
+            marks=question.marks,
+            student_hobbies=student_hobbies
+        )
+    else:
+        return {'error': 'empty_answer', 'detail': 'Answer has neither text nor image.'}, 400
+
+    if status == 200:
+        grading_cache.put(cache_key, grading_result)
+    return grading_result, status
@@ -0,0 +1,69 @@
+"""
+Fast JSON provider for Flask
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Serialize responses with orjson when it is installed (falls back to the stdlib json provider)
+- Serialize datetime/date/time as ISO 8601 (same output as .isoformat()) in both modes,
+  so read paths can hand raw Row values to jsonify
+- Serialize Decimal, UUID and SQLAlchemy row mappings
+"""
+
+import uuid
+import decimal
+from datetime import date, datetime, time
+from collections.abc import Mapping
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(o):
+    """Types neither json nor orjson handle natively."""
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if isinstance(o, Mapping):  # sqlalchemy RowMapping
+        return dict(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if hasattr(o, '_asdict'):  # sqlalchemy Row
+        return o._asdict()
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that uses orjson when available."""
+
+    # sorted keys like Flask's default provider
+    ORJSON_OPTIONS = (
+        (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+    )
+
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self.ORJSON_OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        # orjson returns bytes; skip the str round trip
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=self.ORJSON_OPTIONS),
+            mimetype=self.mimetype
+        )
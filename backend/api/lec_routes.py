@@ -18,7 +18,14 @@ import logging
 
 from api import db
 from api.utils import ai_create_assessment, ai_create_assessment_from_pdf, ALLOWED_QUESTION_TYPES
-from api.models import Assessment, Question, Submission, Answer, Result, TotalMarks, Course, Unit, Notes, Lecturer, Student, User
+from api.aggregation import refresh_submission_total, recompute_assessment_totals
+from api.progress import sync_scores
+from api.regrade import start_regrade, fail_stale_jobs, stale_after_seconds
+from api.analytics import assessment_analytics, unit_analytics
+from api.replica import replica_reads
+from api.tracing import span
+from api.read_models import assessment_submissions, student_submission_summaries, submission_export
+from api.models import Assessment, Question, Submission, Answer, Result, TotalMarks, Course, Unit, Notes, Lecturer, Student, User, RegradeJob
 from sqlalchemy.orm import joinedload
 
 import os
@@ -106,7 +113,8 @@ def generate_assessments():
         pdf_filename = f"{uuid.uuid4()}.pdf"
         pdf_path = os.path.join(ai_pdf_dir, pdf_filename)
         
-        doc_file.save(pdf_path)
+        with span('file.save_pdf', {'file.path': pdf_path}):
+            doc_file.save(pdf_path)
 
         data['doc_file'] = pdf_path
 
@@ -357,6 +365,7 @@ def add_question_to_assessment(assessment_id):
     }), 201
 
 @lec_blueprint.route('/assessments', methods=['GET'])
+@replica_reads
 def get_lecturer_assessments():
     '''
     Get all assessments created by the lecturer.
@@ -367,6 +376,7 @@ def get_lecturer_assessments():
     return jsonify([assessment.to_dict() for assessment in assessments]), 200
 
 @lec_blueprint.route('/submissions/assessments/<assessment_id>', methods=['GET'])
+@replica_reads
 def get_assessment_submissions(assessment_id):
     """
     Get all submissions for all students.
@@ -376,74 +386,20 @@ def get_assessment_submissions(assessment_id):
     logger = logging.getLogger(__name__)
     logger.info(f"[GET_ASSESSMENT_SUBMISSIONS] Fetching submissions - Assessment: {assessment_id}, Lecturer: {user_id}")
 
-    submissions_data = []
-
     # assessments created by the lecturer and are verified
     assessment = Assessment.query.get(assessment_id)
     if not assessment:
         logger.warning(f"[GET_ASSESSMENT_SUBMISSIONS] Assessment not found - Assessment: {assessment_id}")
         return jsonify({'message': 'Assessment not found.'}), 404
 
-    # iterate through all assessments and get submissions for each assessment
-    submissions = Submission.query.filter_by(assessment_id=assessment.id).all()
-    logger.info(f"[GET_ASSESSMENT_SUBMISSIONS] Found {len(submissions)} submissions - Assessment: {assessment_id}")
-    
-    for submission in submissions:
-        submission_data = {
-            'submission_id': submission.id,
-            'assessment_id': submission.assessment_id,
-            'student_id': submission.student_id,
-            'graded': submission.graded
-        }
-        submissions_data.append(submission_data)
-    # add the totalmarks for each submission and student name and registration number
-    for submission in submissions_data:
-        total_marks = TotalMarks.query.filter_by(submission_id=submission['submission_id']).first()
-        submission['total_marks'] = total_marks.total_marks if total_marks else 0
-        user = User.query.get(submission['student_id'])
-        if user:
-            student = Student.query.filter_by(user_id=user.id).first()
-            if student:
-                submission['student_name'] = student.firstname + ' ' + student.surname
-                submission['reg_number'] = student.reg_number
-        # get assessment topic, course name, and unit name
-        assessment = Assessment.query.get(submission['assessment_id'])
-        if assessment:
-            submission['assessment_topic'] = assessment.topic
-            course = Course.query.get(assessment.course_id)
-            unit = Unit.query.get(assessment.unit_id)
-            if course:
-                submission['course_name'] = course.name
-            else:
-                submission['course_name'] = 'Unknown Course'
-            if unit:
-                submission['unit_name'] = unit.unit_name
-            if unit:
-                submission['unit_name'] = unit.unit_name
-            else:
-                submission['unit_name'] = 'Unknown Unit'
-
-    # combine the submissions with their results
-    for submission in submissions_data:
-        logger.info(f"[GET_ASSESSMENT_SUBMISSIONS] Fetching results - Submission: {submission['submission_id']}, Student: {submission['student_id']}")
-        results = Result.query.options(joinedload(Result.answer)).filter_by(assessment_id=submission['assessment_id'], student_id=submission['student_id']).all()
-        logger.info(f"[GET_ASSESSMENT_SUBMISSIONS] Found {len(results)} results - Submission: {submission['submission_id']}")
-        
-        submission['results'] = []
-        for result in results:
-            result_dict = result.to_dict()
-            logger.debug(f"[GET_ASSESSMENT_SUBMISSIONS] Processing result - Result ID: {result.id}, Has Answer: {result.answer is not None}, Has Image: {result.answer.image_path if result.answer else 'None'}")
-            question = Question.query.get(result_dict['question_id'])
-            if question:
-                result_dict['question_text'] = question.text
-                result_dict['marks'] = question.marks
-            else:
-                result_dict['question_text'] = 'Unknown Question'
-            submission['results'].append(result_dict)
+    # submissions with totals, names and results from the read model (two Core queries)
+    submissions_data = assessment_submissions(assessment)
+    logger.info(f"[GET_ASSESSMENT_SUBMISSIONS] Found {len(submissions_data)} submissions - Assessment: {assessment_id}")
 
     return jsonify(submissions_data), 200
 
 @lec_blueprint.route('/submissions/student/<student_id>', methods=['GET'])
+@replica_reads
 def get_student_submissions(student_id):
     """
     Get all submissions made by a specific student.
@@ -453,41 +409,9 @@ def get_student_submissions(student_id):
     logger = logging.getLogger(__name__)
     logger.info(f"[GET_STUDENT_SUBMISSIONS] Fetching student submissions - Student: {student_id}, Lecturer: {user_id}")
 
-    submissions_data = []
-
-    # Get all submissions for the specified student
-    submissions = Submission.query.filter_by(student_id=student_id).all()
-    logger.info(f"[GET_STUDENT_SUBMISSIONS] Found {len(submissions)} submissions - Student: {student_id}")
-    
-    for submission in submissions:
-        submission_data = {
-            'submission_id': submission.id,
-            'assessment_id': submission.assessment_id,
-            'student_id': submission.student_id,
-            'graded': submission.graded
-        }
-        submissions_data.append(submission_data)
-    # Add the total marks for each submission
-    for submission in submissions_data:
-        total_marks = TotalMarks.query.filter_by(submission_id=submission['submission_id']).first()
-        submission['total_marks'] = total_marks.total_marks if total_marks else 0
-    # Combine the submissions with their results
-    for submission in submissions_data:
-        logger.info(f"[GET_STUDENT_SUBMISSIONS] Fetching results - Submission: {submission['submission_id']}, Student: {student_id}")
-        results = Result.query.options(joinedload(Result.answer)).filter_by(assessment_id=submission['assessment_id'], student_id=submission['student_id']).all()
-        logger.info(f"[GET_STUDENT_SUBMISSIONS] Found {len(results)} results - Submission: {submission['submission_id']}")
-        
-        submission['results'] = []
-        for result in results:
-            result_dict = result.to_dict()
-            logger.debug(f"[GET_STUDENT_SUBMISSIONS] Processing result - Result ID: {result.id}, Has Answer: {result.answer is not None}, Has Image: {result.answer.image_path if result.answer else 'None'}")
-            question = Question.query.get(result_dict['question_id'])
-            if question:
-                result_dict['question_text'] = question.text
-                result_dict['marks'] = question.marks
-            else:
-                result_dict['question_text'] = 'Unknown Question'
-            submission['results'].append(result_dict)
+    # Submissions with totals and results from the read model (two Core queries)
+    submissions_data = student_submission_summaries(student_id)
+    logger.info(f"[GET_STUDENT_SUBMISSIONS] Found {len(submissions_data)} submissions - Student: {student_id}")
     return jsonify(submissions_data), 200
 
 @lec_blueprint.route('/submissions/<submission_id>', methods=['PUT'])
@@ -509,53 +433,132 @@ def update_submission(submission_id):
     if 'feedback' not in data or 'score' not in data or 'question_id' not in data:
         return jsonify({'message': 'Invalid input data.'}), 400
     
-    # Update total marks: Recompute the total marks for the submission and update total_marks table
-    # Calculate total marks in Python 
-    results = Result.query.filter_by(
-        student_id=submission.student_id,
-        assessment_id=submission.assessment_id
-    ).all()
-
     result = Result.query.filter_by(
         question_id=data['question_id'],
         student_id=submission.student_id,
         assessment_id=submission.assessment_id
     ).first()
+    if not result:
+        return jsonify({'message': 'Result not found for this question.'}), 404
 
     # Update the result with new marks and feedback
     result.score = float(data['score'])
     result.feedback = data['feedback']
-    db.session.add(result)
-    db.session.commit()
 
-    total_marks = 0.0
-    for result in results:
-        # Check if score is a dict with 'marks_awarded' key, or just a float/number 
-        if result.score:
-            if isinstance(result.score, dict) and 'marks_awarded' in result.score:
-                total_marks += float(result.score['marks_awarded'])
-            elif isinstance(result.score, (int, float)):
-                # If score is already a number, use it directly
-                total_marks += float(result.score)
-            else:
-                # Handle other cases - log for debugging
-                print(f"Unexpected score format: {type(result.score)} - {result.score}")
-
-    # Update total marks in the database
-    total_marks_entry = TotalMarks.query.filter_by(submission_id=submission.id).first()
-    total_marks_entry.total_marks = total_marks
-    
-    db.session.add(total_marks_entry)
+    # Recompute the total from the updated results with one UPDATE ... SET total_marks = (SELECT SUM(...))
+    total_marks = refresh_submission_total(submission)
+    if total_marks is None:
+        return jsonify({'message': 'Total marks not found for this submission.'}), 404
+    sync_scores(submission.assessment_id, submission.student_id)
     db.session.commit()
     
     return jsonify({
         'message': 'Submission updated successfully.',
         'submission_id': submission.id,
         'graded': submission.graded,
-        'total_marks': total_marks_entry.total_marks
+        'total_marks': total_marks
     }), 200
 
+@lec_blueprint.route('/assessments/<assessment_id>/recompute-totals', methods=['POST'])
+def recompute_totals(assessment_id):
+    """
+    Recompute the total marks of every submission for an assessment.
+    Use after results were changed outside of update_submission (e.g. a rubric fix).
+    This endpoint is accessible only to lecturers.
+    """
+    assessment = Assessment.query.get(assessment_id)
+    if not assessment:
+        return jsonify({'message': 'Assessment not found.'}), 404
+
+    updated = recompute_assessment_totals(assessment.id)
+    sync_scores(assessment.id)
+    db.session.commit()
+
+    return jsonify({
+        'message': 'Total marks recomputed successfully.',
+        'assessment_id': assessment.id,
+        'submissions_updated': updated
+    }), 200
+
+@lec_blueprint.route('/assessments/<assessment_id>/regrade', methods=['POST'])
+def regrade_assessment(assessment_id):
+    """
+    Regrade every answer of an assessment, or of one question, after a rubric or correct_answer fix.
+    The job runs in the background; poll GET /regrade-jobs/<job_id> for progress.
+    Optional JSON body: {"question_id": "..."}
+    This endpoint is accessible only to lecturers.
+    """
+    user_id = get_jwt_identity()
+
+    assessment = Assessment.query.get(assessment_id)
+    if not assessment:
+        return jsonify({'message': 'Assessment not found.'}), 404
+
+    data = request.get_json(silent=True) or {}
+    question_id = data.get('question_id')
+    if question_id:
+        question = Question.query.get(question_id)
+        if not question or question.assessment_id != assessment.id:
+            return jsonify({'message': 'Question not found in this assessment.'}), 404
+
+    # a job whose thread died with its worker would otherwise block regrades of this assessment
+    fail_stale_jobs(assessment.id, stale_after_seconds(current_app.config))
+    running = RegradeJob.query.filter(
+        RegradeJob.assessment_id == assessment.id,
+        RegradeJob.status.in_(['queued', 'running'])
+    ).first()
+    if running:
+        return jsonify({'message': 'A regrade is already running for this assessment.', 'job': running.to_dict()}), 409
+
+    job = start_regrade(current_app._get_current_object(), assessment.id, user_id, question_id)
+
+    return jsonify({
+        'message': 'Regrade started.',
+        'job': job.to_dict()
+    }), 202
+
+@lec_blueprint.route('/regrade-jobs/<job_id>', methods=['GET'])
+def get_regrade_job(job_id):
+    """
+    Get the status and progress of a regrade job.
+    This endpoint is accessible only to lecturers.
+    """
+    job = RegradeJob.query.get(job_id)
+    if not job:
+        return jsonify({'message': 'Regrade job not found.'}), 404
+    if job.status in ('queued', 'running') and fail_stale_jobs(job.assessment_id, stale_after_seconds(current_app.config)):
+        db.session.refresh(job)
+    return jsonify(job.to_dict()), 200
+
+@lec_blueprint.route('/assessments/<assessment_id>/analytics', methods=['GET'])
+@replica_reads
+def get_assessment_analytics(assessment_id):
+    """
+    Gradebook analytics for an assessment: mean, median, stdev and histogram of totals,
+    plus per-question difficulty, discrimination and correlation with the total.
+    Cached until new results or totals are written.
+    This endpoint is accessible only to lecturers.
+    """
+    assessment = Assessment.query.get(assessment_id)
+    if not assessment:
+        return jsonify({'message': 'Assessment not found.'}), 404
+    return jsonify(assessment_analytics(assessment)), 200
+
+@lec_blueprint.route('/units/<unit_id>/analytics', methods=['GET'])
+@replica_reads
+def get_unit_analytics(unit_id):
+    """
+    Gradebook analytics for a unit: per-assessment summaries and the distribution of percentage scores.
+    Cached until new results or totals are written.
+    This endpoint is accessible only to lecturers.
+    """
+    unit = Unit.query.get(unit_id)
+    if not unit:
+        return jsonify({'message': 'Unit not found.'}), 404
+    return jsonify(unit_analytics(unit.id)), 200
+
 @lec_blueprint.route('/submissions/units/<unit_id>/download', methods=['GET'])
+@replica_reads
 def download_submissions(unit_id):
     """
     Download all submissions for a specific unit in excel file.
@@ -580,36 +583,8 @@ def download_submissions(unit_id):
     if not course:
         return jsonify({'message': 'Course not found.'}), 404
     
-    # Fetch all assessments for the unit
-    assessments = Assessment.query.filter_by(unit_id=unit_id).all()
-    
-    submissions_data = []
-    
-    for assessment in assessments:
-        submissions = Submission.query.filter_by(assessment_id=assessment.id).all()
-        for submission in submissions:
-            total_marks_entry = TotalMarks.query.filter_by(submission_id=submission.id).first()
-            total_marks = total_marks_entry.total_marks if total_marks_entry else 0
-            
-            student = Student.query.filter_by(user_id=submission.student_id).first()
-            if student:
-                student_name = f"{student.firstname} {student.surname}"
-                reg_number = student.reg_number
-            else:
-                student_name = 'Unknown Student'
-                reg_number = 'N/A'
-            
-            submission_data = {
-                'submission_id': submission.id,
-                'assessment_topic': assessment.topic,
-                'student_name': student_name,
-                'reg_number': reg_number,
-                'submitted_at': submission.submitted_at.isoformat() if submission.submitted_at else None,
-                'graded': submission.graded,
-                'total_marks': total_marks,
-                'out_of': assessment.total_marks
-            }
-            submissions_data.append(submission_data)
+    # All submissions of the unit's assessments in one Core query
+    submissions_data = submission_export(Assessment.unit_id == unit.id)
 
     # Create an Excel file with the submissions data
 
@@ -635,6 +610,7 @@ def download_submissions(unit_id):
     )
 
 @lec_blueprint.route('/submissions/assessments/<assessment_id>/download', methods=['GET'])
+@replica_reads
 def download_assessment_submissions(assessment_id):
     """
     Download all submissions for a specific assessment in excel file.
@@ -662,33 +638,8 @@ def download_assessment_submissions(assessment_id):
     if not course:
         return jsonify({'message': 'Course not found.'}), 404
     
-    submissions_data = []
-    
-    # Fetch all submissions for the assessment
-    submissions = Submission.query.filter_by(assessment_id=assessment.id).all()
-    for submission in submissions:
-        total_marks_entry = TotalMarks.query.filter_by(submission_id=submission.id).first()
-        total_marks = total_marks_entry.total_marks if total_marks_entry else 0
-        
-        student = Student.query.filter_by(user_id=submission.student_id).first()
-        if student:
-            student_name = f"{student.firstname} {student.surname}"
-            reg_number = student.reg_number
-        else:
-            student_name = 'Unknown Student'
-            reg_number = 'N/A'
-        
-        submission_data = {
-            'submission_id': submission.id,
-            'assessment_topic': assessment.topic,
-            'student_name': student_name,
-            'reg_number': reg_number,
-            'submitted_at': submission.submitted_at.isoformat() if submission.submitted_at else None,
-            'graded': submission.graded,
-            'total_marks': total_marks,
-            'out_of': assessment.total_marks
-        }
-        submissions_data.append(submission_data)
+    # Fetch all submissions for the assessment in one Core query
+    submissions_data = submission_export(Submission.assessment_id == assessment.id)
 
     # Create an Excel file with the submissions data
     df = pd.DataFrame(submissions_data)
@@ -786,7 +737,8 @@ def upload_notes(unit_id):
         
         # Save file
         file_path = os.path.join(unit_dir, unique_filename)
-        file.save(file_path)
+        with span('file.save_note', {'file.path': file_path}):
+            file.save(file_path)
         
         # Get file size
         file_size = os.path.getsize(file_path)
@@ -894,6 +846,7 @@ def delete_note(note_id):
 
 # Route to get all notes uploaded by a specific lecturer
 @lec_blueprint.route('/notes', methods=['GET'])
+@replica_reads
 def get_lecturer_notes():
     user_id = get_jwt_identity()
     
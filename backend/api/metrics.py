@@ -0,0 +1,182 @@
+"""
+Prometheus metrics
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Request latency histogram by method, route and status, and requests in flight
+- SQL statements and SQL time per request (SQLAlchemy cursor events)
+- Connection pool gauges per bind
+- LLM call latency, token usage, errors and calls in flight by model and operation
+- Grading queue depth (answers still waiting in queued or running regrade jobs)
+- GET /metrics in the Prometheus text format, only with Bearer METRICS_TOKEN (404 while it is unset)
+Under gunicorn set PROMETHEUS_MULTIPROC_DIR so that /metrics aggregates every worker process;
+gunicorn.conf.py clears the directory on start and drops the gauges of exited workers.
+"""
+
+import os
+import hmac
+import time
+from contextlib import contextmanager
+
+from flask import g, request, current_app, jsonify, Response, has_request_context
+from prometheus_client import (
+    Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+
+from api import db, pool_metrics
+from api.models import RegradeJob
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 500)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to serve a request',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'Requests being served', multiprocess_mode='livesum')
+DB_QUERIES = Histogram(
+    'db_queries_per_request', 'SQL statements executed by a request', ['route'], buckets=QUERY_COUNT_BUCKETS
+)
+DB_TIME = Histogram(
+    'db_time_per_request_seconds', 'Time a request spent in SQL statements', ['route'], buckets=LATENCY_BUCKETS
+)
+POOL_CONNECTIONS = Gauge(
+    'db_pool_connections', 'Pooled connections by state', ['bind', 'state'], multiprocess_mode='livesum'
+)
+POOL_OVERFLOW = Gauge(
+    'db_pool_overflow_connections', 'Connections open beyond pool_size', ['bind'], multiprocess_mode='livesum'
+)
+
+LLM_LATENCY = Histogram(
+    'llm_request_duration_seconds', 'Time of an LLM API call',
+    ['model', 'operation'], buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter('llm_tokens', 'Tokens reported by the LLM API', ['model', 'operation', 'kind'])
+LLM_ERRORS = Counter('llm_errors', 'LLM API calls that raised', ['model', 'operation', 'error'])
+LLM_IN_FLIGHT = Gauge(
+    'llm_requests_in_flight', 'LLM API calls waiting for a response', ['operation'], multiprocess_mode='livesum'
+)
+GRADING_QUEUE_DEPTH = Gauge(
+    'grading_queue_depth', 'Answers waiting in queued or running regrade jobs', multiprocess_mode='mostrecent'
+)
+
+
+class _LLMCall:
+    def __init__(self, model, operation):
+        self.model = model
+        self.operation = operation
+
+    def usage(self, usage):
+        """Count the prompt/completion tokens of a response's usage block (ignored when missing)."""
+        if usage is None:
+            return
+        for kind in ('prompt', 'completion'):
+            tokens = getattr(usage, f'{kind}_tokens', None)
+            if tokens:
+                LLM_TOKENS.labels(self.model, self.operation, kind).inc(tokens)
+
+
+@contextmanager
+def llm_call(model, operation):
+    """
+    Time an LLM API call and count its errors:
+        with llm_call(model, 'grade_text') as call:
+            response = client.chat.completions.create(...)
+            call.usage(response.usage)
+    """
+    call = _LLMCall(model or 'unknown', operation)
+    LLM_IN_FLIGHT.labels(operation).inc()
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        LLM_ERRORS.labels(call.model, operation, type(e).__name__).inc()
+        raise
+    finally:
+        LLM_LATENCY.labels(call.model, operation).observe(time.perf_counter() - start)
+        LLM_IN_FLIGHT.labels(operation).dec()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_metrics_start', None)
+    if start is None or not has_request_context():
+        return
+    g.db_queries = g.get('db_queries', 0) + 1
+    g.db_time = g.get('db_time', 0.0) + time.perf_counter() - start
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def _update_pool_gauges():
+    for bind, stats in pool_metrics.snapshot_all(db.engines).items():
+        if stats is None:
+            continue
+        POOL_CONNECTIONS.labels(bind, 'in_use').set(stats['in_use'])
+        POOL_CONNECTIONS.labels(bind, 'idle').set(stats['idle'])
+        POOL_OVERFLOW.labels(bind).set(stats['overflow'])
+
+
+def _update_grading_queue():
+    waiting = (
+        db.session.query(func.coalesce(func.sum(RegradeJob.total_answers - RegradeJob.processed), 0))
+        .filter(RegradeJob.status.in_(('queued', 'running')))
+        .scalar()
+    )
+    GRADING_QUEUE_DEPTH.set(max(0, waiting))
+
+
+def metrics_view():
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        # off unless a token is configured: the gateway port is public
+        return jsonify({'message': 'Metrics are disabled; set METRICS_TOKEN to enable them'}), 404
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return jsonify({'message': 'Unauthorized'}), 401
+
+    _update_pool_gauges()
+    _update_grading_queue()
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def install(app):
+    """Record request/DB metrics for every request of the app and serve them at GET /metrics."""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.get('metrics_start')
+        if start is None:
+            return response
+        route = _route()
+        REQUEST_LATENCY.labels(request.method, route, str(response.status_code)).observe(time.perf_counter() - start)
+        DB_QUERIES.labels(route).observe(g.get('db_queries', 0))
+        DB_TIME.labels(route).observe(g.get('db_time', 0.0))
+        _update_pool_gauges()
+        return response
+
+    @app.teardown_request
+    def end_request_metrics(exc):
+        if g.pop('metrics_start', None) is not None:
+            REQUESTS_IN_FLIGHT.dec()
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
@@ -7,14 +7,18 @@ from sqlalchemy.orm import foreign
 
 from sqlalchemy.dialects.postgresql import JSONB
 
-from sqlalchemy import and_
+from sqlalchemy import and_, event, update
 
 class Assessment(db.Model):
 
     __tablename__ = 'assessments'
+    __table_args__ = (
+        # student dashboards filter on unit_id IN (...) AND verified
+        db.Index('ix_assessments_unit_verified', 'unit_id', 'verified'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    creator_id = db.Column(db.String(36), db.ForeignKey('users.id'))
+    creator_id = db.Column(db.String(36), db.ForeignKey('users.id'), index=True)
     week = db.Column(db.SmallInteger, nullable=False, default = 0)
     title = db.Column(db.String(255))
     description = db.Column(db.Text)
@@ -30,6 +34,8 @@ class Assessment(db.Model):
     verified = db.Column(db.Boolean, default=False)  # Whether the assessment is verified
     schedule_date = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # bumped on any change to the assessment or its questions; versions the cached question sets
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     deadline = db.Column(db.DateTime, nullable=True)
     duration = db.Column(db.Integer, nullable=True)  # minutes
     blooms_level = db.Column(db.String(50), nullable=True)  # Remember, Understand, Apply, Analyze, Evaluate, Create
@@ -88,7 +94,7 @@ class Question(db.Model):
     __tablename__ = 'questions'
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    assessment_id = db.Column(db.String(36), db.ForeignKey('assessments.id'), nullable=False)
+    assessment_id = db.Column(db.String(36), db.ForeignKey('assessments.id'), nullable=False, index=True)
     text = db.Column(db.Text)
     marks = db.Column(db.Float)
     type = db.Column(db.String(50))
@@ -115,10 +121,25 @@ class Question(db.Model):
     def __repr__(self):
         return f'<Question {self.id} for Assessment {self.assessment_id}>'
 
+@event.listens_for(Question, 'after_insert')
+@event.listens_for(Question, 'after_update')
+@event.listens_for(Question, 'after_delete')
+def _touch_assessment(mapper, connection, target):
+    """Question edits bump the parent assessment's updated_at (invalidates cached question sets)."""
+    connection.execute(
+        update(Assessment.__table__)
+        .where(Assessment.__table__.c.id == target.assessment_id)
+        .values(updated_at=datetime.utcnow())
+    )
+
 
 class Submission(db.Model):
 
     __tablename__ = 'submissions'
+    __table_args__ = (
+        # a student submits an assessment once
+        db.Index('uq_submissions_assessment_student', 'assessment_id', 'student_id', unique=True),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     assessment_id = db.Column(db.String(36), db.ForeignKey('assessments.id'), nullable=False)
@@ -143,6 +164,10 @@ class Submission(db.Model):
 class Answer(db.Model):
 
     __tablename__ = 'answers'
+    __table_args__ = (
+        # a student answers a question once
+        db.Index('uq_answers_student_question', 'student_id', 'question_id', unique=True),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     question_id = db.Column(db.String(36), db.ForeignKey('questions.id'), nullable=False)
@@ -157,13 +182,18 @@ class Answer(db.Model):
         # create image_url for the dictionary representation. it should used as local server path + image_path
     @property
     def image_url(self):
-        if self.image_path:
+        return self.build_image_url(self.image_path)
+
+    @staticmethod
+    def build_image_url(image_path):
+        """Public URL of a stored answer image (also used by the Row serializers)."""
+        if image_path:
             # Return a stable API path that the frontend can request from the dev server,
             # e.g. http://localhost:8080/api/v1/bd/uploads/student_answers/<filename>
             base_url = os.getenv('PUBLIC_API_BASE_URL', '').rstrip('/')
             if not base_url:
                 base_url = "https://api.taya-dev.tech"
-            return f"{base_url}/api/v1/bd/uploads/student_answers/{self.image_path}"
+            return f"{base_url}/api/v1/bd/uploads/student_answers/{image_path}"
         return None
 
     def to_dict(self):
@@ -186,7 +216,11 @@ class Answer(db.Model):
 class Result(db.Model):
 
     __tablename__ = 'results'
-    
+    __table_args__ = (
+        # one result per answered question; the (assessment_id, student_id) prefix serves the per-submission lookups
+        db.Index('uq_results_assessment_student_question', 'assessment_id', 'student_id', 'question_id', unique=True),
+    )
+
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     student_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)  # Assuming user table exists
     assessment_id = db.Column(db.String(36), db.ForeignKey('assessments.id'), nullable=False)
@@ -241,7 +275,7 @@ class TotalMarks(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     student_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)  # Assuming user table exists
     assessment_id = db.Column(db.String(36), db.ForeignKey('assessments.id'), nullable=False)
-    submission_id = db.Column(db.String(36), db.ForeignKey('submissions.id'), nullable=False)
+    submission_id = db.Column(db.String(36), db.ForeignKey('submissions.id'), nullable=False, unique=True, index=True)
     total_marks = db.Column(db.Float)
     calculated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -261,7 +295,10 @@ class TotalMarks(db.Model):
 
 class Notes(db.Model):
     __tablename__ = 'notes'
-    
+    __table_args__ = (
+        db.Index('ix_notes_unit_created', 'unit_id', 'created_at'),
+    )
+
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     lecturer_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     course_id = db.Column(db.String(36), db.ForeignKey('courses.id'), nullable=False)
@@ -301,6 +338,85 @@ class Notes(db.Model):
     def __repr__(self):
         return f'<Notes {self.id}: {self.title} by {self.lecturer_id}>'
 
+class RegradeJob(db.Model):
+    __tablename__ = 'regrade_jobs'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    assessment_id = db.Column(db.String(36), db.ForeignKey('assessments.id', ondelete='CASCADE'), nullable=False, index=True)
+    question_id = db.Column(db.String(36), db.ForeignKey('questions.id', ondelete='CASCADE'), nullable=True)  # None = whole assessment
+    created_by = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed, failed
+    total_answers = db.Column(db.Integer, nullable=False, default=0)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    local_graded = db.Column(db.Integer, nullable=False, default=0)  # graded without an AI call (close-ended or cache hit)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, default=datetime.utcnow)  # last progress of the worker thread
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'assessment_id': self.assessment_id,
+            'question_id': self.question_id,
+            'created_by': self.created_by,
+            'status': self.status,
+            'total_answers': self.total_answers,
+            'processed': self.processed,
+            'failed': self.failed,
+            'local_graded': self.local_graded,
+            'progress': round(self.processed / self.total_answers, 4) if self.total_answers else (1.0 if self.status == 'completed' else 0.0),
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None
+        }
+
+    def __repr__(self):
+        return f'<RegradeJob {self.id} for Assessment {self.assessment_id}: {self.status}>'
+
+class StudentAssessmentProgress(db.Model):
+    """
+    Per-student, per-assessment progress projection for the student dashboard.
+    Maintained in the same transaction as the Answer/Result/Submission writes (see api.progress).
+    """
+    __tablename__ = 'student_assessment_progress'
+    __table_args__ = (
+        # dashboard lookup: all of a student's rows for a set of assessments
+        db.Index('uq_progress_student_assessment', 'student_id', 'assessment_id', unique=True),
+    )
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    student_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    assessment_id = db.Column(db.String(36), db.ForeignKey('assessments.id', ondelete='CASCADE'), nullable=False)
+    answered_count = db.Column(db.Integer, nullable=False, default=0)
+    submitted = db.Column(db.Boolean, nullable=False, default=False)
+    score = db.Column(db.Float, nullable=False, default=0.0)  # sum of graded results so far
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def status(self):
+        if self.submitted:
+            return 'completed'
+        return 'in-progress' if self.answered_count else 'start'
+
+    def to_dict(self):
+        return {
+            'student_id': self.student_id,
+            'assessment_id': self.assessment_id,
+            'answered_count': self.answered_count,
+            'submitted': self.submitted,
+            'score': self.score,
+            'status': self.status,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<StudentAssessmentProgress {self.student_id} - {self.assessment_id}: {self.status}>'
+
 # class AttemptAssessment(db.Model):
 #     __tablename__ = 'attempt_assessments'
 
@@ -392,11 +508,14 @@ class Student(db.Model):
     hobbies = db.Column(JSONB, default=list)
 
     # student relates directly to units
+    # never loaded implicitly: queries pick a loader, e.g. options(selectinload(Student.units)).
+    # student_units rows are removed by the ON DELETE CASCADE foreign keys.
     units = db.relationship(
         'Unit',
         secondary=student_units,
         back_populates='students',
-        lazy='joined'
+        lazy='raise',
+        passive_deletes=True
     )
 
     user = db.relationship('User', back_populates='student')
@@ -462,7 +581,8 @@ class Course(db.Model):
     created_by = db.Column(
         db.String(36),
         db.ForeignKey('users.id', ondelete='SET NULL'),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     # relationships
@@ -501,7 +621,8 @@ class Unit(db.Model):
         'Student',
         secondary=student_units,
         back_populates='units',
-        lazy='joined'
+        lazy='raise',
+        passive_deletes=True
     )
 
     def to_dict(self):
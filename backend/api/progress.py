@@ -0,0 +1,89 @@
+"""
+Maintenance of the student_assessment_progress projection
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Count an answer towards the student's progress
+- Add a graded result's score to the student's score so far
+- Mark an assessment as submitted with its total
+- Re-sync scores from Result rows after lecturer edits or a regrade
+All helpers only stage statements in the current session; the caller commits them
+together with the Answer/Result/Submission write they belong to.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from api import db
+from api.models import StudentAssessmentProgress
+from api.aggregation import results_sum
+
+
+def _upsert(student_id, assessment_id, set_, **values):
+    """INSERT a progress row or, when it exists, apply set_ to it (one statement, no read)."""
+    insert = pg_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+    now = datetime.utcnow()
+    stmt = insert(StudentAssessmentProgress).values(
+        id=str(uuid.uuid4()),
+        student_id=student_id,
+        assessment_id=assessment_id,
+        answered_count=values.get('answered_count', 0),
+        submitted=values.get('submitted', False),
+        score=values.get('score', 0.0),
+        updated_at=now
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StudentAssessmentProgress.student_id, StudentAssessmentProgress.assessment_id],
+        set_={**set_(stmt.excluded), 'updated_at': now}
+    )
+    db.session.execute(stmt)
+
+
+def record_answer(student_id, assessment_id):
+    """A new Answer row was added for the student."""
+    _upsert(
+        student_id, assessment_id,
+        lambda excluded: {'answered_count': StudentAssessmentProgress.answered_count + 1},
+        answered_count=1
+    )
+
+
+def record_score(student_id, assessment_id, score):
+    """A new Result row was graded for the student."""
+    _upsert(
+        student_id, assessment_id,
+        lambda excluded: {'score': StudentAssessmentProgress.score + excluded.score},
+        score=float(score or 0)
+    )
+
+
+def record_submission(student_id, assessment_id, total_marks):
+    """The student submitted the assessment; total_marks is the TotalMarks value."""
+    _upsert(
+        student_id, assessment_id,
+        lambda excluded: {'submitted': True, 'score': excluded.score},
+        submitted=True,
+        score=float(total_marks or 0)
+    )
+
+
+def sync_scores(assessment_id, student_id=None):
+    """
+    Recompute score from the Result rows for every student of an assessment (or one student),
+    with one correlated UPDATE. Use after results were changed in place.
+    """
+    stmt = (
+        update(StudentAssessmentProgress)
+        .where(StudentAssessmentProgress.assessment_id == assessment_id)
+        .values(
+            score=results_sum(StudentAssessmentProgress.student_id, StudentAssessmentProgress.assessment_id),
+            updated_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if student_id is not None:
+        stmt = stmt.where(StudentAssessmentProgress.student_id == student_id)
+    db.session.execute(stmt)
@@ -0,0 +1,98 @@
+"""
+Serialized question sets for the student dashboard
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Cache one serialized blob per assessment (assessment fields + questions)
+- Validate entries against Assessment.updated_at, which is bumped on every question insert/update/delete,
+  so edits made through any worker invalidate the entry
+- Load the questions of all missing assessments with one query
+- Shuffle questions with a per-student seed, so the order is stable across refreshes
+"""
+
+import random
+import threading
+from collections import OrderedDict
+
+from api.models import Question
+
+
+class QuestionSetCache:
+    """Thread-safe LRU of assessment_id -> (updated_at, blob)."""
+
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, assessment_id, stamp):
+        with self._lock:
+            entry = self._entries.get(assessment_id)
+            if entry is None or entry[0] != stamp:
+                return None
+            self._entries.move_to_end(assessment_id)
+            return entry[1]
+
+    def put(self, assessment_id, stamp, blob):
+        with self._lock:
+            self._entries[assessment_id] = (stamp, blob)
+            self._entries.move_to_end(assessment_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+question_set_cache = QuestionSetCache()
+
+
+def _serialize(assessment, questions):
+    """Student-independent part of the dashboard entry. Must not be mutated by callers."""
+    return {
+        'id': assessment.id,
+        'topic': assessment.topic,
+        'creator_id': assessment.creator_id,
+        'week': assessment.week,
+        'title': assessment.title,
+        'description': assessment.description,
+        'questions_type': assessment.question_types,
+        'type': assessment.type,
+        'unit_id': assessment.unit_id,
+        'course_id': assessment.course_id,
+        'total_marks': assessment.total_marks,
+        'number_of_questions': assessment.number_of_questions,
+        'difficulty': assessment.difficulty,
+        'verified': assessment.verified,
+        'created_at': assessment.created_at.isoformat(),
+        'schedule_date': assessment.schedule_date.isoformat() if assessment.schedule_date else None,
+        'deadline': assessment.deadline.isoformat() if assessment.deadline else None,
+        'duration': assessment.duration,
+        'blooms_level': assessment.blooms_level,
+        'questions': tuple(q.to_dict() for q in sorted(questions, key=lambda q: (q.created_at, q.id))),
+    }
+
+
+def question_sets(assessments):
+    """Return {assessment_id: blob} for the given assessments, loading only cache misses from the database."""
+    blobs, missing = {}, []
+    for a in assessments:
+        blob = question_set_cache.get(a.id, a.updated_at)
+        if blob is None:
+            missing.append(a)
+        else:
+            blobs[a.id] = blob
+
+    if missing:
+        questions_by_assessment = {a.id: [] for a in missing}
+        for q in Question.query.filter(Question.assessment_id.in_(questions_by_assessment)).all():
+            questions_by_assessment[q.assessment_id].append(q)
+        for a in missing:
+            blob = _serialize(a, questions_by_assessment[a.id])
+            question_set_cache.put(a.id, a.updated_at, blob)
+            blobs[a.id] = blob
+
+    return blobs
+
+
+def shuffled_for_student(questions, student_id, assessment_id):
+    """Deterministic per-student order: the same student always sees the same order for an assessment."""
+    order = list(questions)
+    random.Random(f'{student_id}:{assessment_id}').shuffle(order)
+    return order
@@ -0,0 +1,170 @@
+"""
+Read models for listing and export endpoints
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Core select() queries that fetch only the columns a listing needs, as Row tuples
+  (no ORM identity map, no relationship loaders, no per-row lookups)
+- Submission listings for lecturers (by assessment, by student) and for the student themself
+- Submission rows for the Excel exports
+"""
+
+from sqlalchemy import select, func
+
+from api import db
+from api.models import Assessment, Submission, TotalMarks, Result, Question, Student, Course, Unit
+from api.serializers import select_results, result_row, group_results
+
+
+def _total(value):
+    return value if value is not None else 0
+
+
+def assessment_submissions(assessment):
+    """Submissions of an assessment with totals, student, course/unit names and results (two queries)."""
+    submissions = db.session.execute(
+        select(
+            Submission.id.label('submission_id'), Submission.assessment_id, Submission.student_id, Submission.graded,
+            TotalMarks.total_marks, Student.firstname, Student.surname, Student.reg_number,
+            Course.name.label('course_name'), Unit.unit_name
+        )
+        .select_from(Submission)
+        .outerjoin(TotalMarks, TotalMarks.submission_id == Submission.id)
+        .outerjoin(Student, Student.user_id == Submission.student_id)
+        .join(Assessment, Assessment.id == Submission.assessment_id)
+        .outerjoin(Course, Course.id == Assessment.course_id)
+        .outerjoin(Unit, Unit.id == Assessment.unit_id)
+        .where(Submission.assessment_id == assessment.id)
+    ).all()
+
+    results_by_student = group_results(
+        db.session.execute(select_results(Result.assessment_id == assessment.id)),
+        key=lambda row: row.student_id
+    )
+
+    data = []
+    for row in submissions:
+        submission = {
+            'submission_id': row.submission_id,
+            'assessment_id': row.assessment_id,
+            'student_id': row.student_id,
+            'graded': row.graded,
+            'total_marks': _total(row.total_marks),
+            'assessment_topic': assessment.topic,
+            'course_name': row.course_name or 'Unknown Course',
+            'unit_name': row.unit_name or 'Unknown Unit',
+            'results': results_by_student.get(row.student_id, []),
+        }
+        if row.reg_number is not None:
+            submission['student_name'] = row.firstname + ' ' + row.surname
+            submission['reg_number'] = row.reg_number
+        data.append(submission)
+    return data
+
+
+def student_submission_summaries(student_id):
+    """A student's submissions with totals and results, as seen by a lecturer (two queries)."""
+    submissions = db.session.execute(
+        select(Submission.id.label('submission_id'), Submission.assessment_id, Submission.student_id,
+               Submission.graded, TotalMarks.total_marks)
+        .select_from(Submission)
+        .outerjoin(TotalMarks, TotalMarks.submission_id == Submission.id)
+        .where(Submission.student_id == student_id)
+    ).all()
+
+    assessment_ids = [row.assessment_id for row in submissions]
+    results_by_assessment = group_results(
+        db.session.execute(select_results(Result.student_id == student_id, Result.assessment_id.in_(assessment_ids))),
+        key=lambda row: row.assessment_id
+    ) if assessment_ids else {}
+
+    return [
+        {
+            'submission_id': row.submission_id,
+            'assessment_id': row.assessment_id,
+            'student_id': row.student_id,
+            'graded': row.graded,
+            'total_marks': _total(row.total_marks),
+            'results': results_by_assessment.get(row.assessment_id, []),
+        }
+        for row in submissions
+    ]
+
+
+def student_submissions(user_id):
+    """The student's own submissions with assessment details, totals and results incl. rubric (two queries)."""
+    submissions = db.session.execute(
+        select(
+            Submission.id.label('submission_id'), Submission.assessment_id, Submission.graded,
+            TotalMarks.total_marks, Assessment.unit_id, Assessment.topic,
+            Assessment.number_of_questions, Assessment.difficulty, Assessment.deadline, Assessment.duration,
+            Assessment.blooms_level, Assessment.created_at
+        )
+        .select_from(Submission)
+        .outerjoin(TotalMarks, TotalMarks.submission_id == Submission.id)
+        .outerjoin(Assessment, Assessment.id == Submission.assessment_id)
+        .where(Submission.student_id == user_id)
+    ).all()
+    if not submissions:
+        return []
+
+    results_by_assessment = {}
+    for row in db.session.execute(select_results(
+        Result.student_id == user_id,
+        Result.assessment_id.in_([s.assessment_id for s in submissions]),
+        extra_columns=(Question.rubric, Question.correct_answer)
+    )):
+        result = result_row(row)
+        # the student view reports missing questions as nulls and includes the marking key
+        result.update({
+            'question_text': row.question_text,
+            'marks': row.marks,
+            'rubric': row.rubric,
+            'correct_answer': row.correct_answer,
+        })
+        results_by_assessment.setdefault(row.assessment_id, []).append(result)
+
+    data = []
+    for row in submissions:
+        data.append({
+            'assessment_id': row.assessment_id,
+            'unit_id': row.unit_id,
+            'topic': row.topic,
+            'number_of_questions': row.number_of_questions,
+            'difficulty': row.difficulty,
+            'deadline': row.deadline,
+            'duration': row.duration,
+            'blooms_level': row.blooms_level,
+            'created_at': row.created_at,
+            'submission_id': row.submission_id,
+            'graded': row.graded,
+            'total_marks': _total(row.total_marks),
+            'results': results_by_assessment.get(row.assessment_id, []),
+        })
+    return data
+
+
+def submission_export(*criteria):
+    """Rows for the submissions Excel export, one query; criteria filter Submission/Assessment."""
+    rows = db.session.execute(
+        select(
+            Submission.id.label('submission_id'),
+            Assessment.topic.label('assessment_topic'),
+            func.coalesce(Student.firstname + ' ' + Student.surname, 'Unknown Student').label('student_name'),
+            func.coalesce(Student.reg_number, 'N/A').label('reg_number'),
+            Submission.submitted_at,
+            Submission.graded,
+            func.coalesce(TotalMarks.total_marks, 0).label('total_marks'),
+            Assessment.total_marks.label('out_of'),
+        )
+        .select_from(Submission)
+        .join(Assessment, Assessment.id == Submission.assessment_id)
+        .outerjoin(TotalMarks, TotalMarks.submission_id == Submission.id)
+        .outerjoin(Student, Student.user_id == Submission.student_id)
+        .where(*criteria)
+        .order_by(Assessment.created_at, Submission.submitted_at)
+    ).mappings()
+
+    return [
+        dict(row, submitted_at=row['submitted_at'].isoformat() if row['submitted_at'] else None)
+        for row in rows
+    ]
@@ -0,0 +1,225 @@
+"""
+Bulk regrade engine
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Create a RegradeJob for an assessment (or a single question) and run it in a background thread
+- Stream Answer rows in keyset-paginated batches
+- Grade each batch concurrently (local close-ended grader, grading cache, rate-limited AI calls)
+- Upsert Result rows in bulk and recompute TotalMarks and progress scores with set-based UPDATEs
+- Stamp heartbeat_at after every batch; a queued/running job without a heartbeat for REGRADE_STALE_SECONDS
+  lost its thread (worker restart or crash) and is marked failed so the assessment can be regraded again
+"""
+
+import os
+import time
+import logging
+import threading
+import traceback
+from datetime import datetime, timedelta
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from api import db
+from api.models import Answer, Question, Result, Student, RegradeJob
+from api.grading import grade_answer
+from api.aggregation import recompute_assessment_totals
+from api.progress import sync_scores
+
+logger = logging.getLogger(__name__)
+
+# Plain copy of the fields the graders need, safe to hand to worker threads
+QuestionSnapshot = namedtuple('QuestionSnapshot', ['id', 'text', 'type', 'rubric', 'correct_answer', 'marks'])
+
+
+class RateLimiter:
+    """Spaces out calls so that at most `per_minute` start in any minute (shared by all worker threads)."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def start_regrade(app, assessment_id, created_by, question_id=None):
+    """Create a queued RegradeJob and start processing it in a daemon thread."""
+    query = Answer.query.filter_by(assessment_id=assessment_id)
+    if question_id:
+        query = query.filter_by(question_id=question_id)
+
+    job = RegradeJob(
+        assessment_id=assessment_id,
+        question_id=question_id,
+        created_by=created_by,
+        status='queued',
+        total_answers=query.count()
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    thread = threading.Thread(target=_run_job, args=(app, job.id), name=f'regrade-{job.id}', daemon=True)
+    thread.start()
+    return job
+
+
+def stale_after_seconds(config):
+    """REGRADE_STALE_SECONDS, raised to twice the time one rate-limited batch can take."""
+    per_minute = config.get('REGRADE_LLM_RATE_PER_MINUTE', 120)
+    batch_seconds = config.get('REGRADE_BATCH_SIZE', 200) * 60.0 / per_minute if per_minute > 0 else 0
+    return max(config.get('REGRADE_STALE_SECONDS', 900), 2 * batch_seconds)
+
+
+def fail_stale_jobs(assessment_id, stale_seconds):
+    """Mark the assessment's queued/running jobs whose worker stopped reporting as failed; returns how many."""
+    now = datetime.utcnow()
+    count = RegradeJob.query.filter(
+        RegradeJob.assessment_id == assessment_id,
+        RegradeJob.status.in_(['queued', 'running']),
+        db.func.coalesce(RegradeJob.heartbeat_at, RegradeJob.created_at) < now - timedelta(seconds=stale_seconds)
+    ).update({
+        'status': 'failed',
+        'error': 'The regrade stopped without finishing (worker restarted or crashed).',
+        'finished_at': now
+    }, synchronize_session=False)
+    if count:
+        logger.warning(f"[REGRADE] Marked {count} stale job(s) failed - Assessment: {assessment_id}")
+    db.session.commit()
+    return count
+
+
+def _run_job(app, job_id):
+    with app.app_context():
+        job = RegradeJob.query.get(job_id)
+        job.status = 'running'
+        job.started_at = job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+
+        try:
+            _regrade(app, job)
+            job.status = 'completed'
+        except Exception as e:
+            logger.error(f"[REGRADE] Job failed - Job: {job_id}, Error: {str(e)}, Traceback: {traceback.format_exc()}")
+            db.session.rollback()
+            job = RegradeJob.query.get(job_id)
+            job.status = 'failed'
+            job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        db.session.remove()
+
+
+def _regrade(app, job):
+    batch_size = app.config.get('REGRADE_BATCH_SIZE', 200)
+    limiter = RateLimiter(app.config.get('REGRADE_LLM_RATE_PER_MINUTE', 120))
+    upload_dir = os.path.join(app.config.get('UPLOAD_FOLDER', 'uploads'), 'student_answers')
+
+    question_query = Question.query.filter_by(assessment_id=job.assessment_id)
+    if job.question_id:
+        question_query = question_query.filter_by(id=job.question_id)
+    questions = {
+        q.id: QuestionSnapshot(q.id, q.text, q.type, q.rubric, q.correct_answer, q.marks)
+        for q in question_query.all()
+    }
+
+    def grade(item):
+        """(answer, (grading_result, status), True when graded without an AI call)."""
+        question, answer, hobbies = item
+        image_path = os.path.join(upload_dir, answer['image_path']) if answer['image_path'] else None
+        called_llm = False
+
+        def before_llm_call():
+            nonlocal called_llm
+            called_llm = True
+            limiter.wait()
+
+        try:
+            outcome = grade_answer(question, answer['text_answer'], image_path, hobbies, before_llm_call)
+        except Exception as e:
+            logger.error(f"[REGRADE] Grading error - Answer: {answer['id']}, Error: {str(e)}")
+            outcome = {'error': 'grading_exception', 'detail': str(e)}, 500
+        return answer, outcome, not called_llm
+
+    last_id = ''
+    with ThreadPoolExecutor(max_workers=max(1, app.config.get('REGRADE_CONCURRENCY', 4))) as pool:
+        while True:
+            # keyset pagination keeps each batch an index range scan and no cursor open across commits
+            query = (
+                db.session.query(Answer.id, Answer.question_id, Answer.student_id,
+                                 Answer.text_answer, Answer.image_path)
+                .filter(Answer.assessment_id == job.assessment_id, Answer.id > last_id)
+            )
+            if job.question_id:
+                query = query.filter(Answer.question_id == job.question_id)
+            batch = [row._asdict() for row in query.order_by(Answer.id).limit(batch_size).all()]
+            if not batch:
+                break
+            last_id = batch[-1]['id']
+
+            student_ids = {a['student_id'] for a in batch}
+            hobbies = dict(
+                db.session.query(Student.user_id, Student.hobbies)
+                .filter(Student.user_id.in_(student_ids))
+                .all()
+            )
+
+            work = [(questions[a['question_id']], a, hobbies.get(a['student_id']) or [])
+                    for a in batch if a['question_id'] in questions]
+            graded_at = datetime.utcnow()
+            rows, failed, local_graded = [], 0, 0
+            for answer, (grading_result, status), graded_locally in pool.map(grade, work):
+                if status != 200:
+                    failed += 1
+                    continue
+                if graded_locally:
+                    local_graded += 1
+                rows.append({
+                    'student_id': answer['student_id'],
+                    'assessment_id': job.assessment_id,
+                    'question_id': answer['question_id'],
+                    'score': float(grading_result['score']),
+                    'feedback': grading_result.get('feedback', ''),
+                    'graded_at': graded_at,
+                })
+
+            _upsert_results(rows)
+            job.processed += len(batch)
+            job.failed += failed
+            job.local_graded += local_graded
+            job.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+            logger.info(f"[REGRADE] Batch done - Job: {job.id}, Processed: {job.processed}/{job.total_answers}, Failed: {job.failed}")
+
+    job.heartbeat_at = datetime.utcnow()
+    db.session.commit()
+    recompute_assessment_totals(job.assessment_id)
+    sync_scores(job.assessment_id)
+    db.session.commit()
+
+
+def _upsert_results(rows):
+    """INSERT ... ON CONFLICT (assessment_id, student_id, question_id) DO UPDATE in one statement."""
+    if not rows:
+        return
+    insert = pg_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+    stmt = insert(Result).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Result.assessment_id, Result.student_id, Result.question_id],
+        set_={
+            'score': stmt.excluded.score,
+            'feedback': stmt.excluded.feedback,
+            'graded_at': stmt.excluded.graded_at,
+        }
+    )
+    db.session.execute(stmt)
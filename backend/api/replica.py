@@ -0,0 +1,155 @@
+"""
+Read-replica routing
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- RoutingSession: sends the reads of @replica_reads views to the 'replica' bind (DB_REPLICA_URI)
+- Flushes, INSERT/UPDATE/DELETE statements and everything outside those views stay on the primary
+- Lag-aware fallback: the replica is skipped while its replay lag is above REPLICA_MAX_LAG_SECONDS
+  or the lag check fails
+- Read-your-writes: a request that wrote sets a short-lived cookie that keeps the client's
+  next reads on the primary until the replica has caught up
+Without DB_REPLICA_URI every query goes to the primary, as before.
+"""
+
+import math
+import time
+import logging
+import threading
+import weakref
+from functools import wraps
+
+from flask import g, request, current_app, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+REPLICA_BIND = 'replica'
+# set on responses of requests that wrote; reads go to the primary while it is present
+PIN_COOKIE = 'db_read_primary'
+
+# seconds behind the primary; 0 on a primary or an idle standby that has replayed everything
+LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+class _LagMonitor:
+    """Replica lag of one engine, re-checked at most every interval seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = None
+        self.lag = None
+
+    def current(self, engine, interval):
+        if self._checked_at is not None and time.monotonic() - self._checked_at < interval:
+            return self.lag
+        with self._lock:
+            # another thread may have refreshed it while we waited
+            if self._checked_at is not None and time.monotonic() - self._checked_at < interval:
+                return self.lag
+            self.lag = _measure_lag(engine)
+            self._checked_at = time.monotonic()
+            return self.lag
+
+
+_monitors = weakref.WeakKeyDictionary()
+_monitors_lock = threading.Lock()
+
+
+def _measure_lag(engine):
+    """Replay lag in seconds, or None when the replica cannot be reached."""
+    if engine.dialect.name != 'postgresql':
+        return 0.0
+    try:
+        with engine.connect() as connection:
+            return float(connection.execute(LAG_SQL).scalar() or 0)
+    except Exception as e:
+        logging.warning(f"[REPLICA] lag check failed, reading from the primary: {e}")
+        return None
+
+
+def replica_lag(engine):
+    with _monitors_lock:
+        monitor = _monitors.get(engine)
+        if monitor is None:
+            monitor = _monitors[engine] = _LagMonitor()
+    return monitor.current(engine, current_app.config.get('REPLICA_LAG_CHECK_SECONDS', 2))
+
+
+def replica_engine(engines):
+    """The replica engine if it is configured and within the allowed lag, else None."""
+    engine = engines.get(REPLICA_BIND)
+    if engine is None:
+        return None
+    lag = replica_lag(engine)
+    if lag is None or lag > current_app.config.get('REPLICA_MAX_LAG_SECONDS', 5):
+        return None
+    return engine
+
+
+def _reading_from_replica():
+    # once the request has written, its own later reads must see the write
+    return has_request_context() and g.get('db_use_replica', False) and not g.get('db_wrote', False)
+
+
+def _mark_write():
+    if has_request_context():
+        g.db_wrote = True
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that routes the reads of @replica_reads views to the replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and _reading_from_replica()
+                and not getattr(clause, 'is_dml', False)):
+            engine = replica_engine(self._db.engines)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _after_flush(session, flush_context):
+    _mark_write()
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _after_orm_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_write()
+
+
+def replica_reads(view):
+    """
+    Let a read-only view query the replica.
+    Clients that wrote within the last REPLICA_MAX_LAG_SECONDS (pin cookie present) stay on the primary.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if REPLICA_BIND in (current_app.config.get('SQLALCHEMY_BINDS') or {}) and PIN_COOKIE not in request.cookies:
+            g.db_use_replica = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def install(app):
+    """Set the read-your-writes cookie on responses of requests that wrote (no-op without a replica)."""
+    if REPLICA_BIND not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+        return
+
+    @app.after_request
+    def pin_reads_to_primary(response):
+        if g.get('db_wrote', False):
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=math.ceil(app.config.get('REPLICA_MAX_LAG_SECONDS', 5)) + 1,
+                httponly=True,
+                secure=app.config.get('JWT_COOKIE_SECURE', False),
+                samesite=app.config.get('JWT_COOKIE_SAMESITE'),
+            )
+        return response
@@ -11,9 +11,12 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from dotenv import load_dotenv
 
 from api import db
-from api.models import Assessment, Question, Submission, Answer, Result, TotalMarks, Course, Unit, Notes
+from api.models import Assessment, Question, Submission, Answer, Result, TotalMarks, Course, Unit, Notes, Student, student_units
+from api.question_cache import question_sets, shuffled_for_student
+from api.replica import replica_reads
 
 import os
+import hashlib
 
 load_dotenv()
 bd_blueprint = Blueprint('bd', __name__)
@@ -69,9 +72,13 @@ def serve_student_answer_image(filename):
 # endpoint for students & lecturers to get questions of an assessment
 @bd_blueprint.route('/assessments/<assessment_id>/questions', methods=['GET'])
 @jwt_required(locations=['cookies', 'headers'])
+@replica_reads
 def get_assessment_questions(assessment_id):
     """Get all questions for a specific assessment.
-    This route allows both lecturers and students to view the questions of an assessment.
+    Lecturers get the full questions. Students load them here when they open an assessment
+    (the dashboard's summary view leaves them out): only verified assessments of their enrolled units,
+    in the student's stable order, tagged answered/not answered, without rubrics and correct answers.
+    Responses carry an ETag; a matching If-None-Match gets 304 Not Modified.
     Args:
         assessment_id (str): The ID of the assessment.
     Returns:
@@ -79,17 +86,57 @@ def get_assessment_questions(assessment_id):
     """
     user_id = get_jwt_identity()
     claims = get_jwt()
-    
-    assessment = Assessment.query.get(assessment_id)
-    if not assessment:
-        return jsonify({'message': 'Assessment not found.'}), 404
-    
+    role = claims.get('role')
+
     # Check if the user has access to the assessment: => Role: lecturer or student
-    if claims['role'] != 'lecturer' and claims['role'] != 'student':
+    if role != 'lecturer' and role != 'student':
         return jsonify({'message': 'Access forbidden: Only lecturers or students can view assessment questions.'}), 403
 
-    questions = Question.query.filter_by(assessment_id=assessment.id).all()
-    return jsonify([question.to_dict() for question in questions]), 200
+    query = Assessment.query.filter_by(id=assessment_id)
+    if role == 'student':
+        query = query.filter_by(verified=True)
+    assessment = query.first()
+    if not assessment:
+        return jsonify({'message': 'Assessment not found.'}), 404
+
+    # questions come from the question-set cache, validated against assessment.updated_at
+    blob = question_sets([assessment])[assessment.id]
+    stamp = assessment.updated_at.isoformat() if assessment.updated_at else ''
+
+    if role == 'lecturer':
+        questions = list(blob['questions'])
+        etag_source = f"{stamp}:lecturer"
+    else:
+        # the student must be enrolled in the assessment's unit
+        enrolled = db.session.query(student_units.c.unit_id).join(
+            Student, Student.id == student_units.c.student_id
+        ).filter(
+            Student.user_id == user_id,
+            student_units.c.unit_id == assessment.unit_id
+        ).first()
+        if not enrolled:
+            return jsonify({'message': 'You are not enrolled in this unit.'}), 403
+
+        answered_question_ids = {
+            question_id for (question_id,) in db.session.query(Answer.question_id).filter(
+                Answer.student_id == user_id,
+                Answer.assessment_id == assessment.id
+            )
+        }
+        questions = [
+            dict({k: v for k, v in q.items() if k not in ('rubric', 'correct_answer')},
+                 status='answered' if q['id'] in answered_question_ids else 'not answered')
+            for q in shuffled_for_student(blob['questions'], user_id, assessment.id)
+        ]
+        # the payload only changes when the questions change or the student answers one
+        etag_source = f"{stamp}:{user_id}:{','.join(sorted(answered_question_ids))}"
+
+    response = jsonify(questions)
+    response.set_etag(hashlib.sha1(etag_source.encode('utf-8')).hexdigest())
+    response.cache_control.private = True
+    response.cache_control.max_age = 0
+    response.cache_control.must_revalidate = True
+    return response.make_conditional(request)
 
 # Route to download a specific note file
 @bd_blueprint.route('/notes/<note_id>/download', methods=['GET'])
@@ -0,0 +1,89 @@
+"""
+Row serializers for read-only endpoints
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Select result, answer and question columns in one Core query (no ORM objects, no relationship loaders)
+- Turn the Row tuples into the same dict shape as Result.to_dict()
+- Datetimes are left as datetime objects; the JSON provider writes them as ISO 8601
+"""
+
+from sqlalchemy import select, and_
+
+from api.models import Result, Answer, Question
+
+RESULT_COLUMNS = (
+    Result.id,
+    Result.student_id,
+    Result.assessment_id,
+    Result.question_id,
+    Result.score,
+    Result.feedback,
+    Result.graded_at,
+    Answer.id.label('answer_id'),
+    Answer.text_answer,
+    Answer.image_path,
+    Answer.saved_at,
+    Question.id.label('question_ref'),
+    Question.text.label('question_text'),
+    Question.marks,
+)
+
+
+def select_results(*criteria, extra_columns=()):
+    """Core select of result rows with their answer and question, filtered by criteria."""
+    return (
+        select(*RESULT_COLUMNS, *extra_columns)
+        .select_from(Result)
+        .outerjoin(Answer, and_(
+            Answer.question_id == Result.question_id,
+            Answer.assessment_id == Result.assessment_id,
+            Answer.student_id == Result.student_id,
+        ))
+        .outerjoin(Question, Question.id == Result.question_id)
+        .where(*criteria)
+    )
+
+
+def result_row(row):
+    """Result.to_dict() shape plus question_text/marks, built from a select_results() row."""
+    answer = None
+    image_url = None
+    if row.answer_id is not None:
+        image_url = Answer.build_image_url(row.image_path)
+        answer = {
+            'id': row.answer_id,
+            'question_id': row.question_id,
+            'assessment_id': row.assessment_id,
+            'student_id': row.student_id,
+            'text_answer': row.text_answer,
+            'image_path': row.image_path,
+            'image_url': image_url,
+            'saved_at': row.saved_at,
+        }
+
+    data = {
+        'id': row.id,
+        'student_id': row.student_id,
+        'assessment_id': row.assessment_id,
+        'question_id': row.question_id,
+        'score': row.score,
+        'feedback': row.feedback,
+        'graded_at': row.graded_at,
+        'answer': answer,
+        'image_url': image_url,
+        'text_answer': row.text_answer,
+    }
+    if row.question_ref is not None:
+        data['question_text'] = row.question_text
+        data['marks'] = row.marks
+    else:
+        data['question_text'] = 'Unknown Question'
+    return data
+
+
+def group_results(rows, key):
+    """{key(row): [result dict, ...]} preserving row order."""
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(key(row), []).append(result_row(row))
+    return grouped
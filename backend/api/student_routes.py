@@ -18,13 +18,19 @@ import logging
 
 from api import db
 # from api.models import Assessment, Question, Submission, Answer, Result, TotalMarks, Course, Unit, Notes, User, Lecturer, Student, AttemptAssessment
-from api.models import Assessment, Question, Submission, Answer, Result, TotalMarks, Course, Unit, Notes, User, Lecturer, Student
+from api.models import Assessment, Question, Submission, Answer, Result, TotalMarks, Course, Unit, Notes, User, Lecturer, Student, StudentAssessmentProgress
 from api.utils import grade_text_answer, grade_image_answer
-from sqlalchemy.orm import joinedload
+from api.aggregation import compute_total
+from api.progress import record_answer, record_score, record_submission
+from api.question_cache import question_sets, shuffled_for_student
+from api.replica import replica_reads
+from api.tracing import span
+from api.read_models import student_submissions
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.exc import IntegrityError
 
 import os
 import uuid
-import random
 # from datetime import datetime, timedelta
 from flask import request, jsonify, current_app, url_for
 from werkzeug.utils import secure_filename
@@ -48,14 +54,17 @@ def verify_jwt():
         return jsonify({"msg": "Access forbidden: Students only"}), 403
     
 @student_blueprint.route('/assessments', methods=['GET'])
+@replica_reads
 def get_student_assessments():
     """
     Get all assessments for the courses the student is enrolled in.
+    Query params:
+    - view=summary: omit the questions (load them with GET /api/v1/bd/assessments/<id>/questions when opened)
     """
     user_id = get_jwt_identity()
 
     # load student
-    student = Student.query.options(joinedload(Student.units)).filter_by(user_id=user_id).first()
+    student = Student.query.options(selectinload(Student.units)).filter_by(user_id=user_id).first()
     if not student:
         return jsonify({'message': 'Student not found.'}), 404
     
@@ -73,67 +82,53 @@ def get_student_assessments():
         return jsonify({'message': 'No assessments found.'}), 404
 
     assessment_ids = [a.id for a in assessments]
-    
-    # Batch fetch all submissions for this student (single query instead of per-assessment)
-    submissions = Submission.query.filter(
-        Submission.assessment_id.in_(assessment_ids),
-        Submission.student_id == user_id
-    ).all()
-    submission_map = {s.assessment_id: s for s in submissions}
-    
-    # Batch fetch all answers upfront (single query)
-    all_answers = Answer.query.filter_by(student_id=user_id).all()
-    answered_question_ids = {answer.question_id for answer in all_answers}
-    answer_assessment_map = {answer.assessment_id for answer in all_answers}
 
-    # build the payload
+    # Statuses come from the progress projection (one indexed lookup on student_id, assessment_id)
+    progress_map = {
+        p.assessment_id: p for p in StudentAssessmentProgress.query.filter(
+            StudentAssessmentProgress.student_id == user_id,
+            StudentAssessmentProgress.assessment_id.in_(assessment_ids)
+        ).all()
+    }
+
+    # Answered question ids, limited to the listed assessments (not needed for the summary view)
+    summary = request.args.get('view') == 'summary'
+    answered_question_ids = set()
+    if not summary:
+        answered_question_ids = {
+            question_id for (question_id,) in db.session.query(Answer.question_id).filter(
+                Answer.student_id == user_id,
+                Answer.assessment_id.in_(assessment_ids)
+            )
+        }
+
+    # Student-independent parts come from the question-set cache; only misses hit the database
+    blobs = question_sets(assessments)
+    units = {unit.id: unit for unit in student.units}
+
+    # build the payload: cached blob + per-student status, order and answered tags
     payload = []
     for a in assessments:
-        # Check submission from pre-fetched map (no query)
-        submission = submission_map.get(a.id)
-
-        if submission:
-            status = 'completed'
-        else:
-            # Check if any answered questions exist in this assessment (no query)
-            status = 'in-progress' if a.id in answer_assessment_map else 'start'
-
-        payload.append({
-            'id': a.id,
-            'topic': a.topic,
-            'creator_id': a.creator_id,
-            'week': a.week,
-            'title': a.title,
-            'description': a.description,
-            'questions_type': a.question_types,
-            'type': a.type,
-            'unit_id': a.unit_id,
-            'course_id': a.course_id,
-            'total_marks': a.total_marks,
-            'number_of_questions': a.number_of_questions,
-            'difficulty': a.difficulty,
-            'verified': a.verified,
-            'created_at': a.created_at.isoformat(),
-            'level': a.level,
-            'semester': a.semester,
-            'schedule_date': a.schedule_date.isoformat() if a.schedule_date else None,
-            'deadline': a.deadline.isoformat() if a.deadline else None,
-            'duration': a.duration,
-            'blooms_level': a.blooms_level,
-            'questions': [q.to_dict() for q in a.questions] if a.questions else [],
-            'status': status
+        blob = blobs[a.id]
+        unit = units.get(a.unit_id)
+        progress = progress_map.get(a.id)
+
+        entry = dict(blob)
+        entry.update({
+            'level': unit.level if unit else None,
+            'semester': unit.semester if unit else None,
+            'status': progress.status if progress else 'start',
         })
-
-        # shuffle the questions for each assessment
-        random.shuffle(payload[-1]['questions'])
-
-    # tag each question with answered/not answered
-    for asses in payload:
-        for q in asses['questions']:
-            q['status'] = 'answered' if q['id'] in answered_question_ids else 'not answered'
-    
-    # print(payload[0].get('schedule_date'))
-    # print(payload[1].get('schedule_date'))
+        if summary:
+            del entry['questions']
+            entry['question_count'] = len(blob['questions'])
+            entry['answered_count'] = progress.answered_count if progress else 0
+        else:
+            entry['questions'] = [
+                dict(q, status='answered' if q['id'] in answered_question_ids else 'not answered')
+                for q in shuffled_for_student(blob['questions'], user_id, a.id)
+            ]
+        payload.append(entry)
 
     return jsonify(payload), 200
 
@@ -216,13 +211,14 @@ def submit_answer(question_id):
             upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], 'student_answers')
             os.makedirs(upload_dir, exist_ok=True)
             full_file_path = os.path.join(upload_dir, filename)
-            image_file.save(full_file_path)
+            with span('file.save_answer_image', {'file.path': full_file_path}):
+                image_file.save(full_file_path)
             image_filename = filename
             logger.info(f"[SUBMIT_ANSWER] Image saved - Filename: {filename}, Path: {full_file_path}, Student: {user_id}")
 
             # Verify image is valid (Pillow)
             try:
-                with Image.open(full_file_path) as img:
+                with span('file.verify_answer_image'), Image.open(full_file_path) as img:
                     img.verify()  # will raise if not an image
                 logger.info(f"[SUBMIT_ANSWER] Image validation passed - Student: {user_id}, Filename: {filename}")
             except Exception as e:
@@ -251,6 +247,7 @@ def submit_answer(question_id):
             image_path=image_filename,
         )
         db.session.add(answer)
+        record_answer(user_id, assessment.id)
         db.session.commit()
         logger.info(f"[SUBMIT_ANSWER] Answer saved to DB - Answer ID: {answer.id}, Student: {user_id}, Question: {question_id}, Image: {image_filename}")
 
@@ -297,6 +294,7 @@ def submit_answer(question_id):
             feedback=grading_result.get('feedback', '')
         )
         db.session.add(result)
+        record_score(user_id, assessment.id, grading_result['score'])
         db.session.commit()
         logger.info(f"[SUBMIT_ANSWER] Result saved - Result ID: {result.id}, Student: {user_id}")
 
@@ -343,38 +341,28 @@ def submit_assessment(assessment_id):
         student_id=user_id,
         graded=True,  # Assume submission is graded by default
     )
-    
-    db.session.add(submission)
-    db.session.commit()
 
-    # Calculate total marks in Python
-    results = Result.query.filter_by(
-        student_id=user_id,
-        assessment_id=assessment.id
-    ).all()
+    try:
+        db.session.add(submission)
 
-    total_marks = 0.0
-    for result in results:
-        # Check if score is a dict with 'marks_awarded' key, or just a float/number
-        if result.score:
-            if isinstance(result.score, dict) and 'marks_awarded' in result.score:
-                total_marks += float(result.score['marks_awarded'])
-            elif isinstance(result.score, (int, float)):
-                # If score is already a number, use it directly
-                total_marks += float(result.score)
-            else:
-                # Handle other cases - log for debugging
-                print(f"Unexpected score format: {type(result.score)} - {result.score}")
-
-    total_marks_entry = TotalMarks(
-        student_id=user_id,
-        assessment_id=assessment.id,
-        submission_id=submission.id,
-        total_marks=total_marks
-    )
-    
-    db.session.add(total_marks_entry)
-    db.session.commit()
+        # Sum the graded results in the database (one SUM() query)
+        total_marks = compute_total(user_id, assessment.id)
+
+        total_marks_entry = TotalMarks(
+            student_id=user_id,
+            assessment_id=assessment.id,
+            submission_id=submission.id,
+            total_marks=total_marks
+        )
+        db.session.add(total_marks_entry)
+        record_submission(user_id, assessment.id, total_marks)
+
+        # submission, its total and the progress row are written in one transaction
+        db.session.commit()
+    except IntegrityError:
+        # a concurrent request submitted first (unique index on assessment_id, student_id)
+        db.session.rollback()
+        return jsonify({'message': 'You have already submitted this assessment.'}), 400
 
     return jsonify({
         'message': 'Assessment submitted successfully.',
@@ -383,6 +371,7 @@ def submit_assessment(assessment_id):
     }), 201
 
 @student_blueprint.route('/submissions', methods=['GET'])
+@replica_reads
 def get_student_submissions():
     """
     Get all submissions for a student.
@@ -392,106 +381,25 @@ def get_student_submissions():
     logger = logging.getLogger(__name__)
     logger.info(f"[GET_SUBMISSIONS] Fetching submissions - Student: {user_id}")
 
-    submissions = Submission.query.filter_by(student_id=user_id).all()
-    if not submissions:
+    # Submissions, totals, assessment details and results from the read model (two Core queries)
+    submissions_data = student_submissions(user_id)
+    if not submissions_data:
         logger.warning(f"[GET_SUBMISSIONS] No submissions found - Student: {user_id}")
         return jsonify({'message': 'No submissions found for this student.'}), 404
 
-    submission_ids = [s.id for s in submissions]
-    assessment_ids = [s.assessment_id for s in submissions]
-    
-    # Batch fetch total marks (single query instead of per-submission)
-    total_marks_list = TotalMarks.query.filter(TotalMarks.submission_id.in_(submission_ids)).all()
-    total_marks_map = {tm.submission_id: tm for tm in total_marks_list}
-    
-    # Batch fetch all results (single query instead of per-submission)
-    results_list = Result.query.options(joinedload(Result.answer)).filter(
-        Result.assessment_id.in_(assessment_ids),
-        Result.student_id == user_id
-    ).all()
-    results_by_assessment = {}
-    for result in results_list:
-        if result.assessment_id not in results_by_assessment:
-            results_by_assessment[result.assessment_id] = []
-        results_by_assessment[result.assessment_id].append(result)
-    
-    # Batch fetch all questions (single query instead of per-result)
-    all_question_ids = [r.question_id for r in results_list]
-    questions = Question.query.filter(Question.id.in_(all_question_ids)).all() if all_question_ids else []
-    question_map = {q.id: q for q in questions}
-    
-    # Batch fetch all assessments (single query instead of per-submission)
-    assessments = Assessment.query.filter(Assessment.id.in_(assessment_ids)).all()
-    assessment_map = {a.id: a for a in assessments}
-
-    logger.info(f"[GET_SUBMISSIONS] Found {len(submissions)} submissions - Student: {user_id}")
-
-    # combined the submissions with their total marks and results
-    submissions_data = []
-    for submission in submissions:
-        total_marks_entry = total_marks_map.get(submission.id)
-        results = results_by_assessment.get(submission.assessment_id, [])
-
-        logger.info(f"[GET_SUBMISSIONS] Processing submission - Submission ID: {submission.id}, Student: {user_id}")
-
-        results_data = []
-        for result in results:
-            logger.debug(f"[GET_SUBMISSIONS] Processing result - Result ID: {result.id}, Has Answer: {result.answer is not None}, Has Image: {result.answer.image_path if result.answer else None}")
-            result_dict = result.to_dict()
-            # Get the question from pre-fetched map (no query)
-            question = question_map.get(result.question_id)
-            result_dict['question_text'] = question.text if question else None
-            result_dict['marks'] = question.marks if question else None
-            result_dict['rubric'] = question.rubric if question else None
-            result_dict['correct_answer'] = question.correct_answer if question else None
-            results_data.append(result_dict)
-
-        # Get assessment from pre-fetched map (no query)
-        assessment = assessment_map.get(submission.assessment_id)
-        
-        if assessment:
-            submission_data = {
-                'assessment_id': assessment.id,
-                'unit_id': assessment.unit_id,
-                'topic': assessment.topic,
-                'number_of_questions': assessment.number_of_questions,
-                'difficulty': assessment.difficulty,
-                'deadline': assessment.deadline.isoformat() if assessment.deadline else None,
-                'duration': assessment.duration,
-                'blooms_level': assessment.blooms_level,
-                'created_at': assessment.created_at.isoformat(),
-            }
-        else:
-            submission_data = {
-                'assessment_id': submission.assessment_id,
-                'unit_id': None,
-                'topic': None,
-                'number_of_questions': None,
-                'difficulty': None,
-                'deadline': None,
-                'duration': None,
-                'blooms_level': None,
-                'created_at': None,
-            }
-
-        submission_data.update({
-            'submission_id': submission.id,
-            'graded': submission.graded,
-            'total_marks': total_marks_entry.total_marks if total_marks_entry else 0,
-            'results': results_data,
-        })
-        submissions_data.append(submission_data)
+    logger.info(f"[GET_SUBMISSIONS] Found {len(submissions_data)} submissions - Student: {user_id}")
 
     return jsonify(submissions_data), 200
 
 @student_blueprint.route('/notes', methods=['GET'])
+@replica_reads
 def get_student_notes():
     """
     Get all notes for the courses a student is enrolled in.
     """
     user_id = get_jwt_identity()
 
-    student = Student.query.options(joinedload(Student.units)).filter_by(user_id=user_id).first()
+    student = Student.query.options(selectinload(Student.units)).filter_by(user_id=user_id).first()
     if not student:
         return jsonify({'message': 'Student not found.'}), 404
 
@@ -19,6 +19,9 @@ import mimetypes
 import io
 from pypdf import PdfReader
 
+from api.metrics import llm_call
+from api.tracing import span, SPAN_KIND_CLIENT
+
 load_dotenv()
 
 # Set up logging
@@ -299,21 +302,24 @@ def ai_create_assessment(data):
     content = ""
 
     try:
-        stream = client.chat.completions.create(
-            model=model_deployment_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=9000,      # REDUCED
-            temperature=0.8,
-            top_p=0.95,
-            stream=True
-        )
-
-        for chunk in stream:
-            if chunk.choices and chunk.choices[0].delta.content:
-                content += chunk.choices[0].delta.content
+        with llm_call(model_deployment_name, 'generate_assessment') as call, span('llm.generate_assessment', {'llm.model': model_deployment_name}, SPAN_KIND_CLIENT):
+            stream = client.chat.completions.create(
+                model=model_deployment_name,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=9000,      # REDUCED
+                temperature=0.8,
+                top_p=0.95,
+                stream=True
+            )
+
+            for chunk in stream:
+                # usage only arrives on the last chunk of endpoints that send it for streams
+                call.usage(getattr(chunk, 'usage', None))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    content += chunk.choices[0].delta.content
 
     except Exception as e:
         # Log the error and raise a more informative exception
@@ -349,7 +355,7 @@ def ai_create_assessment_from_pdf(data, pdf_path):
     not simple recall of facts from the document.
     '''
     # Read and extract text from the PDF file
-    with open(pdf_path, 'rb') as pdf_file:
+    with span('file.read_pdf', {'file.path': pdf_path}), open(pdf_path, 'rb') as pdf_file:
         reader = PdfReader(pdf_file)
         text = []
         for page in reader.pages:
@@ -471,21 +477,24 @@ def ai_create_assessment_from_pdf(data, pdf_path):
     content = ""
 
     try:
-        stream = client.chat.completions.create(
-            model=model_deployment_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=9000,
-            temperature=0.8,
-            top_p=0.95,
-            stream=True
-        )
-
-        for chunk in stream:
-            if chunk.choices and chunk.choices[0].delta.content:
-                content += chunk.choices[0].delta.content
+        with llm_call(model_deployment_name, 'generate_assessment_pdf') as call, span('llm.generate_assessment_pdf', {'llm.model': model_deployment_name}, SPAN_KIND_CLIENT):
+            stream = client.chat.completions.create(
+                model=model_deployment_name,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=9000,
+                temperature=0.8,
+                top_p=0.95,
+                stream=True
+            )
+
+            for chunk in stream:
+                # usage only arrives on the last chunk of endpoints that send it for streams
+                call.usage(getattr(chunk, 'usage', None))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    content += chunk.choices[0].delta.content
 
     except Exception as e:
         # Log the error and raise a more informative exception
@@ -512,7 +521,7 @@ def grade_image_answer(filename, question_text, rubric, correct_answer, marks, s
     
     # read image and build a data URL
     try:
-        with open(filename, "rb") as f:
+        with span('file.read_image', {'file.path': filename}), open(filename, "rb") as f:
             img_bytes = f.read()
         logger.info(f"[GRADE_IMAGE_ANSWER] Image file read successfully - Size: {len(img_bytes)} bytes")
     except Exception as e:
@@ -584,21 +593,23 @@ def grade_image_answer(filename, question_text, rubric, correct_answer, marks, s
 
     try:
         logger.info(f"[GRADE_IMAGE_ANSWER] API call starting - Model: {model}, Temperature: 0.5, Using standard chat completions API")
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": [
-                    {"type": "text", "text": user_prompt},
-                    {"type": "image_url", "image_url": {"url": data_url}}
-                ]}
-            ],
-            max_tokens=800,
-            temperature=0.5,
-            top_p=1.0,
-            stream=False,
-            timeout=60
-        )
+        with llm_call(model, 'grade_image') as call, span('llm.grade_image', {'llm.model': model}, SPAN_KIND_CLIENT):
+            response = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": [
+                        {"type": "text", "text": user_prompt},
+                        {"type": "image_url", "image_url": {"url": data_url}}
+                    ]}
+                ],
+                max_tokens=800,
+                temperature=0.5,
+                top_p=1.0,
+                stream=False,
+                timeout=60
+            )
+            call.usage(getattr(response, 'usage', None))
         logger.info(f"[GRADE_IMAGE_ANSWER] API call completed - Response type: {type(response)}")
         logger.debug(f"[GRADE_IMAGE_ANSWER] Full response object: {response}")
         
@@ -756,18 +767,20 @@ def grade_text_answer(text_answer, question_text, rubric, correct_answer, marks,
         """{\n    "score": <numeric_score>,\n    "feedback": "Detailed explanation: [What was expected] + [What was correct] + [What was incorrect/incomplete] + [How marks were allocated] + [Suggestions for improvement]"\n}"""
     )
 
-    response = client.chat.completions.create(
-        model=model_deployment_name,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        max_tokens=800,  # Increased for detailed feedback
-        temperature=0.5,  # Lower for consistent grading
-        top_p=1.0,
-        stream=False,
-        timeout=30
-    )
+    with llm_call(model_deployment_name, 'grade_text') as call, span('llm.grade_text', {'llm.model': model_deployment_name}, SPAN_KIND_CLIENT):
+        response = client.chat.completions.create(
+            model=model_deployment_name,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=800,  # Increased for detailed feedback
+            temperature=0.5,  # Lower for consistent grading
+            top_p=1.0,
+            stream=False,
+            timeout=30
+        )
+        call.usage(getattr(response, 'usage', None))
     logger.info(f"[GRADE_TEXT_ANSWER] API call completed - Model: {model_deployment_name}, Response type: {type(response)}")
 
     if not hasattr(response, "choices") or len(response.choices) == 0:
@@ -5,6 +5,8 @@ from flask_jwt_extended import JWTManager
 
 from config import Config
 from api import db
+from api.json_provider import FastJSONProvider
+from api import pool_metrics, replica, metrics, tracing, sql_profiler
 # from api.nvidia_routes import bd_blueprint
 from api.routes import bd_blueprint
 from api.lec_routes import lec_blueprint
@@ -19,9 +21,20 @@ def create_app():
 
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = FastJSONProvider(app)
 
-    # Initialize the database with the app
+    # Initialize the database with the app (instrumented connection pool)
+    pool_metrics.install(app)
     db.init_app(app)
+    # Keep a client's reads on the primary right after it writes (only with DB_REPLICA_URI)
+    replica.install(app)
+    # Request, DB, LLM and grading queue metrics at GET /metrics
+    metrics.install(app)
+    # Continue the gateway's trace; spans for SQL, file I/O and LLM calls (TRACE_FILE / OTEL_EXPORTER_OTLP_ENDPOINT)
+    tracing.install(app, 'backend')
+    tracing.instrument_sqlalchemy()
+    # Per-request query count/time, Server-Timing header and slow-query log (only with SQL_PROFILING=True)
+    sql_profiler.install(app)
 
     # Ensure the upload folder exists
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -42,6 +55,11 @@ def create_app():
     def health_check():
         return {"status": "ok"}, 200
 
+    # Connection pool gauges and checkout wait times of this worker process
+    @app.route('/api/v1/bd/health/db-pool', methods=['GET'])
+    def db_pool_health():
+        return {"pid": os.getpid(), "pools": pool_metrics.snapshot_all(db.engines)}, 200
+
     # Register blueprints
     app.register_blueprint(bd_blueprint, url_prefix='/api/v1/bd')
     app.register_blueprint(lec_blueprint, url_prefix='/api/v1/bd/lecturer')
@@ -0,0 +1,130 @@
+"""
+Synthetic dataset shared by the backend benchmarks.
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Bulk insert lecturers, courses, units, students, assessments, answers, results and submissions
+- Leave a third of the attempts unsubmitted with half the questions answered, and write the
+  student_assessment_progress row of every attempt, so dashboards see completed, in-progress and start
+- Return a sample of ids the benchmarks can query with
+"""
+
+import uuid
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from api import db
+from api.models import (
+    User, Student, Lecturer, Course, Unit, Assessment, Question,
+    Submission, Answer, Result, TotalMarks, Notes, StudentAssessmentProgress, student_units
+)
+
+
+def _id():
+    return str(uuid.uuid4())
+
+
+def seed(lecturers, units_per_lecturer, students, assessments_per_unit, questions_per_assessment):
+    """Bulk insert a synthetic dataset and return a sample of ids to query with."""
+    now = datetime.utcnow()
+    rows = {model: [] for model in (User, Lecturer, Student, Course, Unit, Assessment, Question,
+                                    Submission, Answer, Result, TotalMarks, Notes, StudentAssessmentProgress)}
+    enrolments = []
+
+    lecturer_ids = []
+    for i in range(lecturers):
+        uid = _id()
+        lecturer_ids.append(uid)
+        rows[User].append({'id': uid, 'email': f'lec{i}-{uid[:8]}@bench.ac.ke', 'password': 'x',
+                           'role': 'lecturer', 'created_at': now, 'updated_at': now})
+        rows[Lecturer].append({'id': _id(), 'user_id': uid, 'firstname': 'Lec', 'surname': str(i)})
+
+    student_ids = []
+    student_user_ids = []
+    for i in range(students):
+        uid = _id()
+        sid = _id()
+        student_ids.append(sid)
+        student_user_ids.append(uid)
+        rows[User].append({'id': uid, 'email': f'stu{i}-{uid[:8]}@bench.ac.ke', 'password': 'x',
+                           'role': 'student', 'created_at': now, 'updated_at': now})
+        rows[Student].append({'id': sid, 'user_id': uid, 'reg_number': f'BENCH/{uid[:12]}',
+                              'firstname': 'Stu', 'surname': str(i), 'hobbies': []})
+
+    unit_ids = []
+    for lec in lecturer_ids:
+        course_id = _id()
+        rows[Course].append({'id': course_id, 'code': 'BEN', 'name': 'Bench', 'department': 'CS',
+                             'school': 'SCI', 'created_by': lec})
+        for _ in range(units_per_lecturer):
+            unit_id = _id()
+            unit_ids.append(unit_id)
+            rows[Unit].append({'id': unit_id, 'unit_code': 'B100', 'unit_name': 'Bench unit', 'level': 1,
+                               'semester': 1, 'course_id': course_id, 'unique_join_code': unit_id[:12]})
+            rows[Notes].append({'id': _id(), 'lecturer_id': lec, 'course_id': course_id, 'unit_id': unit_id,
+                                'title': 'n', 'original_filename': 'n.pdf', 'stored_filename': 'n.pdf',
+                                'file_path': 'notes/n.pdf', 'file_size': 1, 'file_type': 'pdf',
+                                'mime_type': 'application/pdf', 'created_at': now, 'updated_at': now})
+            for _ in range(assessments_per_unit):
+                assessment_id = _id()
+                rows[Assessment].append({'id': assessment_id, 'creator_id': lec, 'week': 1, 'title': 'CAT',
+                                         'unit_id': unit_id, 'course_id': course_id, 'verified': random.random() < 0.8,
+                                         'total_marks': questions_per_assessment * 5, 'created_at': now})
+                question_ids = [_id() for _ in range(questions_per_assessment)]
+                for qid in question_ids:
+                    rows[Question].append({'id': qid, 'assessment_id': assessment_id, 'text': 'q', 'marks': 5.0,
+                                           'type': 'open-ended', 'created_at': now})
+                # a random slice of students attempts each assessment; the first always submits
+                attempts = random.sample(student_user_ids, k=max(1, len(student_user_ids) // 10))
+                for attempt, user_id in enumerate(attempts):
+                    submitted = attempt == 0 or random.random() < 2 / 3
+                    answered = question_ids if submitted else question_ids[:max(1, len(question_ids) // 2)]
+                    total = 0.0
+                    for qid in answered:
+                        score = float(random.randint(0, 5))
+                        total += score
+                        rows[Answer].append({'id': _id(), 'question_id': qid, 'assessment_id': assessment_id,
+                                             'student_id': user_id, 'text_answer': 'a', 'saved_at': now})
+                        rows[Result].append({'id': _id(), 'student_id': user_id, 'assessment_id': assessment_id,
+                                             'question_id': qid, 'score': score, 'feedback': '', 'graded_at': now})
+                    # the projection api.progress keeps in step with these writes
+                    rows[StudentAssessmentProgress].append({'id': _id(), 'student_id': user_id,
+                                                            'assessment_id': assessment_id,
+                                                            'answered_count': len(answered), 'submitted': submitted,
+                                                            'score': total, 'updated_at': now})
+                    if not submitted:
+                        continue
+                    submission_id = _id()
+                    rows[Submission].append({'id': submission_id, 'assessment_id': assessment_id, 'student_id': user_id,
+                                             'submitted_at': now - timedelta(minutes=5), 'graded': True})
+                    rows[TotalMarks].append({'id': _id(), 'student_id': user_id, 'assessment_id': assessment_id,
+                                             'submission_id': submission_id, 'total_marks': total, 'calculated_at': now})
+
+    for sid in student_ids:
+        for unit_id in random.sample(unit_ids, k=min(6, len(unit_ids))):
+            enrolments.append({'student_id': sid, 'unit_id': unit_id})
+
+    for model, batch in rows.items():
+        for start in range(0, len(batch), 5000):
+            db.session.execute(insert(model), batch[start:start + 5000])
+    for start in range(0, len(enrolments), 5000):
+        db.session.execute(insert(student_units), enrolments[start:start + 5000])
+    db.session.commit()
+
+    # GET /assessments/<id>/questions only serves verified assessments to enrolled students
+    verified_units = {a['id']: a['unit_id'] for a in rows[Assessment] if a['verified']}
+    user_of_student = {r['id']: r['user_id'] for r in rows[Student]}
+    enrolled = {(user_of_student[e['student_id']], e['unit_id']) for e in enrolments}
+    sample = next(
+        (r for r in rows[Submission] if (r['student_id'], verified_units.get(r['assessment_id'])) in enrolled),
+        rows[Submission][0]
+    )
+    return {
+        'assessment': sample['assessment_id'],
+        'student': sample['student_id'],
+        'submission': sample['id'],
+        'question': next(r['question_id'] for r in rows[Answer] if r['student_id'] == sample['student_id']),
+        'units': unit_ids[:6],
+        'lecturer': lecturer_ids[0],
+    }
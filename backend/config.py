@@ -6,9 +6,40 @@ class Config():
     load_dotenv()
     SQLALCHEMY_DATABASE_URI=os.getenv('DB_URI')
     SQLALCHEMY_TRACK_MODIFICATIONS=os.getenv('TRACK_MODIFICATIONS')
+    # Connection pool per worker process (gunicorn runs 3 workers x 4 threads, plus regrade threads).
+    # Keep workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW), summed over all services, below Postgres max_connections.
+    SQLALCHEMY_ENGINE_OPTIONS={
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 5)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'True').lower() in ('true', '1', 't'),
+    }
+    # Optional read replica for GET listings, dashboards, exports and analytics (see api/replica.py).
+    # Reads fall back to the primary while the replica lags more than REPLICA_MAX_LAG_SECONDS.
+    DB_REPLICA_URI=os.getenv('DB_REPLICA_URI')
+    SQLALCHEMY_BINDS={'replica': DB_REPLICA_URI} if DB_REPLICA_URI else {}
+    REPLICA_MAX_LAG_SECONDS=float(os.getenv('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_LAG_CHECK_SECONDS=float(os.getenv('REPLICA_LAG_CHECK_SECONDS', 2))
+    # Span export (api/tracing.py): a JSON lines file and/or an OTLP/HTTP collector, e.g. http://localhost:4318
+    TRACE_FILE=os.getenv('TRACE_FILE')
+    OTEL_EXPORTER_OTLP_ENDPOINT=os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT')
+    TRACE_SAMPLE_RATIO=float(os.getenv('TRACE_SAMPLE_RATIO', 1.0))
+    # Opt-in SQL profiler (api/sql_profiler.py): Server-Timing header, per-request JSON log, slow-query log
+    SQL_PROFILING=os.getenv('SQL_PROFILING', 'False').lower() in ('true', '1', 't')
+    SLOW_QUERY_MS=float(os.getenv('SLOW_QUERY_MS', 200))
+    SLOW_QUERY_LOG=os.getenv('SLOW_QUERY_LOG', 'logs/slow_queries.log')
+    SQL_PROFILE_TOP=int(os.getenv('SQL_PROFILE_TOP', 3))
+    # Bearer token required by GET /metrics; /metrics is disabled (404) without it
+    METRICS_TOKEN=os.getenv('METRICS_TOKEN')
     JWT_SECRET_KEY=os.getenv('JWT_SECRET_KEY')
     SECRET_KEY=os.getenv('SECRET_KEY')
     JWT_COOKIE_CSRF_PROTECT = False
     UPLOAD_FOLDER=os.getenv('UPLOAD_FOLDER')
     MAX_CONTENT_LENGTH=int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # Default to 16MB
     ALLOWED_EXTENSIONS=os.getenv('ALLOWED_EXTENSIONS', 'png,jpg,jpeg').split(',')
+    # Bulk regrade: answers per batch, concurrent AI grading calls and AI calls per minute
+    REGRADE_BATCH_SIZE=int(os.getenv('REGRADE_BATCH_SIZE', 200))
+    REGRADE_CONCURRENCY=int(os.getenv('REGRADE_CONCURRENCY', 4))
+    REGRADE_LLM_RATE_PER_MINUTE=int(os.getenv('REGRADE_LLM_RATE_PER_MINUTE', 120))
+    REGRADE_STALE_SECONDS=int(os.getenv('REGRADE_STALE_SECONDS', 900))
@@ -0,0 +1,46 @@
+"""add indexes for hot query filters
+
+Revision ID: 3f2a9c1d7b64
+Revises:
+Create Date: 2026-10-19 09:12:44.118203
+
+Tables are still bootstrapped with db.create_all() in manage.py, so every
+index is created with if_not_exists and this revision is safe to run against
+a database that was created from the current models.
+
+The unique indexes fail if duplicate rows already exist (e.g. a student with
+two submissions for the same assessment); clean those up before upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b64'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    # (name, table, columns, unique)
+    ('uq_submissions_assessment_student', 'submissions', ['assessment_id', 'student_id'], True),
+    ('uq_answers_student_question', 'answers', ['student_id', 'question_id'], True),
+    ('uq_results_assessment_student_question', 'results', ['assessment_id', 'student_id', 'question_id'], True),
+    ('ix_total_marks_submission_id', 'total_marks', ['submission_id'], True),
+    ('ix_questions_assessment_id', 'questions', ['assessment_id'], False),
+    ('ix_assessments_unit_verified', 'assessments', ['unit_id', 'verified'], False),
+    ('ix_assessments_creator_id', 'assessments', ['creator_id'], False),
+    ('ix_notes_unit_created', 'notes', ['unit_id', 'created_at'], False),
+    ('ix_courses_created_by', 'courses', ['created_by'], False),
+]
+
+
+def upgrade():
+    for name, table, columns, unique in INDEXES:
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _columns, _unique in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,46 @@
+"""add regrade_jobs
+
+Revision ID: 8c41e07a2d95
+Revises: 3f2a9c1d7b64
+Create Date: 2026-10-19 11:03:27.540918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41e07a2d95'
+down_revision = '3f2a9c1d7b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'regrade_jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('assessment_id', sa.String(length=36), nullable=False),
+        sa.Column('question_id', sa.String(length=36), nullable=True),
+        sa.Column('created_by', sa.String(length=36), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('total_answers', sa.Integer(), nullable=False),
+        sa.Column('processed', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.Column('local_graded', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['assessment_id'], ['assessments.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('ix_regrade_jobs_assessment_id', 'regrade_jobs', ['assessment_id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_regrade_jobs_assessment_id', table_name='regrade_jobs', if_exists=True)
+    op.drop_table('regrade_jobs')
@@ -0,0 +1,61 @@
+"""add student_assessment_progress
+
+Revision ID: b71e3d5a9c20
+Revises: 8c41e07a2d95
+Create Date: 2026-10-19 13:42:08.119204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71e3d5a9c20'
+down_revision = '8c41e07a2d95'
+branch_labels = None
+depends_on = None
+
+
+# one row per (student, assessment) that has answers or a submission
+BACKFILL = """
+INSERT INTO student_assessment_progress (id, student_id, assessment_id, answered_count, submitted, score, updated_at)
+SELECT
+    md5(k.student_id || ':' || k.assessment_id)::uuid::text,
+    k.student_id,
+    k.assessment_id,
+    (SELECT count(*) FROM answers a WHERE a.student_id = k.student_id AND a.assessment_id = k.assessment_id),
+    EXISTS (SELECT 1 FROM submissions s WHERE s.student_id = k.student_id AND s.assessment_id = k.assessment_id),
+    COALESCE((SELECT sum(r.score) FROM results r WHERE r.student_id = k.student_id AND r.assessment_id = k.assessment_id), 0),
+    now()
+FROM (
+    SELECT student_id, assessment_id FROM answers
+    UNION
+    SELECT student_id, assessment_id FROM submissions
+) AS k
+ON CONFLICT (student_id, assessment_id) DO NOTHING
+"""
+
+
+def upgrade():
+    op.create_table(
+        'student_assessment_progress',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('student_id', sa.String(length=36), nullable=False),
+        sa.Column('assessment_id', sa.String(length=36), nullable=False),
+        sa.Column('answered_count', sa.Integer(), nullable=False),
+        sa.Column('submitted', sa.Boolean(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['assessment_id'], ['assessments.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['student_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('uq_progress_student_assessment', 'student_assessment_progress',
+                    ['student_id', 'assessment_id'], unique=True, if_not_exists=True)
+    op.execute(BACKFILL)
+
+
+def downgrade():
+    op.drop_index('uq_progress_student_assessment', table_name='student_assessment_progress', if_exists=True)
+    op.drop_table('student_assessment_progress')
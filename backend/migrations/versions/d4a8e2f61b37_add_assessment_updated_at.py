@@ -0,0 +1,29 @@
+"""add assessments.updated_at
+
+Revision ID: d4a8e2f61b37
+Revises: b71e3d5a9c20
+Create Date: 2026-10-19 14:20:51.603377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8e2f61b37'
+down_revision = 'b71e3d5a9c20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # manage.py runs db.create_all() before the upgrade, so a new database already has the column
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('assessments')}
+    if 'updated_at' in columns:
+        return
+    op.add_column('assessments', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE assessments SET updated_at = COALESCE(created_at, now())')
+
+
+def downgrade():
+    op.drop_column('assessments', 'updated_at')
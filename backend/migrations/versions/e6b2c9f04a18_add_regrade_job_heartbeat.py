@@ -0,0 +1,29 @@
+"""add regrade_jobs.heartbeat_at
+
+Revision ID: e6b2c9f04a18
+Revises: d4a8e2f61b37
+Create Date: 2026-10-19 16:05:12.284613
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b2c9f04a18'
+down_revision = 'd4a8e2f61b37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # manage.py runs db.create_all() before the upgrade, so a new database already has the column
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('regrade_jobs')}
+    if 'heartbeat_at' in columns:
+        return
+    op.add_column('regrade_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE regrade_jobs SET heartbeat_at = COALESCE(started_at, created_at)')
+
+
+def downgrade():
+    op.drop_column('regrade_jobs', 'heartbeat_at')
@@ -0,0 +1,53 @@
+"""
+Shared setup for the service tests
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Point the app at a throwaway SQLite file (TEST_DB_URI overrides it, e.g. a Postgres test database)
+- Render the Postgres JSONB columns as JSON on SQLite
+- ServiceTestCase: fresh tables per test, a test client and JWT headers per user
+"""
+
+import os
+import atexit
+import shutil
+import tempfile
+import unittest
+
+_tmp_dir = tempfile.mkdtemp(prefix='uamas-backend-tests-')
+atexit.register(shutil.rmtree, _tmp_dir, True)
+os.environ['DB_URI'] = os.getenv('TEST_DB_URI') or f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}"
+os.environ.setdefault('JWT_SECRET_KEY', 'test-secret-key-of-at-least-32-bytes')
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+os.environ['UPLOAD_FOLDER'] = os.path.join(_tmp_dir, 'uploads')
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+@compiles(JSONB, 'sqlite')
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return 'JSON'
+
+
+from flask_jwt_extended import create_access_token
+
+from app import app
+from api import db
+
+
+class ServiceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.drop_all()
+        db.create_all()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        self.app_context.pop()
+
+    def headers(self, user_id, role):
+        return {'Authorization': 'Bearer ' + create_access_token(identity=user_id, additional_claims={'role': role})}
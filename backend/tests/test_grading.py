@@ -0,0 +1,113 @@
+"""
+Close-ended grading: local grading only when no partial credit is possible, live submissions on the AI grader
+"""
+
+import unittest
+from unittest import mock
+
+from support import ServiceTestCase
+from api import db
+from api.grading import grade_close_ended, grade_answer, grading_cache
+from api.models import User, Lecturer, Student, Course, Unit, Assessment, Question, Result
+from api.regrade import QuestionSnapshot
+
+
+class GradeCloseEndedTest(unittest.TestCase):
+
+    def test_correct_single_choice_gets_full_marks(self):
+        self.assertEqual(grade_close_ended('close-ended-multiple-single', 'Paris', ['Paris'], 2),
+                         ({'score': 2.0, 'feedback': 'Correct.'}, 200))
+
+    def test_single_choice_with_a_comma_is_one_choice(self):
+        result, _ = grade_close_ended('close-ended-multiple-single', 'Nairobi, Kenya', ['Nairobi, Kenya'], 2)
+        self.assertEqual(result['score'], 2.0)
+
+    def test_wrong_single_choice_does_not_reveal_the_answer(self):
+        result, status = grade_close_ended('close-ended-multiple-single', 'Lyon', ['Paris'], 2)
+        self.assertEqual((result['score'], status), (0.0, 200))
+        self.assertNotIn('paris', result['feedback'].lower())
+
+    def test_comma_separated_multiple_choice(self):
+        for answer in ('A, C', 'C,A', '["A", "C"]'):
+            result, _ = grade_close_ended('close-ended-multiple-multiple', answer, ['A', 'C'], 4)
+            self.assertEqual(result['score'], 4.0, answer)
+
+    def test_comma_separated_ordering(self):
+        result, _ = grade_close_ended('close-ended-ordering', 'first, second, third', ['First', 'Second', 'Third'], 3)
+        self.assertEqual(result['score'], 3.0)
+
+    def test_partly_right_answers_are_left_to_the_ai_grader(self):
+        self.assertIsNone(grade_close_ended('close-ended-multiple-multiple', 'A', ['A', 'C'], 4))
+        self.assertIsNone(grade_close_ended('close-ended-multiple-multiple', 'A, B, C', ['A', 'C'], 4))
+        self.assertIsNone(grade_close_ended('close-ended-ordering', 'second, first, third', ['first', 'second', 'third'], 3))
+
+    def test_other_question_types_are_left_to_the_ai_grader(self):
+        self.assertIsNone(grade_close_ended('close-ended-bool', 'True', ['True'], 1))
+        self.assertIsNone(grade_close_ended('open-ended', 'An essay', ['A model answer'], 10))
+
+
+class GradeAnswerTest(unittest.TestCase):
+
+    def setUp(self):
+        grading_cache._entries.clear()
+
+    def test_partial_answer_gets_the_rubric_partial_credit(self):
+        question = QuestionSnapshot('q1', 'Pick the primes', 'close-ended-multiple-multiple',
+                                    '2 marks per prime', ['2', '3'], 4)
+        with mock.patch('api.grading.grade_text_answer', return_value=({'score': 2.0, 'feedback': 'One of two.'}, 200)) as ai:
+            result, status = grade_answer(question, '2, 4')
+        ai.assert_called_once()
+        self.assertEqual((result['score'], status), (2.0, 200))
+
+    def test_correct_answer_skips_the_ai_grader(self):
+        question = QuestionSnapshot('q1', 'Pick the primes', 'close-ended-multiple-multiple',
+                                    '2 marks per prime', ['2', '3'], 4)
+        with mock.patch('api.grading.grade_text_answer') as ai:
+            result, _ = grade_answer(question, '3, 2')
+        ai.assert_not_called()
+        self.assertEqual(result['score'], 4.0)
+
+
+class SubmitAnswerTest(ServiceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        lecturer = User(email='lecturer@example.com', password='x', role='lecturer')
+        student = User(email='student@example.com', password='x', role='student')
+        db.session.add_all([lecturer, student])
+        db.session.flush()
+        db.session.add(Lecturer(user_id=lecturer.id, firstname='Lec', surname='Turer'))
+        course = Course(code='C1', name='Course', department='CS', school='SCI', created_by=lecturer.id)
+        db.session.add(course)
+        db.session.flush()
+        unit = Unit(unit_code='U1', unit_name='Unit', level=1, semester=1, course_id=course.id, unique_join_code='JOIN0001')
+        db.session.add(unit)
+        db.session.flush()
+        enrolled = Student(user_id=student.id, reg_number='REG/1', firstname='Stu', surname='Dent', hobbies=[])
+        enrolled.units.append(unit)
+        db.session.add(enrolled)
+        assessment = Assessment(creator_id=lecturer.id, title='Quiz', unit_id=unit.id, course_id=course.id,
+                                verified=True, total_marks=4, questions_type=['close-ended-multiple-multiple'])
+        db.session.add(assessment)
+        db.session.flush()
+        question = Question(assessment_id=assessment.id, text='Pick the primes', marks=4, rubric='2 marks per prime',
+                            type='close-ended-multiple-multiple', correct_answer=['2', '3'], choices=['2', '3', '4'])
+        db.session.add(question)
+        db.session.commit()
+        self.student_id, self.question_id = student.id, question.id
+        self.student = self.headers(student.id, 'student')
+
+    def test_live_submission_is_graded_by_the_ai_grader(self):
+        ai_result = ({'score': 2.0, 'feedback': 'One prime found.'}, 200)
+        with mock.patch('api.student_routes.grade_text_answer', return_value=ai_result) as ai:
+            response = self.client.post(f'/api/v1/bd/student/questions/{self.question_id}/answer', headers=self.student,
+                                        json={'answer_type': 'text', 'text_answer': '2, 4'})
+        self.assertEqual(response.status_code, 201)
+        ai.assert_called_once()
+        self.assertEqual(ai.call_args.kwargs['rubric'], '2 marks per prime')
+        self.assertEqual(response.get_json()['score'], 2.0)
+        self.assertEqual(Result.query.filter_by(student_id=self.student_id).one().score, 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
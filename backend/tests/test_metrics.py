@@ -0,0 +1,30 @@
+"""
+GET /metrics is served only with the configured bearer token
+"""
+
+import unittest
+
+from support import ServiceTestCase, app
+
+
+class MetricsAuthTest(ServiceTestCase):
+
+    def tearDown(self):
+        app.config['METRICS_TOKEN'] = None
+        super().tearDown()
+
+    def test_disabled_without_a_token(self):
+        app.config['METRICS_TOKEN'] = None
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    def test_requires_the_token(self):
+        app.config['METRICS_TOKEN'] = 'scrape-token'
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code, 401)
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer scrape-token'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'http_request_duration_seconds', response.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
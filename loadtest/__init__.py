@@ -0,0 +1,4 @@
+"""
+Load tests for the whole stack (gateway, Authentication, backend) with a mock LLM.
+Run from the repository root, e.g. `python3 -m loadtest --help`; see loadtest/run.py.
+"""
@@ -0,0 +1,252 @@
+"""
+Fake OpenAI-compatible chat completions server for load tests
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- POST /v1/chat/completions, streamed (server-sent events) or not, with a usage block
+- Latency = first-token latency + completion tokens / token rate, with optional jitter and error rate
+- Grading prompts get {"score", "feedback"}; assessment prompts get a JSON array with the requested
+  number of open-ended questions and marks, so the backend stores what it parses
+
+Usage (stand-alone, e.g. for services started by hand with GPT_ENDPOINT=http://127.0.0.1:8999/v1):
+    python3 -m loadtest.mock_llm --port 8999 --latency 0.8 --tokens-per-second 60
+"""
+
+import re
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# rough characters per token of English text
+CHARS_PER_TOKEN = 4
+# tokens sent per streamed chunk
+TOKENS_PER_CHUNK = 8
+
+QUESTIONS_RE = re.compile(r'Generate (\d+) questions')
+TOTAL_MARKS_RE = re.compile(r'totaling (\d+(?:\.\d+)?) marks')
+MARKS_AVAILABLE_RE = re.compile(r'TOTAL MARKS AVAILABLE: (\d+(?:\.\d+)?)')
+
+
+def _tokens(text):
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class MockLLMStats:
+    """Calls and tokens served, for the load test report."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.streamed = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def add(self, stream, prompt_tokens, completion_tokens, error=False):
+        with self._lock:
+            self.calls += 1
+            self.streamed += int(stream)
+            self.errors += int(error)
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'streamed': self.streamed,
+                'errors': self.errors,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+            }
+
+
+def _assessment_content(prompt):
+    match = QUESTIONS_RE.search(prompt)
+    count = int(match.group(1)) if match else 5
+    match = TOTAL_MARKS_RE.search(prompt)
+    total = float(match.group(1)) if match else count * 5.0
+    marks = round(total / max(1, count), 2)
+    questions = [{
+        'text': f'Question {i + 1}: explain the trade-offs of the approach in the scenario below and justify '
+                f'which one you would choose for a system with a read-heavy workload.',
+        'type': 'open-ended',
+        'marks': marks,
+        'rubric': f'{marks * 0.4:g} marks: correct choice, {marks * 0.6:g} marks: reasoning and justification.',
+        'correct_answer': ['A model answer naming the approach, its costs and why they are acceptable here.'],
+        'choices': None,
+    } for i in range(count)]
+    return json.dumps(questions, indent=2)
+
+
+def _grading_content(prompt):
+    match = MARKS_AVAILABLE_RE.search(prompt)
+    marks = float(match.group(1)) if match else 1.0
+    return json.dumps({
+        'score': round(random.uniform(0, marks), 1),
+        'feedback': 'Expected an identification of the concept with an explanation of the reasoning. '
+                    'The answer identifies the concept correctly but the justification is incomplete; '
+                    'marks were allocated per the rubric. Expand on why the approach works.',
+    })
+
+
+def _completion_content(messages):
+    prompt = '\n'.join(str(m.get('content', '')) for m in messages)
+    if QUESTIONS_RE.search(prompt):
+        return prompt, _assessment_content(prompt)
+    return prompt, _grading_content(prompt)
+
+
+def make_handler(latency, tokens_per_second, jitter, error_rate, stats):
+    """Request handler class bound to the given latency model."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass  # keep the load test output readable
+
+        def _send_json(self, code, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _sleep(self, seconds):
+            if jitter:
+                seconds *= random.uniform(1 - jitter, 1 + jitter)
+            if seconds > 0:
+                time.sleep(seconds)
+
+        def do_GET(self):
+            if self.path.rstrip('/').endswith('/models'):
+                return self._send_json(200, {'object': 'list', 'data': [{'id': 'mock', 'object': 'model'}]})
+            self._send_json(404, {'error': {'message': 'Not found'}})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b'{}')
+            except json.JSONDecodeError:
+                return self._send_json(400, {'error': {'message': 'Invalid JSON body'}})
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                return self._send_json(404, {'error': {'message': 'Not found'}})
+
+            prompt, content = _completion_content(body.get('messages') or [])
+            prompt_tokens = _tokens(prompt)
+            completion_tokens = _tokens(content)
+            model = body.get('model') or 'mock'
+            stream = bool(body.get('stream'))
+
+            if error_rate and random.random() < error_rate:
+                self._sleep(latency)
+                stats.add(stream, prompt_tokens, 0, error=True)
+                return self._send_json(500, {'error': {'message': 'Injected mock failure', 'type': 'server_error'}})
+
+            usage = {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            }
+            completion_id = f'chatcmpl-{uuid.uuid4().hex[:24]}'
+            created = int(time.time())
+
+            if not stream:
+                self._sleep(latency + completion_tokens / tokens_per_second)
+                stats.add(False, prompt_tokens, completion_tokens)
+                return self._send_json(200, {
+                    'id': completion_id, 'object': 'chat.completion', 'created': created, 'model': model,
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                                 'finish_reason': 'stop'}],
+                    'usage': usage,
+                })
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+
+            def send(chunk):
+                self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+                self.wfile.flush()
+
+            self._sleep(latency)
+            step = TOKENS_PER_CHUNK * CHARS_PER_TOKEN
+            for start in range(0, len(content), step):
+                send({'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                      'choices': [{'index': 0, 'delta': {'content': content[start:start + step]},
+                                   'finish_reason': None}]})
+                self._sleep(TOKENS_PER_CHUNK / tokens_per_second)
+            send({'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                  'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})
+            # usage on a final chunk without choices, as stream_options={"include_usage": true} does
+            send({'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                  'choices': [], 'usage': usage})
+            self.wfile.write(b'data: [DONE]\n\n')
+            self.wfile.flush()
+            stats.add(True, prompt_tokens, completion_tokens)
+
+    return Handler
+
+
+class MockLLMServer:
+    """The fake endpoint served from a background thread."""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.5, tokens_per_second=50.0, jitter=0.2, error_rate=0.0):
+        self.stats = MockLLMStats()
+        handler = make_handler(latency, tokens_per_second, jitter, error_rate, self.stats)
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='mock-llm', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def add_arguments(parser):
+    parser.add_argument('--latency', type=float, default=0.5, help='seconds before the first token (default 0.5)')
+    parser.add_argument('--tokens-per-second', type=float, default=50.0,
+                        help='completion token rate (default 50)')
+    parser.add_argument('--jitter', type=float, default=0.2,
+                        help='random +/- share applied to every delay (default 0.2)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='share of calls answered with HTTP 500 (default 0)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8999)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.host, args.port, args.latency, args.tokens_per_second, args.jitter, args.error_rate)
+    print(f'Mock LLM listening on {server.url}')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats.to_dict()))
+
+
+if __name__ == '__main__':
+    main()
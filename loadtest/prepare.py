@@ -0,0 +1,96 @@
+"""
+Database set-up for the load tests, run inside a service folder by loadtest.run
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- schema: db.create_all() with the models of the service in the working directory
+- seed: bulk insert the backend benchmark dataset (benchmarks.seed), backend folder only
+- passwords: give every load-test account the load-test password, hashed by the Authentication service
+- accounts: print the load-test accounts as JSON ({"students": [...], "lecturers": [...]})
+
+Usage:
+    cd backend && DB_URI=... python3 ../loadtest/prepare.py schema seed
+"""
+
+import os
+import sys
+import json
+
+# the service folder must win over this folder (both could have an `api` package on the path)
+sys.path[0] = os.getcwd()
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.dialects.postgresql import JSONB
+
+# the accounts created by benchmarks.seed
+ACCOUNT_EMAIL_PATTERN = '%@bench.ac.ke'
+
+
+@compiles(JSONB, 'sqlite')
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    # SQLite smoke runs: store the JSONB columns (student hobbies) as JSON
+    return 'JSON'
+
+
+def schema(db):
+    db.create_all()
+
+
+def seed(db, lecturers, units_per_lecturer, students, assessments_per_unit, questions_per_assessment):
+    from benchmarks.seed import seed as seed_dataset
+    seed_dataset(lecturers, units_per_lecturer, students, assessments_per_unit, questions_per_assessment)
+
+
+def passwords(db, password):
+    from sqlalchemy import text
+    from api.utils import hashing_password
+
+    # one hash for every account: seeding thousands of users should not take minutes
+    db.session.execute(
+        text('UPDATE users SET password = :password WHERE email LIKE :pattern'),
+        {'password': hashing_password(password), 'pattern': ACCOUNT_EMAIL_PATTERN}
+    )
+    db.session.commit()
+
+
+def accounts(db):
+    from sqlalchemy import text
+
+    rows = db.session.execute(
+        text('SELECT email, role FROM users WHERE email LIKE :pattern ORDER BY email'),
+        {'pattern': ACCOUNT_EMAIL_PATTERN}
+    ).all()
+    print(json.dumps({
+        'students': [email for email, role in rows if role == 'student'],
+        'lecturers': [email for email, role in rows if role == 'lecturer'],
+    }))
+
+
+def main():
+    actions = sys.argv[1:]
+    if os.getenv('LOADTEST_SEED'):
+        # benchmarks/__init__.py refuses to run without BENCH_DB_URI
+        os.environ.setdefault('BENCH_DB_URI', os.environ['DB_URI'])
+
+    from app import create_app
+    from api import db
+
+    app = create_app()
+    with app.app_context():
+        for action in actions:
+            if action == 'schema':
+                schema(db)
+            elif action == 'seed':
+                lecturers, units, students, assessments, questions = (
+                    int(n) for n in os.environ['LOADTEST_SEED'].split(',')
+                )
+                seed(db, lecturers, units, students, assessments, questions)
+            elif action == 'passwords':
+                passwords(db, os.environ['LOADTEST_PASSWORD'])
+            elif action == 'accounts':
+                accounts(db)
+            else:
+                sys.exit(f'Unknown action: {action}')
+
+
+if __name__ == '__main__':
+    main()
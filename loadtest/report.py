@@ -0,0 +1,95 @@
+"""
+Load test results: throughput and latency percentiles per route
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Summarise the recorded samples per scenario and route: requests, errors, req/s, p50/p95/p99/max
+- Save the summary as JSON and compare it with a saved baseline (p95 and throughput regressions)
+Errors are responses with status >= 500 and requests that got no response at all.
+"""
+
+import json
+import math
+import time
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _is_error(status):
+    # 429: a rate limit answered instead of the service, which a load test run must not count as served
+    return status == 'error' or status == 429 or status >= 500
+
+
+def summarise(recorder, phase_seconds):
+    """{scenario: {route: stats}} from the recorder; latencies in milliseconds."""
+    results = {}
+    for (scenario, route), samples in sorted(recorder.samples.items()):
+        latencies = sorted(seconds * 1000 for seconds, _ in samples)
+        statuses = {}
+        for _, status in samples:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        seconds = phase_seconds.get(scenario) or 1.0
+        results.setdefault(scenario, {})[route] = {
+            'requests': len(samples),
+            'errors': sum(1 for _, status in samples if _is_error(status)),
+            'statuses': statuses,
+            'throughput': round(len(samples) / seconds, 2),
+            'p50_ms': round(percentile(latencies, 0.50), 1),
+            'p95_ms': round(percentile(latencies, 0.95), 1),
+            'p99_ms': round(percentile(latencies, 0.99), 1),
+            'max_ms': round(latencies[-1], 1),
+        }
+    return results
+
+
+def print_table(results, out=print):
+    out(f"{'scenario':18} {'route':62} {'reqs':>7} {'errs':>5} {'req/s':>8} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  statuses")
+    for scenario, routes in results.items():
+        for route, stats in routes.items():
+            statuses = ' '.join(f'{status}:{count}' for status, count in sorted(stats['statuses'].items()))
+            out(f"{scenario:18} {route:62} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput']:>8.2f} "
+                f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}  "
+                f"{statuses}")
+
+
+def save(path, results, settings, llm_stats):
+    with open(path, 'w') as f:
+        json.dump({
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'settings': settings,
+            'llm': llm_stats,
+            'results': results,
+        }, f, indent=2)
+
+
+def compare(results, baseline_path, threshold, out=print):
+    """
+    Print the change against a saved run; returns the regressions: routes whose p95 grew by more than
+    `threshold` (a share, e.g. 0.2) or whose throughput fell by more than it.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+
+    regressions = []
+    out(f"\n{'scenario':18} {'route':62} {'p95 ms':>19} {'req/s':>17}")
+    for scenario, routes in results.items():
+        for route, stats in routes.items():
+            before = baseline.get(scenario, {}).get(route)
+            if before is None:
+                continue
+            p95_change = (stats['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0.0
+            rps_change = ((stats['throughput'] - before['throughput']) / before['throughput']
+                          if before['throughput'] else 0.0)
+            regressed = p95_change > threshold or rps_change < -threshold
+            if regressed:
+                regressions.append((scenario, route))
+            out(f"{scenario:18} {route:62} {before['p95_ms']:>8.1f} -> {stats['p95_ms']:>8.1f} "
+                f"{before['throughput']:>7.2f} -> {stats['throughput']:>7.2f}"
+                f"{'  REGRESSION' if regressed else ''}")
+    return regressions
@@ -0,0 +1,294 @@
+"""
+Exam-day scenarios replayed through the gateway
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- login_storm: students logging in at the start of an exam
+- dashboard_polling: students refreshing the assessment list, opening an assessment and their profile
+- answer_submission: students answering every question of an assessment (graded by the mock LLM) and submitting
+- bulk_export: lecturers downloading the Excel exports and reading submissions and analytics
+- ai_generation: lecturers generating assessments with the (mock) LLM
+Every request is recorded under its route template, e.g. GET /api/v1/bd/assessments/<id>/questions.
+"""
+
+import json
+import time
+import random
+import threading
+
+import requests
+
+REQUEST_TIMEOUT = 300
+
+
+class Recorder:
+    """Latency and status of every request, by scenario and route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, scenario, route, seconds, status):
+        with self._lock:
+            self.samples.setdefault((scenario, route), []).append((seconds, status))
+
+
+class Client:
+    """A virtual user's HTTP session; requests are timed and recorded under a route template."""
+
+    def __init__(self, base_url, recorder, scenario):
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.scenario = scenario
+        self.session = requests.Session()
+        self.headers = {}
+        self.cookies = {}
+
+    def request(self, method, route, path=None, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, self.base_url + (path or route), headers=self.headers, cookies=self.cookies,
+                timeout=REQUEST_TIMEOUT, **kwargs
+            )
+            status = response.status_code
+        except requests.RequestException:
+            response, status = None, 'error'
+        self.recorder.add(self.scenario, f'{method} {route}', time.perf_counter() - start, status)
+        return response
+
+    def login(self, email, password):
+        response = self.request('POST', '/api/v1/auth/login', json={'email': email, 'password': password})
+        if response is None or response.status_code != 200:
+            return False
+        token = response.json()['access_token']
+        # the backend reads the JWT from the Authorization header, Authentication from its cookie
+        # (sent explicitly: the cookie is Secure and the load test talks plain HTTP)
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.cookies = {'access_token_cookie': token}
+        return True
+
+
+def _json(response, default=None):
+    if response is None or response.status_code != 200:
+        return default
+    try:
+        return response.json()
+    except ValueError:
+        return default
+
+
+class Scenario:
+    """One virtual user: setup() once, then step() until the phase ends (or step() returns False)."""
+
+    name = None
+
+    def __init__(self, context, client, index):
+        self.context = context
+        self.client = client
+        self.index = index
+
+    def setup(self):
+        return True
+
+    def step(self):
+        raise NotImplementedError
+
+    def think(self):
+        if self.context.think_time:
+            time.sleep(random.uniform(0, 2 * self.context.think_time))
+
+
+class LoginStorm(Scenario):
+    name = 'login_storm'
+
+    def step(self):
+        # a fresh session per login, like a student opening the app
+        self.client.session = requests.Session()
+        self.client.login(random.choice(self.context.students), self.context.password)
+        self.think()
+
+
+class DashboardPolling(Scenario):
+    name = 'dashboard_polling'
+
+    def setup(self):
+        return self.client.login(self.context.student(self.index), self.context.password)
+
+    def step(self):
+        assessments = _json(self.client.request(
+            'GET', '/api/v1/bd/student/assessments', '/api/v1/bd/student/assessments?view=summary'
+        ), [])
+        if assessments:
+            assessment = random.choice(assessments)
+            self.client.request(
+                'GET', '/api/v1/bd/assessments/<id>/questions',
+                f"/api/v1/bd/assessments/{assessment['id']}/questions"
+            )
+        self.client.request('GET', '/api/v1/auth/me')
+        self.think()
+
+
+class AnswerSubmission(Scenario):
+    name = 'answer_submission'
+
+    def setup(self):
+        self.pending = []
+        return self._next_student()
+
+    def _next_student(self):
+        # every student answers each open assessment once, then the user moves on to an unused student
+        while True:
+            email = self.context.claim_student()
+            if email is None:
+                return False
+            self.client.session = requests.Session()
+            if not self.client.login(email, self.context.password):
+                continue
+            assessments = _json(self.client.request(
+                'GET', '/api/v1/bd/student/assessments', '/api/v1/bd/student/assessments?view=summary'
+            ), [])
+            submitted = {s.get('assessment_id') for s in _json(
+                self.client.request('GET', '/api/v1/bd/student/submissions'), []
+            )}
+            self.pending = [a['id'] for a in assessments
+                            if a['id'] not in submitted and a.get('status', 'start') == 'start']
+            if self.pending:
+                return True
+
+    def step(self):
+        if not self.pending and not self._next_student():
+            return False
+        assessment_id = self.pending.pop()
+        questions = _json(self.client.request(
+            'GET', '/api/v1/bd/assessments/<id>/questions',
+            f'/api/v1/bd/assessments/{assessment_id}/questions'
+        ), [])
+        for question in questions:
+            self.client.request(
+                'POST', '/api/v1/bd/student/questions/<id>/answer',
+                f"/api/v1/bd/student/questions/{question['id']}/answer",
+                json={'answer_type': 'text', 'text_answer': self.context.answer_text},
+            )
+            self.think()
+        self.client.request(
+            'GET', '/api/v1/bd/student/assessments/<id>/submit',
+            f'/api/v1/bd/student/assessments/{assessment_id}/submit'
+        )
+
+
+class LecturerScenario(Scenario):
+    def setup(self):
+        if not self.client.login(self.context.lecturer(self.index), self.context.password):
+            return False
+        assessments = _json(self.client.request('GET', '/api/v1/bd/lecturer/assessments'), [])
+        self.assessments = [a['id'] for a in assessments]
+        self.units = sorted({a['unit_id'] for a in assessments})
+        return bool(self.units)
+
+
+class BulkExport(LecturerScenario):
+    name = 'bulk_export'
+
+    def step(self):
+        assessment_id = random.choice(self.assessments)
+        unit_id = random.choice(self.units)
+        self.client.request(
+            'GET', '/api/v1/bd/lecturer/submissions/assessments/<id>',
+            f'/api/v1/bd/lecturer/submissions/assessments/{assessment_id}'
+        )
+        self.client.request(
+            'GET', '/api/v1/bd/lecturer/assessments/<id>/analytics',
+            f'/api/v1/bd/lecturer/assessments/{assessment_id}/analytics'
+        )
+        self.client.request(
+            'GET', '/api/v1/bd/lecturer/submissions/assessments/<id>/download',
+            f'/api/v1/bd/lecturer/submissions/assessments/{assessment_id}/download'
+        )
+        self.client.request(
+            'GET', '/api/v1/bd/lecturer/submissions/units/<id>/download',
+            f'/api/v1/bd/lecturer/submissions/units/{unit_id}/download'
+        )
+        self.think()
+
+
+class AIGeneration(LecturerScenario):
+    name = 'ai_generation'
+
+    def step(self):
+        payload = {
+            'title': 'Load test CAT',
+            'description': 'Generated during a load test',
+            'week': 1,
+            'type': 'CAT',
+            'unit_id': random.choice(self.units),
+            'questions_type': ['open-ended'],
+            'topic': 'Caching strategies',
+            'total_marks': 20,
+            'difficulty': 'Intermediate',
+            'number_of_questions': self.context.generated_questions,
+            'blooms_level': 'Analyze',
+        }
+        self.client.request(
+            'POST', '/api/v1/bd/lecturer/ai/generate-assessments', data={'payload': json.dumps(payload)}
+        )
+        self.think()
+
+
+SCENARIOS = {cls.name: cls for cls in (LoginStorm, DashboardPolling, AnswerSubmission, BulkExport, AIGeneration)}
+
+
+class Context:
+    """Accounts and knobs shared by the virtual users of a run."""
+
+    def __init__(self, accounts, password, think_time=0.0, generated_questions=5):
+        self.students = accounts['students']
+        self.lecturers = accounts['lecturers']
+        self.password = password
+        self.think_time = think_time
+        self.generated_questions = generated_questions
+        self.answer_text = (
+            'Caching the question set trades memory for fewer queries; it is safe here because questions '
+            'only change when the lecturer edits them, which invalidates the cached entry.'
+        )
+        self._lock = threading.Lock()
+        self._unclaimed = list(self.students)
+        random.shuffle(self._unclaimed)
+
+    def student(self, index):
+        return self.students[index % len(self.students)]
+
+    def lecturer(self, index):
+        return self.lecturers[index % len(self.lecturers)]
+
+    def claim_student(self):
+        """A student nobody has answered as yet in this run (None when all are used)."""
+        with self._lock:
+            return self._unclaimed.pop() if self._unclaimed else None
+
+
+def run_phase(name, base_url, context, recorder, users, duration, ramp_up=0.0):
+    """Run `users` virtual users of a scenario for `duration` seconds; returns the measured seconds."""
+    scenario_class = SCENARIOS[name]
+    stop = threading.Event()
+
+    def virtual_user(index):
+        if ramp_up:
+            if stop.wait(ramp_up * index / users):
+                return
+        scenario = scenario_class(context, Client(base_url, recorder, name), index)
+        if not scenario.setup():
+            return
+        while not stop.is_set():
+            if scenario.step() is False:
+                return
+
+    # setup requests (logins, listings) are recorded too; they are part of the scenario's traffic
+    threads = [threading.Thread(target=virtual_user, args=(i,), daemon=True) for i in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    stop.wait(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
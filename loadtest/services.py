@@ -0,0 +1,146 @@
+"""
+Start and stop the three services for a load test
+Created by: https://github.com/ByteBenders-compScientists/UAMAS-backend
+Actions:
+- Run the database set-up actions of loadtest/prepare.py in a service folder
+- Start Authentication, backend and api-gateway under gunicorn with a shared JWT secret,
+  the load-test database and GPT_ENDPOINT pointing at the mock LLM
+- Wait for the health endpoints and stop every process on exit
+Each service keeps its own .env for anything not set here (load_dotenv does not override).
+"""
+
+import os
+import sys
+import time
+import json
+import signal
+import subprocess
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PREPARE = os.path.join(ROOT, 'loadtest', 'prepare.py')
+
+SERVICES = {
+    'auth': {'folder': 'Authentication', 'health': '/api/v1/auth/health'},
+    'backend': {'folder': 'backend', 'health': '/api/v1/bd/health'},
+    'gateway': {'folder': 'api-gateway', 'health': '/api/v1/health'},
+}
+
+
+class ServiceError(RuntimeError):
+    pass
+
+
+def service_env(db_uri, llm_url, workdir, extra=None):
+    """Environment shared by the services of one load test run."""
+    env = dict(os.environ)
+    env.update({
+        'DB_URI': db_uri,
+        'TRACK_MODIFICATIONS': 'False',
+        'JWT_SECRET_KEY': env.get('LOADTEST_JWT_SECRET_KEY', 'loadtest-jwt-secret-key-0123456789abcdef'),
+        'SECRET_KEY': env.get('LOADTEST_SECRET_KEY', 'loadtest-secret-key'),
+        'UPLOAD_FOLDER': os.path.join(workdir, 'uploads') + os.sep,
+        'OPENAI_API_KEY': 'loadtest',
+        'GPT_ENDPOINT': llm_url,
+        'GPT_MODEL': 'mock-gpt',
+        'GPT_IMAGE_MODEL': 'mock-gpt',
+        'LOGGING_FILE_PATH': os.path.join(workdir, 'api-gateway.log'),
+        'LOGGING_LEVEL': 'WARNING',
+        # every virtual user connects from 127.0.0.1, so the per-IP and per-account login budgets would
+        # turn the login scenarios into a count of 429s
+        'RATE_LIMIT_ENABLED': 'False',
+    })
+    env.update(extra or {})
+    return env
+
+
+def prepare(service, actions, env, python=sys.executable):
+    """Run prepare.py actions in a service folder and return its stdout."""
+    folder = os.path.join(ROOT, SERVICES[service]['folder'])
+    result = subprocess.run(
+        [python, PREPARE, *actions], cwd=folder, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise ServiceError(f'prepare {" ".join(actions)} failed in {folder}:\n{result.stderr[-4000:]}')
+    return result.stdout
+
+
+def load_accounts(env, python=sys.executable):
+    output = prepare('auth', ['accounts'], env, python)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class Stack:
+    """The gateway, Authentication and backend processes of one run."""
+
+    def __init__(self, env, workdir, ports, workers, threads, python=sys.executable):
+        self.env = env
+        self.workdir = workdir
+        self.ports = ports
+        self.workers = workers
+        self.threads = threads
+        self.python = python
+        self.processes = {}
+        self._logs = {}
+
+    def url(self, service):
+        return f'http://127.0.0.1:{self.ports[service]}'
+
+    @property
+    def gateway_url(self):
+        return self.url('gateway')
+
+    def _start(self, service, env):
+        folder = os.path.join(ROOT, SERVICES[service]['folder'])
+        log_path = os.path.join(self.workdir, f'{service}.log')
+        log = open(log_path, 'w')
+        self._logs[service] = (log, log_path)
+        command = [
+            self.python, '-m', 'gunicorn',
+            '-k', 'gthread', '--workers', str(self.workers[service]), '--threads', str(self.threads[service]),
+            '--timeout', '300', '--bind', f'127.0.0.1:{self.ports[service]}', 'app:app',
+        ]
+        self.processes[service] = subprocess.Popen(
+            command, cwd=folder, env=env, stdout=log, stderr=subprocess.STDOUT, start_new_session=True
+        )
+
+    def _wait(self, service, timeout):
+        url = self.url(service) + SERVICES[service]['health']
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.processes[service].poll() is not None:
+                break
+            try:
+                if requests.get(url, timeout=2).status_code == 200:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.25)
+        raise ServiceError(f'{service} did not become healthy at {url}:\n{self.tail(service)}')
+
+    def tail(self, service, lines=40):
+        log, log_path = self._logs[service]
+        log.flush()
+        with open(log_path) as f:
+            return ''.join(f.readlines()[-lines:])
+
+    def start(self, timeout=60):
+        self._start('auth', self.env)
+        self._start('backend', self.env)
+        self._start('gateway', dict(self.env, AUTH_URL=self.url('auth'), BACKEND_URL=self.url('backend')))
+        for service in ('auth', 'backend', 'gateway'):
+            self._wait(service, timeout)
+        return self
+
+    def stop(self):
+        for service, process in self.processes.items():
+            if process.poll() is None:
+                os.killpg(process.pid, signal.SIGTERM)
+        for service, process in self.processes.items():
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+        for log, _ in self._logs.values():
+            log.close()